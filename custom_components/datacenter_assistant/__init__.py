@@ -1,9 +1,11 @@
 import logging
 import asyncio
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.core import HomeAssistant, ServiceCall, SupportsResponse
+from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
 import time
+from .task_supervisor import get_task_supervisor
 
 _LOGGER = logging.getLogger(__name__)
 _LOGGER.debug("Initialized with log handlers: %s", logging.getLogger().handlers)
@@ -11,10 +13,17 @@ _LOGGER.debug("Initialized with log handlers: %s", logging.getLogger().handlers)
 DOMAIN = "datacenter_assistant"
 PLATFORMS = ["sensor", "binary_sensor", "button"]
 
+# Objects shared between platforms; dropped on unload so a reload starts fresh
+SHARED_DATA_KEYS = ["coordinator", "resource_coordinator", "coordinator_manager", "upgrade_service", "button_manager",
+                    "async_add_entities", "button_async_add_entities", "task_supervisor"]
+
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up DataCenter Assistant from a config entry."""
     hass.data.setdefault(DOMAIN, {})
     hass.data[DOMAIN][entry.entry_id] = entry
+    
+    # Supervises background tasks and listeners of this entry
+    get_task_supervisor(hass)
 
     # Configure logging
     logging.getLogger('custom_components.datacenter_assistant').setLevel(logging.CRITICAL)
@@ -41,12 +50,19 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
     if unload_ok:
         # Remove services
-        services_to_remove = ["refresh_token", "trigger_upgrade", "download_bundle", "start_domain_upgrade", "acknowledge_upgrade_alerts"]
+        services_to_remove = ["refresh_token", "trigger_upgrade", "download_bundle", "start_domain_upgrade", "acknowledge_upgrade_alerts",
+                              "plan_domain_upgrade", "get_upgrade_logs", "schedule_domain_upgrade", "cancel_scheduled_upgrade",
+                              "run_prechecks", "refresh", "get_inventory"]
         for service in services_to_remove:
             hass.services.async_remove(DOMAIN, service)
         
+        # Cancel background tasks and remove listeners
+        await get_task_supervisor(hass).async_shutdown()
+        
         # Clean up data
         hass.data[DOMAIN].pop(entry.entry_id, None)
+        for key in SHARED_DATA_KEYS:
+            hass.data[DOMAIN].pop(key, None)
         if not hass.data[DOMAIN]:
             hass.data.pop(DOMAIN)
 
@@ -254,9 +270,203 @@ async def _async_setup_services(hass: HomeAssistant, entry: ConfigEntry):
         except Exception as e:
             _LOGGER.error(f"Error acknowledging alerts: {e}")
     
+    async def plan_domain_upgrade_service(call: ServiceCall):
+        """Service to compute a dry-run upgrade plan for one or all domains."""
+        _LOGGER.info("Service: Planning VCF domain upgrade")
+        
+        domain_id = call.data.get("domain_id")
+        
+        try:
+            upgrade_service = hass.data.get(DOMAIN, {}).get("upgrade_service")
+            if not upgrade_service:
+                _LOGGER.error("Upgrade service not available")
+                return {"error": "Upgrade service not available"}
+            
+            coordinator = hass.data.get(DOMAIN, {}).get("coordinator")
+            if not coordinator or not coordinator.data:
+                _LOGGER.error("Coordinator data not available")
+                return {"error": "Coordinator data not available"}
+            
+            domain_updates = coordinator.data.get("domain_updates", {})
+            if domain_id and domain_id not in domain_updates:
+                _LOGGER.error(f"Domain {domain_id} not found")
+                return {"error": f"Domain {domain_id} not found"}
+            
+            return await upgrade_service.planner.plan_domains(
+                domain_updates, [domain_id] if domain_id else None
+            )
+            
+        except Exception as e:
+            _LOGGER.error(f"Error planning domain upgrade: {e}")
+            return {"error": str(e)}
+    
+    async def get_upgrade_logs_service(call: ServiceCall):
+        """Service to return the structured upgrade log of a domain with paging."""
+        domain_id = call.data.get("domain_id")
+        offset = int(call.data.get("offset", 0))
+        limit = int(call.data.get("limit", 100))
+        
+        if not domain_id:
+            _LOGGER.error("Domain ID is required for upgrade logs")
+            return {"error": "Domain ID is required"}
+        
+        upgrade_service = hass.data.get(DOMAIN, {}).get("upgrade_service")
+        if not upgrade_service:
+            _LOGGER.error("Upgrade service not available")
+            return {"error": "Upgrade service not available"}
+        
+        return upgrade_service.get_upgrade_log_entries(domain_id, max(offset, 0), max(limit, 0))
+    
+    async def schedule_domain_upgrade_service(call: ServiceCall):
+        """Service to queue a domain upgrade for its maintenance window."""
+        _LOGGER.info("Service: Scheduling VCF domain upgrade")
+        
+        domain_id = call.data.get("domain_id")
+        window = call.data.get("window")
+        
+        if not domain_id:
+            _LOGGER.error("Domain ID is required for scheduling an upgrade")
+            return
+        
+        try:
+            upgrade_service = hass.data.get(DOMAIN, {}).get("upgrade_service")
+            if not upgrade_service:
+                _LOGGER.error("Upgrade service not available")
+                return
+            
+            coordinator = hass.data.get(DOMAIN, {}).get("coordinator")
+            if not coordinator or not coordinator.data:
+                _LOGGER.error("Coordinator data not available")
+                return
+            
+            domain_data = coordinator.data.get("domain_updates", {}).get(domain_id, {})
+            if not domain_data:
+                _LOGGER.error(f"Domain {domain_id} not found")
+                return
+            
+            await upgrade_service.scheduler.schedule(domain_id, domain_data.get("domain_name", domain_id), window)
+            
+        except Exception as e:
+            _LOGGER.error(f"Error scheduling domain upgrade: {e}")
+    
+    async def cancel_scheduled_upgrade_service(call: ServiceCall):
+        """Service to remove a domain upgrade from the queue."""
+        _LOGGER.info("Service: Cancelling scheduled VCF domain upgrade")
+        
+        domain_id = call.data.get("domain_id")
+        
+        if not domain_id:
+            _LOGGER.error("Domain ID is required for cancelling a scheduled upgrade")
+            return
+        
+        upgrade_service = hass.data.get(DOMAIN, {}).get("upgrade_service")
+        if not upgrade_service:
+            _LOGGER.error("Upgrade service not available")
+            return
+        
+        if not upgrade_service.scheduler.cancel(domain_id):
+            _LOGGER.warning(f"No queued upgrade to cancel for domain {domain_id}")
+    
+    async def run_prechecks_service(call: ServiceCall):
+        """Service to run the pre-checks of the next upgrade without starting it."""
+        _LOGGER.info("Service: Running VCF upgrade pre-checks")
+        
+        domain_id = call.data.get("domain_id")
+        
+        if not domain_id:
+            _LOGGER.error("Domain ID is required for pre-checks")
+            return
+        
+        try:
+            upgrade_service = hass.data.get(DOMAIN, {}).get("upgrade_service")
+            if not upgrade_service:
+                _LOGGER.error("Upgrade service not available")
+                return
+            
+            coordinator = hass.data.get(DOMAIN, {}).get("coordinator")
+            if not coordinator or not coordinator.data:
+                _LOGGER.error("Coordinator data not available")
+                return
+            
+            domain_data = coordinator.data.get("domain_updates", {}).get(domain_id, {})
+            if not domain_data:
+                _LOGGER.error(f"Domain {domain_id} not found")
+                return
+            
+            if not await upgrade_service.run_prechecks_only(domain_id, domain_data):
+                _LOGGER.warning(f"Pre-checks could not be started for domain {domain_id}")
+                
+        except Exception as e:
+            _LOGGER.error(f"Error running pre-checks: {e}")
+    
+    async def refresh_service(call: ServiceCall):
+        """Service to re-fetch one domain, cluster or host, or everything without IDs."""
+        domain_id = call.data.get("domain_id")
+        cluster_id = call.data.get("cluster_id")
+        host_id = call.data.get("host_id")
+        _LOGGER.info(f"Service: Refreshing VCF data ({host_id or cluster_id or domain_id or 'all'})")
+        
+        coordinator_manager = hass.data.get(DOMAIN, {}).get("coordinator_manager")
+        if not coordinator_manager:
+            raise HomeAssistantError("Coordinator not available")
+        
+        try:
+            await coordinator_manager.async_refresh_subtree(domain_id, cluster_id, host_id)
+        except HomeAssistantError:
+            raise
+        except Exception as e:
+            _LOGGER.error(f"Error refreshing VCF data: {e}")
+            raise HomeAssistantError(f"Error refreshing VCF data: {e}") from e
+    
+    async def get_inventory_service(call: ServiceCall):
+        """Service to return the domain, cluster and host inventory kept out of sensor history."""
+        domain_id = call.data.get("domain_id")
+        
+        coordinator = hass.data.get(DOMAIN, {}).get("coordinator")
+        resource_coordinator = hass.data.get(DOMAIN, {}).get("resource_coordinator")
+        update_data = coordinator.data if coordinator and coordinator.data else {}
+        resource_data = resource_coordinator.data if resource_coordinator and resource_coordinator.data else {}
+        
+        domains = update_data.get("domains") or resource_data.get("domains") or []
+        if domain_id:
+            domains = [domain for domain in domains if domain.get("id") == domain_id]
+            if not domains:
+                _LOGGER.error(f"Domain {domain_id} not found")
+                return {"error": f"Domain {domain_id} not found"}
+        
+        domain_updates = update_data.get("domain_updates", {})
+        domain_resources = resource_data.get("domain_resources", {})
+        return {
+            "stale_since": update_data.get("stale_since") or resource_data.get("stale_since"),
+            "domains": [
+                {
+                    **domain,
+                    "update": domain_updates.get(domain.get("id"), {}),
+                    "resources": domain_resources.get(domain.get("id"), {})
+                }
+                for domain in domains
+            ]
+        }
+    
     # Register services
     hass.services.async_register(DOMAIN, "refresh_token", refresh_token_service)
     hass.services.async_register(DOMAIN, "trigger_upgrade", trigger_upgrade_service)
     hass.services.async_register(DOMAIN, "download_bundle", download_bundle_service)
     hass.services.async_register(DOMAIN, "start_domain_upgrade", start_domain_upgrade_service)
     hass.services.async_register(DOMAIN, "acknowledge_upgrade_alerts", acknowledge_upgrade_alerts_service)
+    hass.services.async_register(
+        DOMAIN, "plan_domain_upgrade", plan_domain_upgrade_service,
+        supports_response=SupportsResponse.ONLY
+    )
+    hass.services.async_register(
+        DOMAIN, "get_upgrade_logs", get_upgrade_logs_service,
+        supports_response=SupportsResponse.ONLY
+    )
+    hass.services.async_register(DOMAIN, "schedule_domain_upgrade", schedule_domain_upgrade_service)
+    hass.services.async_register(DOMAIN, "cancel_scheduled_upgrade", cancel_scheduled_upgrade_service)
+    hass.services.async_register(DOMAIN, "run_prechecks", run_prechecks_service)
+    hass.services.async_register(DOMAIN, "refresh", refresh_service)
+    hass.services.async_register(
+        DOMAIN, "get_inventory", get_inventory_service,
+        supports_response=SupportsResponse.ONLY
+    )
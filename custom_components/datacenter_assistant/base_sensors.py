@@ -1,12 +1,31 @@
 """Base sensor classes for VCF sensors."""
 import logging
 from homeassistant.components.sensor import SensorEntity
+from homeassistant.core import callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
-from .utils import safe_name_conversion, get_resource_icon
+from .utils import safe_name_conversion, get_resource_icon, upgrade_update_signal, resource_update_signal
 
 _LOGGER = logging.getLogger(__name__)
 
 
+def host_usage_percent(host_data, resource_type):
+    """Get the usage percentage of a host resource (cpu, memory or storage)."""
+    resource_info = host_data.get(resource_type, {})
+    
+    if resource_type == "cpu":
+        used_mhz = resource_info.get("used_mhz", 0)
+        total_mhz = resource_info.get("total_mhz", 1)
+        return round((used_mhz / total_mhz) * 100, 1) if total_mhz > 0 else 0
+    
+    elif resource_type in ["memory", "storage"]:
+        used_mb = resource_info.get("used_mb", 0)
+        total_mb = resource_info.get("total_mb", 1)
+        return round((used_mb / total_mb) * 100, 1) if total_mb > 0 else 0
+    
+    return 0
+
+
 class VCFBaseSensor(CoordinatorEntity, SensorEntity):
     """Base class for all VCF sensors."""
     
@@ -36,6 +55,9 @@ class VCFBaseSensor(CoordinatorEntity, SensorEntity):
 class VCFDomainBaseSensor(VCFBaseSensor):
     """Base class for domain-specific sensors."""
     
+    # Static identifiers are kept out of the recorder; subclasses extend this set
+    _unrecorded_attributes = frozenset({"domain_name", "domain_prefix"})
+    
     def __init__(self, coordinator, domain_id, domain_name, domain_prefix, 
                  sensor_type, icon="mdi:server"):
         self._domain_id = domain_id
@@ -53,9 +75,39 @@ class VCFDomainBaseSensor(VCFBaseSensor):
         return self.safe_get_data(data_key, self._domain_id, default={})
 
 
+class VCFDomainUpgradeBaseSensor(VCFDomainBaseSensor):
+    """Base class for domain sensors driven by upgrade service updates."""
+    
+    # Keys of the coalesced upgrade update that should refresh this sensor
+    upgrade_update_keys = ("status",)
+    
+    async def async_added_to_hass(self):
+        """Run when sensor is added to Home Assistant."""
+        await super().async_added_to_hass()
+        
+        # Per-domain signal, so updates for other domains do not wake this entity
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass, upgrade_update_signal(self._domain_id), self._handle_upgrade_update
+            )
+        )
+    
+    @callback
+    def _handle_upgrade_update(self, update):
+        """Update state when a relevant upgrade update for this domain arrives."""
+        if any(update.get(key) for key in self.upgrade_update_keys):
+            self.async_write_ha_state()
+    
+    def get_upgrade_service(self):
+        """Get the upgrade service from hass data."""
+        return self.hass.data.get("datacenter_assistant", {}).get("upgrade_service")
+
+
 class VCFResourceBaseSensor(VCFBaseSensor):
     """Base class for resource-specific sensors."""
     
+    _unrecorded_attributes = frozenset({"domain", "domain_prefix", "resource_type"})
+    
     def __init__(self, coordinator, domain_id, domain_name, domain_prefix, 
                  resource_type, entity_suffix=""):
         self._domain_id = domain_id
@@ -70,6 +122,27 @@ class VCFResourceBaseSensor(VCFBaseSensor):
         
         super().__init__(coordinator, name, unique_id, icon)
     
+    async def async_added_to_hass(self):
+        """Run when sensor is added to Home Assistant."""
+        await super().async_added_to_hass()
+        
+        # Partial refreshes of this domain bypass the coordinator listeners
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass, resource_update_signal(self._domain_id), self._handle_resource_update
+            )
+        )
+    
+    @callback
+    def _handle_resource_update(self, update):
+        """Update state when a partial refresh touched this sensor's data."""
+        if self.resource_update_affects(update):
+            self.async_write_ha_state()
+    
+    def resource_update_affects(self, update):
+        """Check if a partial refresh changed the data of this sensor."""
+        return update["domain"]
+    
     @property
     def unit_of_measurement(self):
         """Return the unit of measurement."""
@@ -83,6 +156,11 @@ class VCFResourceBaseSensor(VCFBaseSensor):
 class VCFHostResourceBaseSensor(VCFResourceBaseSensor):
     """Base class for host resource sensors."""
     
+    # Only the used values change between refreshes
+    _unrecorded_attributes = VCFResourceBaseSensor._unrecorded_attributes | frozenset({
+        "hostname", "host_id", "fqdn", "total_mhz", "cores", "total_mb", "total_gb"
+    })
+    
     def __init__(self, coordinator, domain_id, domain_name, domain_prefix, 
                  host_id, hostname, resource_type):
         self._host_id = host_id
@@ -96,6 +174,10 @@ class VCFHostResourceBaseSensor(VCFResourceBaseSensor):
         safe_hostname = safe_name_conversion(hostname)
         self._attr_unique_id = f"vcf_{domain_prefix}_{safe_domain_name}_{safe_hostname}_{resource_type}"
     
+    def resource_update_affects(self, update):
+        """Check if a partial refresh changed the data of this host."""
+        return update["domain"] or self._host_id in update["host_ids"]
+    
     def get_host_data(self):
         """Get data for this specific host."""
         try:
@@ -122,20 +204,7 @@ class VCFHostResourceBaseSensor(VCFResourceBaseSensor):
     def state(self):
         """Return the usage percentage for this host resource."""
         try:
-            host_data = self.get_host_data()
-            resource_info = host_data.get(self._resource_type, {})
-            
-            if self._resource_type == "cpu":
-                used_mhz = resource_info.get("used_mhz", 0)
-                total_mhz = resource_info.get("total_mhz", 1)
-                return round((used_mhz / total_mhz) * 100, 1) if total_mhz > 0 else 0
-            
-            elif self._resource_type in ["memory", "storage"]:
-                used_mb = resource_info.get("used_mb", 0)
-                total_mb = resource_info.get("total_mb", 1)
-                return round((used_mb / total_mb) * 100, 1) if total_mb > 0 else 0
-            
-            return 0
+            return host_usage_percent(self.get_host_data(), self._resource_type)
         except Exception as e:
             _LOGGER.error(f"Error getting {self._resource_type} state for host {self._hostname}: {e}")
             return 0
@@ -31,13 +31,15 @@ async def async_setup_entry(hass, config_entry, async_add_entities):
             coordinator = get_coordinator(hass, config_entry)
             hass.data.setdefault(_DOMAIN, {})["coordinator"] = coordinator
             
-        await coordinator.async_config_entry_first_refresh()
+        # The sensor platform usually refreshed it already, or seeded it from the snapshot
+        if coordinator.data is None:
+            await coordinator.async_config_entry_first_refresh()
         
         # Create binary sensors using manager
         sensor_manager = VCFBinarySensorManager(coordinator)
         entities = sensor_manager.create_binary_sensors()
         
-        async_add_entities(entities, True)
+        async_add_entities(entities)
     except Exception as e:
         _LOGGER.warning("Could not set up VCF binary sensors: %s", e)
 
@@ -134,6 +136,9 @@ class VCFConnectionBinarySensor(CoordinatorEntity, BinarySensorEntity):
                 if self._last_known_state is not None:
                     attributes["using_preserved_state"] = True
                 
+                if self.coordinator.data and self.coordinator.data.get("stale_since"):
+                    attributes["stale_since"] = self.coordinator.data["stale_since"]
+                
                 return attributes
             
             if not self.coordinator.data:
@@ -148,6 +153,10 @@ class VCFConnectionBinarySensor(CoordinatorEntity, BinarySensorEntity):
                 "api_outage_active": False
             })
             
+            # Data served from the preserved snapshot while the API is down
+            if self.coordinator.data.get("stale_since"):
+                attributes["stale_since"] = self.coordinator.data["stale_since"]
+            
             # Only add error if there actually is one
             coordinator_error = self.coordinator.data.get("error") if self.coordinator.data else None
             if coordinator_error:
@@ -161,6 +170,8 @@ class VCFConnectionBinarySensor(CoordinatorEntity, BinarySensorEntity):
 class VCFUpdatesAvailableBinarySensor(CoordinatorEntity, BinarySensorEntity):
     """Binary sensor to indicate if any VCF updates are available across all domains."""
 
+    _unrecorded_attributes = frozenset({"update_details"})
+
     def __init__(self, coordinator):
         super().__init__(coordinator)
         self.coordinator = coordinator
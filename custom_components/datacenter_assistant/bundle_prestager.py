@@ -0,0 +1,139 @@
+"""Background pre-staging of upgrade bundles during off-peak hours."""
+import asyncio
+import logging
+import time
+from typing import Dict, Any, Set, Tuple
+from homeassistant.util import dt as dt_util
+from .coordinator import request_upgrades_refresh
+from .utils import get_entry_option
+
+_LOGGER = logging.getLogger(__name__)
+
+# Seconds between download status checks of a pre-staged bundle
+STATUS_POLL_INTERVAL = 60
+
+# Seconds between checks whether the off-peak window has opened
+WINDOW_CHECK_INTERVAL = 300
+
+# Download states in which SDDC Manager is already fetching the bundle
+ACTIVE_DOWNLOAD_STATES = ("SCHEDULED", "IN_PROGRESS")
+
+# States a requested download may report before it is staged; PENDING until SDDC Manager picks it up
+WAITING_DOWNLOAD_STATES = ("PENDING",) + ACTIVE_DOWNLOAD_STATES
+
+# Seconds a single bundle download may take before it is given up on
+DOWNLOAD_TIMEOUT = 6 * 3600
+
+
+class VCFBundlePrestager:
+    """Download the bundles of a newly applicable release before anyone starts the upgrade.
+
+    Pre-staging is opt-in. Bundles are downloaded one at a time, and a new download
+    only starts inside the configured off-peak hours. A download that has started is
+    left to SDDC Manager to finish, even if the window closes in the meantime.
+    """
+
+    def __init__(self, upgrade_service):
+        self.hass = upgrade_service.hass
+        self.supervisor = upgrade_service.supervisor
+        self.vcf_client = upgrade_service.vcf_client
+        self.config_entry = upgrade_service.config_entry
+        self._seen_releases: Set[Tuple[str, str]] = set()
+        self._pending: Dict[str, str] = {}
+        self._worker = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(get_entry_option(self.config_entry, "prestage_bundles"))
+
+    def release_available(self, domain_id: str, next_release: Dict[str, Any]):
+        """Queue the bundles of a release the first time it becomes applicable to a domain."""
+        if not self.enabled or not next_release:
+            return
+
+        release_key = (domain_id, next_release.get("version"))
+        if release_key in self._seen_releases:
+            return
+        self._seen_releases.add(release_key)
+
+        queued = 0
+        for patch_bundle in next_release.get("patchBundles", []) or []:
+            bundle_id = patch_bundle.get("bundleId") if isinstance(patch_bundle, dict) else None
+            if bundle_id and bundle_id not in self._pending:
+                self._pending[bundle_id] = domain_id
+                queued += 1
+
+        _LOGGER.info(f"Domain {domain_id}: Queued {queued} bundles of VCF {next_release.get('version')} for pre-staging")
+
+        if self._pending and self._worker is None:
+            self._worker = self.supervisor.create_task(self._run(), "bundle_prestager")
+
+    def in_off_peak_window(self) -> bool:
+        """Check if the local time is inside the configured off-peak hours."""
+        start_hour = int(get_entry_option(self.config_entry, "prestage_start_hour"))
+        end_hour = int(get_entry_option(self.config_entry, "prestage_end_hour"))
+        hour = dt_util.now().hour
+
+        if start_hour == end_hour:
+            return True
+        if start_hour < end_hour:
+            return start_hour <= hour < end_hour
+        # Window wraps around midnight, e.g. 22-6
+        return hour >= start_hour or hour < end_hour
+
+    async def _run(self):
+        """Download queued bundles one at a time."""
+        try:
+            while self._pending:
+                if not self.enabled:
+                    _LOGGER.info("Bundle pre-staging was disabled, dropping queued bundles")
+                    self._pending.clear()
+                    break
+
+                if not self.in_off_peak_window():
+                    await asyncio.sleep(WINDOW_CHECK_INTERVAL)
+                    continue
+
+                bundle_id, domain_id = next(iter(self._pending.items()))
+                try:
+                    await self._download(domain_id, bundle_id)
+                except Exception as e:
+                    _LOGGER.warning(f"Domain {domain_id}: Pre-staging of bundle {bundle_id} failed: {e}")
+                finally:
+                    self._pending.pop(bundle_id, None)
+        finally:
+            self._worker = None
+
+    async def _download(self, domain_id: str, bundle_id: str):
+        """Download one bundle and wait until it is staged."""
+        bundle_status = await self.vcf_client.api_request(f"/v1/bundles/{bundle_id}")
+        download_status = bundle_status.get("downloadStatus")
+
+        if download_status == "SUCCESSFUL":
+            _LOGGER.debug(f"Domain {domain_id}: Bundle {bundle_id} already staged")
+            return
+        if download_status == "RECALLED":
+            raise Exception("Bundle was recalled")
+
+        if download_status not in ACTIVE_DOWNLOAD_STATES:
+            _LOGGER.info(f"Domain {domain_id}: Pre-staging bundle {bundle_id}")
+            await self.vcf_client.api_request(
+                f"/v1/bundles/{bundle_id}", method="PATCH",
+                data={"bundleDownloadSpec": {"downloadNow": True}}
+            )
+
+        deadline = time.monotonic() + DOWNLOAD_TIMEOUT
+        while True:
+            if time.monotonic() >= deadline:
+                raise Exception(f"Bundle download did not finish within {DOWNLOAD_TIMEOUT // 3600} hours")
+            await asyncio.sleep(STATUS_POLL_INTERVAL)
+            bundle_status = await self.vcf_client.api_request(f"/v1/bundles/{bundle_id}")
+            download_status = bundle_status.get("downloadStatus")
+
+            if download_status == "SUCCESSFUL":
+                _LOGGER.info(f"Domain {domain_id}: Bundle {bundle_id} pre-staged")
+                request_upgrades_refresh(self.hass, f"bundle {bundle_id} downloaded")
+                return
+            if download_status not in WAITING_DOWNLOAD_STATES:
+                # FAILED, RECALLED or a state this integration does not know
+                raise Exception(f"Bundle download ended with status {download_status}")
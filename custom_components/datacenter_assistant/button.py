@@ -11,6 +11,7 @@ from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from .coordinator import get_coordinator
 from .vcf_api import VCFAPIClient
 from .upgrade_service import VCFUpgradeService
+from .entity_materializer import VCFEntityMaterializer
 
 _LOGGER = logging.getLogger(__name__)
 _DOMAIN = "datacenter_assistant"
@@ -38,6 +39,7 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_e
         hass.data.setdefault(_DOMAIN, {})["coordinator"] = coordinator
     
     button_manager = VCFButtonManager(hass, entry)
+    await button_manager.upgrade_service.scheduler.async_start()
     
     # Create initial static buttons
     static_buttons = [
@@ -51,41 +53,22 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_e
     hass.data.setdefault(_DOMAIN, {})["button_manager"] = button_manager
     hass.data.setdefault(_DOMAIN, {})["button_async_add_entities"] = async_add_entities
     
-    # Set up dynamic button creation when coordinator data changes
-    existing_domain_buttons = set()
-    
-    async def create_domain_buttons():
-        """Create domain-specific buttons dynamically."""
-        if coordinator.data and coordinator.data.get("domain_updates"):
-            new_buttons = []
-            for domain_id, domain_data in coordinator.data["domain_updates"].items():
-                if domain_id not in existing_domain_buttons:
-                    domain_name = domain_data.get("domain_name", "Unknown")
-                    domain_prefix = domain_data.get("domain_prefix", f"domain{len(existing_domain_buttons) + 1}")
-                    
-                    new_buttons.extend([
-                        VCFDomainUpgradeButton(hass, entry, coordinator, button_manager.upgrade_service, 
-                                             domain_id, domain_name, domain_prefix),
-                        VCFDomainAcknowledgeButton(hass, entry, coordinator, button_manager.upgrade_service, 
-                                                 domain_id, domain_name, domain_prefix)
-                    ])
-                    existing_domain_buttons.add(domain_id)
-            
-            if new_buttons:
-                _LOGGER.info(f"Adding {len(new_buttons)} domain buttons")
-                async_add_entities(new_buttons, True)
-    
-    # Add listener for coordinator updates
-    def coordinator_update_callback():
-        # Schedule task on event loop (thread-safe)
-        hass.loop.call_soon_threadsafe(
-            lambda: hass.async_create_task(create_domain_buttons())
-        )
-    
-    coordinator.async_add_listener(coordinator_update_callback)
-    
-    # Schedule initial button creation
-    hass.loop.call_later(2.0, lambda: hass.async_create_task(create_domain_buttons()))
+    # Domain buttons follow the coordinator data
+    def build_domain_buttons(domain_id, domain_data):
+        domain_name = domain_data.get("domain_name", "Unknown")
+        domain_prefix = domain_data.get("domain_prefix", f"domain{len(materializer.known_keys) + 1}")
+        return [
+            VCFDomainUpgradeButton(hass, entry, coordinator, button_manager.upgrade_service, 
+                                 domain_id, domain_name, domain_prefix),
+            VCFDomainAcknowledgeButton(hass, entry, coordinator, button_manager.upgrade_service, 
+                                     domain_id, domain_name, domain_prefix)
+        ]
+    
+    materializer = VCFEntityMaterializer(
+        hass, coordinator, "domain button", async_add_entities,
+        lambda data: data.get("domain_updates", {}), build_domain_buttons
+    )
+    materializer.async_start()
 
 
 class VCFRefreshTokenButton(ButtonEntity):
@@ -0,0 +1,233 @@
+"""Parallel ESX host cluster upgrades for VCF domains."""
+import asyncio
+import logging
+import time
+from typing import Dict, Any, List
+from .utils import get_entry_option
+
+_LOGGER = logging.getLogger(__name__)
+
+# Seconds between upgrade status checks of a running cluster upgrade
+STATUS_POLL_INTERVAL = 30
+
+# Seconds a single cluster upgrade may run before it is given up on
+CLUSTER_UPGRADE_TIMEOUT = 24 * 3600
+
+# Upgrade states in which a cluster upgrade has ended without success
+UPGRADE_FAILED_STATES = ("FAILED", "COMPLETED_WITH_FAILURE", "CANCELLED")
+
+# Upgradable status of a resource that still needs the bundle
+UPGRADABLE_AVAILABLE = "AVAILABLE"
+
+
+class VCFClusterUpgradeScheduler:
+    """Run ESX cluster upgrades in parallel within configured capacity limits.
+
+    Two limits apply at once: the total number of clusters upgrading across all
+    domains, and the number of clusters upgrading within one domain. Both are read
+    from the config entry options every time a slot is requested, so changes apply
+    to clusters that have not started yet.
+    """
+
+    def __init__(self, upgrade_service):
+        self.upgrade_service = upgrade_service
+        self.vcf_client = upgrade_service.vcf_client
+        self.config_entry = upgrade_service.config_entry
+        self._slots = asyncio.Condition()
+        self._running_total = 0
+        self._running_by_domain: Dict[str, int] = {}
+        self._cluster_states: Dict[str, Dict[str, Dict[str, Any]]] = {}
+
+    def get_cluster_states(self, domain_id: str) -> List[Dict[str, Any]]:
+        """Get the per-cluster upgrade state of a domain."""
+        return list(self._cluster_states.get(domain_id, {}).values())
+
+    async def upgrade_domain_clusters(self, domain_id: str, bundle_id: str):
+        """Upgrade all upgradable clusters of a domain with one ESX bundle."""
+        clusters = await self._get_upgradable_clusters(domain_id)
+        if not clusters:
+            raise Exception("No upgradable clusters found")
+
+        clusters = await self._filter_clusters_needing_bundle(domain_id, bundle_id, clusters)
+        if not clusters:
+            self.upgrade_service.add_upgrade_log(domain_id, f"All ESX clusters already have bundle {bundle_id}, nothing to upgrade")
+            return
+
+        self._cluster_states[domain_id] = {
+            cluster_id: {
+                "cluster_id": cluster_id,
+                "cluster_name": self._cluster_name(domain_id, cluster_id),
+                "status": "queued",
+                "upgrade_id": None,
+                "upgrade_status": None,
+                "started_at": None,
+                "finished_at": None,
+                "error": None
+            }
+            for cluster_id in clusters
+        }
+        self.upgrade_service._notify_progress(domain_id)
+
+        _LOGGER.info(
+            f"Domain {domain_id}: Upgrading {len(clusters)} clusters with bundle {bundle_id} "
+            f"(max {self._max_per_domain()} per domain, {self._max_total()} in total)"
+        )
+
+        await asyncio.gather(*(
+            self._upgrade_cluster(domain_id, bundle_id, cluster_id) for cluster_id in clusters
+        ))
+
+        failed = [state for state in self.get_cluster_states(domain_id) if state["status"] == "failed"]
+        if failed:
+            names = ", ".join(state["cluster_name"] for state in failed)
+            raise Exception(f"{len(failed)} of {len(clusters)} cluster upgrades failed: {names}")
+
+    async def _get_upgradable_clusters(self, domain_id: str) -> List[str]:
+        """Get the IDs of the clusters that can be upgraded in a domain."""
+        clusters_response = await self.vcf_client.api_request(f"/v1/upgradables/domains/{domain_id}/clusters")
+
+        cluster_ids = []
+        for element in clusters_response.get("elements", []):
+            if not isinstance(element, dict) or not element.get("resourceId"):
+                continue
+            if element.get("resourceType", "CLUSTER") != "CLUSTER":
+                continue
+            # Primary (management) cluster first, like SDDC Manager orders them
+            if element.get("primaryCluster"):
+                cluster_ids.insert(0, element["resourceId"])
+            else:
+                cluster_ids.append(element["resourceId"])
+
+        return cluster_ids
+
+    async def _filter_clusters_needing_bundle(self, domain_id: str, bundle_id: str, cluster_ids: List[str]) -> List[str]:
+        """Drop the clusters whose upgradable for the bundle is no longer available, e.g. already upgraded.
+
+        Clusters without a per-cluster upgradable for the bundle are kept, as is everything
+        when the upgradables cannot be read.
+        """
+        try:
+            upgradables_response = await self.vcf_client.api_request(f"/v1/upgradables/domains/{domain_id}")
+        except Exception as e:
+            _LOGGER.warning(f"Domain {domain_id}: Could not read upgradables, upgrading all clusters: {e}")
+            return cluster_ids
+
+        cluster_status = {}
+        for element in upgradables_response.get("elements", []):
+            if not isinstance(element, dict) or element.get("bundleId") != bundle_id:
+                continue
+            resource = element.get("resource") or {}
+            if resource.get("type") == "CLUSTER" and resource.get("resourceId"):
+                cluster_status[resource["resourceId"]] = element.get("status")
+
+        needed = []
+        for cluster_id in cluster_ids:
+            status = cluster_status.get(cluster_id, UPGRADABLE_AVAILABLE)
+            if status == UPGRADABLE_AVAILABLE:
+                needed.append(cluster_id)
+            else:
+                _LOGGER.info(f"Domain {domain_id}: Skipping cluster {cluster_id}, bundle {bundle_id} is {status}")
+        return needed
+
+    async def _upgrade_cluster(self, domain_id: str, bundle_id: str, cluster_id: str):
+        """Upgrade one cluster once a capacity slot is free. Failures are recorded, not raised."""
+        state = self._cluster_states[domain_id][cluster_id]
+
+        await self._acquire_slot(domain_id)
+        try:
+            state["status"] = "running"
+            state["started_at"] = time.time()
+            self.upgrade_service.add_upgrade_log(domain_id, f"Upgrading ESX cluster {state['cluster_name']}...")
+            self.upgrade_service._notify_progress(domain_id)
+
+            upgrade_data = {
+                "bundleId": bundle_id,
+                "resourceType": "CLUSTER",
+                "resourceUpgradeSpecs": [{
+                    "resourceId": cluster_id,
+                    "upgradeNow": True
+                }]
+            }
+
+            upgrade_response = await self.vcf_client.api_request("/v1/upgrades", method="POST", data=upgrade_data)
+            upgrade_id = upgrade_response.get("id")
+            if not upgrade_id:
+                raise Exception("No upgrade ID returned")
+            state["upgrade_id"] = upgrade_id
+
+            await self._monitor_cluster_upgrade(domain_id, state)
+
+            state["status"] = "completed"
+            self.upgrade_service.add_upgrade_log(domain_id, f"ESX cluster {state['cluster_name']} upgraded successfully")
+            _LOGGER.info(f"Domain {domain_id}: Cluster {cluster_id} upgrade completed")
+
+        except Exception as e:
+            state["status"] = "failed"
+            state["error"] = str(e)
+            self.upgrade_service.add_upgrade_log(
+                domain_id, f"ESX cluster {state['cluster_name']} upgrade failed: {e}", level="error"
+            )
+            _LOGGER.error(f"Domain {domain_id}: Cluster {cluster_id} upgrade failed: {e}")
+
+        finally:
+            state["finished_at"] = time.time()
+            self.upgrade_service._notify_progress(domain_id)
+            await self._release_slot(domain_id)
+
+    async def _monitor_cluster_upgrade(self, domain_id: str, state: Dict[str, Any]):
+        """Poll the cluster upgrade until it finishes or times out."""
+        deadline = time.monotonic() + CLUSTER_UPGRADE_TIMEOUT
+        while True:
+            if time.monotonic() >= deadline:
+                raise Exception(f"Cluster upgrade did not finish within {CLUSTER_UPGRADE_TIMEOUT // 3600} hours")
+            await asyncio.sleep(STATUS_POLL_INTERVAL)
+
+            try:
+                status_response = await self.vcf_client.api_request(f"/v1/upgrades/{state['upgrade_id']}")
+            except Exception as api_error:
+                # SDDC Manager keeps upgrading the cluster; the slot stays taken until a final status
+                _LOGGER.warning(f"Domain {domain_id}: Could not read upgrade status of cluster {state['cluster_id']}, retrying: {api_error}")
+                continue
+            status = status_response.get("status")
+
+            if status != state["upgrade_status"]:
+                state["upgrade_status"] = status
+                self.upgrade_service._notify_progress(domain_id)
+
+            if status == "COMPLETED_WITH_SUCCESS":
+                return
+            if status in UPGRADE_FAILED_STATES:
+                raise Exception(f"Cluster upgrade finished with status: {status}")
+
+    async def _acquire_slot(self, domain_id: str):
+        """Wait until both the total and the per-domain capacity allow another cluster."""
+        async with self._slots:
+            await self._slots.wait_for(
+                lambda: self._running_total < self._max_total()
+                and self._running_by_domain.get(domain_id, 0) < self._max_per_domain()
+            )
+            self._running_total += 1
+            self._running_by_domain[domain_id] = self._running_by_domain.get(domain_id, 0) + 1
+
+    async def _release_slot(self, domain_id: str):
+        """Free a capacity slot and wake waiting clusters."""
+        async with self._slots:
+            self._running_total -= 1
+            self._running_by_domain[domain_id] -= 1
+            self._slots.notify_all()
+
+    def _max_total(self) -> int:
+        return max(1, int(get_entry_option(self.config_entry, "esx_max_parallel_clusters")))
+
+    def _max_per_domain(self) -> int:
+        return max(1, int(get_entry_option(self.config_entry, "esx_max_clusters_per_domain")))
+
+    def _cluster_name(self, domain_id: str, cluster_id: str) -> str:
+        """Look up a cluster name from the resource coordinator data."""
+        resource_coordinator = self.upgrade_service.hass.data.get("datacenter_assistant", {}).get("resource_coordinator")
+        if resource_coordinator and resource_coordinator.data:
+            domain_resources = resource_coordinator.data.get("domain_resources", {}).get(domain_id, {})
+            for cluster in domain_resources.get("clusters", []):
+                if cluster.get("id") == cluster_id:
+                    return cluster.get("name", cluster_id)
+        return cluster_id
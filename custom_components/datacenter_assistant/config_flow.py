@@ -1,7 +1,10 @@
 from homeassistant import config_entries
+from homeassistant.core import callback
 import voluptuous as vol
 import logging
 from . import DOMAIN
+from .utils import get_entry_option
+from .upgrade_scheduler import MaintenanceWindow
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -47,3 +50,100 @@ class DataCenterAssistantConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             }),
             errors=errors
         )
+
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry):
+        """Get the options flow for this handler."""
+        return DataCenterAssistantOptionsFlow(config_entry)
+
+
+class DataCenterAssistantOptionsFlow(config_entries.OptionsFlow):
+    """Handle upgrade options for DataCenter Assistant."""
+
+    def __init__(self, config_entry):
+        self._entry = config_entry
+
+    async def async_step_init(self, user_input=None):
+        """Manage the options."""
+        errors = {}
+
+        if user_input is not None:
+            maintenance_window = user_input.get("maintenance_window", "").strip()
+            if maintenance_window:
+                try:
+                    MaintenanceWindow(maintenance_window)
+                except ValueError as e:
+                    _LOGGER.warning(f"Invalid maintenance window: {e}")
+                    errors["maintenance_window"] = "invalid_maintenance_window"
+
+            if not errors:
+                _LOGGER.info("Updating DataCenter Assistant options")
+                return self.async_create_entry(title="", data={
+                    **user_input,
+                    "maintenance_window": maintenance_window,
+                    "upgrade_target_version": user_input.get("upgrade_target_version", "").strip()
+                })
+
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema({
+                vol.Required(
+                    "esx_max_parallel_clusters",
+                    default=get_entry_option(self._entry, "esx_max_parallel_clusters")
+                ): vol.All(vol.Coerce(int), vol.Range(min=1, max=32)),
+                vol.Required(
+                    "esx_max_clusters_per_domain",
+                    default=get_entry_option(self._entry, "esx_max_clusters_per_domain")
+                ): vol.All(vol.Coerce(int), vol.Range(min=1, max=32)),
+                vol.Required(
+                    "nsx_host_clusters_parallel",
+                    default=get_entry_option(self._entry, "nsx_host_clusters_parallel")
+                ): bool,
+                vol.Required(
+                    "nsx_host_parallel_upgrade",
+                    default=get_entry_option(self._entry, "nsx_host_parallel_upgrade")
+                ): bool,
+                vol.Required(
+                    "nsx_live_upgrade",
+                    default=get_entry_option(self._entry, "nsx_live_upgrade")
+                ): bool,
+                vol.Required(
+                    "prestage_bundles",
+                    default=get_entry_option(self._entry, "prestage_bundles")
+                ): bool,
+                vol.Required(
+                    "prestage_start_hour",
+                    default=get_entry_option(self._entry, "prestage_start_hour")
+                ): vol.All(vol.Coerce(int), vol.Range(min=0, max=23)),
+                vol.Required(
+                    "prestage_end_hour",
+                    default=get_entry_option(self._entry, "prestage_end_hour")
+                ): vol.All(vol.Coerce(int), vol.Range(min=0, max=23)),
+                vol.Optional(
+                    "maintenance_window",
+                    default=get_entry_option(self._entry, "maintenance_window")
+                ): str,
+                vol.Required(
+                    "upgrade_run_ahead_hours",
+                    default=get_entry_option(self._entry, "upgrade_run_ahead_hours")
+                ): vol.All(vol.Coerce(int), vol.Range(min=0, max=168)),
+                vol.Required(
+                    "precheck_max_age_minutes",
+                    default=get_entry_option(self._entry, "precheck_max_age_minutes")
+                ): vol.All(vol.Coerce(int), vol.Range(min=0, max=10080)),
+                vol.Optional(
+                    "upgrade_target_version",
+                    default=get_entry_option(self._entry, "upgrade_target_version")
+                ): str,
+                vol.Required(
+                    "compact_host_sensors",
+                    default=get_entry_option(self._entry, "compact_host_sensors")
+                ): bool,
+                vol.Optional(
+                    "host_sensor_allowlist",
+                    default=get_entry_option(self._entry, "host_sensor_allowlist")
+                ): str,
+            }),
+            errors=errors
+        )
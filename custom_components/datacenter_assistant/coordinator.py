@@ -3,14 +3,47 @@ import aiohttp
 import logging
 import time
 from datetime import timedelta
+from homeassistant.core import callback
+from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
-from .utils import truncate_description, version_tuple
-from .vcf_api import VCFAPIClient, VCFDomain
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+from .utils import truncate_description, get_entry_option, resource_update_signal, RESOURCE_SNAPSHOT_SIGNAL
+from .vcf_api import VCFAPIClient, VCFDomain, VCFLivenessProber, VCFReleaseCatalog
+from .upgrade_path import VCFUpgradePathSolver
+from .task_supervisor import get_task_supervisor
 
 _LOGGER = logging.getLogger(__name__)
 _DOMAIN = "datacenter_assistant"
 
+# Maximum number of domains whose releases are checked at the same time
+MAX_PARALLEL_DOMAIN_CHECKS = 4
+
+# Safety-net polling of the upgrades coordinator; normally it refreshes on triggers
+UPGRADES_REFRESH_INTERVAL = timedelta(hours=6)
+
+# How often /v1/tasks is checked for upgrades finished outside of this integration
+UPGRADE_TASK_WATCH_INTERVAL = timedelta(minutes=5)
+
+# Task states that mean an upgrade task has finished and versions may have changed
+FINISHED_TASK_STATES = ("SUCCESSFUL", "COMPLETED_WITH_WARNING")
+
+# Overlap between /v1/tasks check windows, covering clock skew to SDDC Manager (ms)
+UPGRADE_TASK_WATCH_OVERLAP = 60 * 1000
+
+# Page size of the /v1/tasks check (maximum allowed by the API)
+UPGRADE_TASK_WATCH_PAGE_SIZE = 100
+
+# Last known inventory, used to create entities at startup before the first refresh
+SNAPSHOT_STORAGE_KEY = "datacenter_assistant.snapshot"
+SNAPSHOT_STORAGE_VERSION = 1
+
+# Minimum seconds between snapshot writes (resources refresh every few seconds)
+SNAPSHOT_SAVE_INTERVAL = 300
+
 
 class VCFCoordinatorManager:
     """Manager class for VCF coordinators to handle upgrades and resources."""
@@ -20,6 +53,7 @@ class VCFCoordinatorManager:
         self.config_entry = config_entry
         self.vcf_client = VCFAPIClient(hass, config_entry)
         self._domain_cache = {}
+        self.path_solver = VCFUpgradePathSolver()
         
         # State preservation for API outages during upgrades
         self._last_successful_data = None
@@ -28,14 +62,37 @@ class VCFCoordinatorManager:
         self._is_sddc_upgrade_in_progress = False
         self._outage_timeout = 7200  # 2 hour timeout for SDDC Manager upgrades
         
+        # Outage mode: polling is paused while a shared, rate-limited probe fails
+        self._prober = VCFLivenessProber(self.vcf_client)
+        self._probe_interval = 30
+        self._last_probe_time = 0
+        self._last_probe_result = True
+        self._stale_since = {"upgrades": None, "resources": None}
+        
+        # Coordinators driven by this manager, set by get_coordinator
+        self.coordinator = None
+        self.resource_coordinator = None
+        
+        # Start of the next /v1/tasks check window (ms) and the upgrade tasks seen in the last one
+        self._upgrade_task_watch_since = None
+        self._seen_upgrade_task_ids = set()
+        
+        # Persisted snapshot of both coordinators
+        self._snapshot_store = Store(hass, SNAPSHOT_STORAGE_VERSION, SNAPSHOT_STORAGE_KEY)
+        self._last_snapshot_save = 0
+        
         # Set up event listeners for API outage notifications
         self._setup_api_outage_listeners()
     
     def _setup_api_outage_listeners(self):
         """Set up event listeners for API outage notifications from upgrade service."""
-        self.hass.bus.async_listen("vcf_api_outage_expected", self._handle_api_outage_expected)
-        self.hass.bus.async_listen("vcf_api_restored", self._handle_api_restored)
+        supervisor = get_task_supervisor(self.hass)
+        supervisor.track("api_outage_expected_listener",
+                         self.hass.bus.async_listen("vcf_api_outage_expected", self._handle_api_outage_expected))
+        supervisor.track("api_restored_listener",
+                         self.hass.bus.async_listen("vcf_api_restored", self._handle_api_restored))
     
+    @callback
     def _handle_api_outage_expected(self, event):
         """Handle notification of expected API outage."""
         reason = event.data.get("reason", "unknown")
@@ -45,16 +102,156 @@ class VCFCoordinatorManager:
             _LOGGER.info(f"Received API outage notification for domain {domain_id} due to SDDC Manager upgrade")
             self._is_sddc_upgrade_in_progress = True
             self._api_outage_start_time = time.time()
+            self._last_probe_time = 0
     
+    @callback
     def _handle_api_restored(self, event):
         """Handle notification of API restoration."""
         reason = event.data.get("reason", "unknown")
         domain_id = event.data.get("domain_id", "unknown")
         
         _LOGGER.info(f"Received API restoration notification for domain {domain_id}, reason: {reason}")
+        self._end_outage_mode()
+        
+        # Resume with fresh data right away instead of waiting for the next interval
+        for coordinator in (self.coordinator, self.resource_coordinator):
+            if coordinator:
+                self.hass.async_create_task(coordinator.async_request_refresh())
+    
+    async def async_load_snapshot(self):
+        """Seed both coordinators with the persisted inventory, marked stale.
+        
+        Returns True when a snapshot was loaded, so the first network refresh can
+        run in the background instead of delaying setup.
+        """
+        try:
+            snapshot = await self._snapshot_store.async_load()
+        except Exception as e:
+            _LOGGER.warning(f"Could not load persisted VCF snapshot: {e}")
+            return False
+        
+        if not isinstance(snapshot, dict) or not snapshot.get("upgrades") or not snapshot.get("resources"):
+            return False
+        
+        saved_at = snapshot.get("saved_at")
+        self._last_successful_data = snapshot["upgrades"]
+        self._last_successful_resource_data = snapshot["resources"]
+        self._stale_since = {"upgrades": saved_at, "resources": saved_at}
+        
+        self.coordinator.async_set_updated_data({**snapshot["upgrades"], "stale_since": saved_at})
+        self.resource_coordinator.async_set_updated_data({**snapshot["resources"], "stale_since": saved_at})
+        _LOGGER.info(f"Loaded VCF snapshot from {saved_at} with {len(snapshot['upgrades'].get('domains', []))} domains")
+        return True
+    
+    @callback
+    def _schedule_snapshot_save(self):
+        """Persist the last successful data of both coordinators, at most every few minutes."""
+        if not self._last_successful_data or not self._last_successful_resource_data:
+            return
+        
+        now = time.monotonic()
+        if self._last_snapshot_save and now - self._last_snapshot_save < SNAPSHOT_SAVE_INTERVAL:
+            return
+        self._last_snapshot_save = now
+        
+        self._snapshot_store.async_delay_save(lambda: {
+            "saved_at": dt_util.utcnow().isoformat(),
+            "upgrades": self._last_successful_data,
+            "resources": self._last_successful_resource_data
+        }, 1)
+    
+    @callback
+    def request_upgrades_refresh(self, reason):
+        """Refresh the upgrades coordinator because something relevant changed.
+        
+        Requests are debounced by the coordinator, so several triggers close together
+        cause a single refresh.
+        """
+        if self.coordinator is None:
+            return
+        _LOGGER.debug(f"Requesting upgrade data refresh: {reason}")
+        self.hass.async_create_task(self.coordinator.async_request_refresh())
+    
+    def start_upgrade_task_watch(self):
+        """Start checking /v1/tasks for finished upgrade tasks."""
+        get_task_supervisor(self.hass).track(
+            "upgrade_task_watch",
+            async_track_time_interval(self.hass, self._async_check_upgrade_tasks, UPGRADE_TASK_WATCH_INTERVAL)
+        )
+    
+    async def _async_check_upgrade_tasks(self, now=None):
+        """Refresh upgrade data when an upgrade task finished since the last check.
+        
+        Only tasks completed since the previous check are requested, so the response
+        stays small regardless of the task history of SDDC Manager.
+        """
+        if self._in_outage_mode():
+            return
+        
+        check_started = int(time.time() * 1000)
+        if self._upgrade_task_watch_since is None:
+            # First check only records where we start from
+            self._upgrade_task_watch_since = check_started
+            return
+        
+        try:
+            tasks_data = await self.vcf_client.api_request("/v1/tasks", params={
+                "completedAfter": self._upgrade_task_watch_since - UPGRADE_TASK_WATCH_OVERLAP,
+                "pageSize": UPGRADE_TASK_WATCH_PAGE_SIZE
+            })
+        except Exception as e:
+            _LOGGER.debug(f"Could not check upgrade tasks: {e}")
+            return
+        self._upgrade_task_watch_since = check_started
+        
+        finished_ids = {
+            task.get("id")
+            for task in tasks_data.get("elements", [])
+            if isinstance(task, dict)
+            and str(task.get("status", "")).upper() in FINISHED_TASK_STATES
+            and "UPGRADE" in f"{task.get('type', '')} {task.get('name', '')}".upper()
+        }
+        # Tasks in the overlap of two windows are reported twice
+        new_ids = finished_ids - self._seen_upgrade_task_ids
+        self._seen_upgrade_task_ids = finished_ids
+        if new_ids:
+            self.request_upgrades_refresh(f"{len(new_ids)} upgrade tasks finished")
+    
+    def _end_outage_mode(self):
+        """Leave outage mode and resume normal polling."""
         self._is_sddc_upgrade_in_progress = False
         self._api_outage_start_time = None
     
+    def _in_outage_mode(self):
+        """Check if an expected API outage is active and within its timeout."""
+        if not self._is_sddc_upgrade_in_progress or not self._api_outage_start_time:
+            return False
+        
+        if time.time() - self._api_outage_start_time >= self._outage_timeout:
+            _LOGGER.warning("API outage timeout exceeded, resuming normal polling")
+            self._end_outage_mode()
+            return False
+        
+        return True
+    
+    async def _api_answers(self):
+        """Probe the API, sharing the result between coordinators for a short interval."""
+        now = time.monotonic()
+        if now - self._last_probe_time >= self._probe_interval:
+            self._last_probe_time = now
+            self._last_probe_result = await self._prober.probe()
+            _LOGGER.debug(f"API liveness probe during outage mode: {'up' if self._last_probe_result else 'down'}")
+        return self._last_probe_result
+    
+    def _stale_snapshot(self, kind, snapshot, empty_data):
+        """Return the preserved snapshot marked with the time it became stale."""
+        if self._stale_since[kind] is None:
+            self._stale_since[kind] = dt_util.utcnow().isoformat()
+        
+        data = dict(snapshot) if snapshot else dict(empty_data)
+        data["stale_since"] = self._stale_since[kind]
+        return data
+    
     def _is_upgrade_in_progress(self):
         """Check if any domain has an SDDC Manager upgrade in progress."""
         try:
@@ -77,15 +274,8 @@ class VCFCoordinatorManager:
         """Determine if we should preserve the last known state during an API error."""
         try:
             # Primary check: Are we in a known SDDC upgrade state via events?
-            if self._is_sddc_upgrade_in_progress and self._api_outage_start_time:
-                # Check if we're within the timeout window
-                if time.time() - self._api_outage_start_time < self._outage_timeout:
-                    return True
-                else:
-                    _LOGGER.warning("API outage timeout exceeded, resuming normal error handling")
-                    self._api_outage_start_time = None
-                    self._is_sddc_upgrade_in_progress = False
-                    return False
+            if self._in_outage_mode():
+                return True
             
             # Fallback check: Look for SDDC Manager upgrade in progress (less reliable)
             if self._is_upgrade_in_progress():
@@ -123,6 +313,11 @@ class VCFCoordinatorManager:
             _LOGGER.warning("VCF not configured with URL")
             return {"domains": [], "domain_updates": {}}
 
+        # Skip the network round-trips while the API is known to be down
+        if self._in_outage_mode() and not await self._api_answers():
+            _LOGGER.debug("SDDC Manager API unavailable, serving preserved upgrade data")
+            return self._stale_snapshot("upgrades", self._last_successful_data, {"domains": [], "domain_updates": {}})
+
         try:
             # Get active domains
             domains = await self.get_active_domains()
@@ -142,12 +337,13 @@ class VCFCoordinatorManager:
                 "domain_updates": domain_updates
             }
             self._last_successful_data = current_data
+            self._stale_since["upgrades"] = None
+            self._schedule_snapshot_save()
             
             # Reset outage tracking on successful fetch
             if self._api_outage_start_time and not self._is_upgrade_in_progress():
                 _LOGGER.info("API connectivity restored, resuming normal operations")
-                self._api_outage_start_time = None
-                self._is_sddc_upgrade_in_progress = False
+                self._end_outage_mode()
             
             return current_data
             
@@ -158,7 +354,7 @@ class VCFCoordinatorManager:
             if self._should_preserve_state(e):
                 if self._last_successful_data:
                     _LOGGER.info("Preserving last known state during SDDC Manager upgrade API outage")
-                    return self._last_successful_data
+                    return self._stale_snapshot("upgrades", self._last_successful_data, {"domains": [], "domain_updates": {}})
                 else:
                     _LOGGER.warning("No previous state to preserve during API outage")
             
@@ -175,46 +371,102 @@ class VCFCoordinatorManager:
                     break
     
     async def _check_domain_updates(self, domains):
-        """Check for updates across all domains."""
-        domain_updates = {}
+        """Check for updates across all domains, several requests at a time.
         
-        for domain in domains:
-            try:
-                # Get current version
-                releases_data = await self.vcf_client.api_request("/v1/releases", params={"domainId": domain.id})
-                current_version = releases_data.get("elements", [{}])[0].get("version") if releases_data.get("elements") else None
-                
-                if not current_version:
-                    domain.set_update_info(None, "error")
-                    domain_updates[domain.id] = domain.update_dict()
-                    continue
-                
-                # Set current version on domain BEFORE calling find_applicable_releases
-                domain.current_version = current_version
-                _LOGGER.debug(f"Domain {domain.name}: Set current version to {current_version}")
-                
-                # Get future releases and find applicable ones
-                future_releases_data = await self.vcf_client.api_request(f"/v1/releases/domains/{domain.id}/future-releases")
-                future_releases = future_releases_data.get("elements", [])
-                _LOGGER.debug(f"Domain {domain.name}: Retrieved {len(future_releases)} future releases")
-                
-                applicable_releases = domain.find_applicable_releases(future_releases)
-                _LOGGER.info(f"Domain {domain.name}: Found {len(applicable_releases)} applicable releases")
-                
-                if applicable_releases:
-                    applicable_releases.sort(key=lambda x: version_tuple(x.get("version", "0.0.0.0")))
-                    domain.set_update_info(current_version, "updates_available", applicable_releases[0])
+        Current versions are read first. Domains on the same version get identical
+        future releases, so each version is requested once and its catalog is shared.
+        """
+        semaphore = asyncio.Semaphore(MAX_PARALLEL_DOMAIN_CHECKS)
+        
+        async def limited(coro):
+            async with semaphore:
+                return await coro
+        
+        current_versions = await asyncio.gather(
+            *(limited(self._get_current_version(domain)) for domain in domains), return_exceptions=True
+        )
+        domains_by_version = {}
+        for domain, current_version in zip(domains, current_versions):
+            if isinstance(current_version, Exception):
+                _LOGGER.error(f"Error checking updates for domain {domain.name}: {current_version}")
+                domain.set_update_info(None, "error")
+            elif not current_version:
+                domain.set_update_info(None, "error")
+            else:
+                domains_by_version.setdefault(current_version, []).append(domain)
+        
+        versions = list(domains_by_version)
+        release_catalogs = await asyncio.gather(
+            *(limited(self._load_release_catalog(domains_by_version[version][0])) for version in versions),
+            return_exceptions=True
+        )
+        for version, release_catalog in zip(versions, release_catalogs):
+            for domain in domains_by_version[version]:
+                if isinstance(release_catalog, Exception):
+                    _LOGGER.error(f"Error checking updates for domain {domain.name}: {release_catalog}")
+                    domain.set_update_info(version, "error")
                 else:
-                    domain.set_update_info(current_version, "up_to_date")
-                
-                domain_updates[domain.id] = domain.update_dict()
-                
-            except Exception as e:
-                _LOGGER.error(f"Error checking updates for domain {domain.name}: {e}")
-                domain.set_update_info(current_version if 'current_version' in locals() else None, "error")
-                domain_updates[domain.id] = domain.update_dict()
+                    self._apply_release_catalog(domain, version, release_catalog)
+        
+        return {domain.id: domain.update_dict() for domain in domains}
+    
+    async def _get_current_version(self, domain):
+        """Get the current VCF version of a domain."""
+        releases_data = await self.vcf_client.api_request("/v1/releases", params={"domainId": domain.id})
+        return releases_data.get("elements", [{}])[0].get("version") if releases_data.get("elements") else None
+    
+    async def _load_release_catalog(self, domain):
+        """Request the future releases of a domain and index them."""
+        future_releases_data = await self.vcf_client.api_request(f"/v1/releases/domains/{domain.id}/future-releases")
+        release_catalog = VCFReleaseCatalog(future_releases_data.get("elements", []))
+        _LOGGER.debug(f"Domain {domain.name}: Retrieved {len(release_catalog)} future releases")
+        return release_catalog
+    
+    def _apply_release_catalog(self, domain, current_version, release_catalog):
+        """Set the update information of one domain. Errors are recorded on the domain, not raised."""
+        try:
+            # Set current version on domain BEFORE calling find_applicable_releases
+            domain.current_version = current_version
+            _LOGGER.debug(f"Domain {domain.name}: Set current version to {current_version}")
+            
+            applicable_releases = domain.find_applicable_releases(release_catalog)
+            _LOGGER.info(f"Domain {domain.name}: Found {len(applicable_releases)} applicable releases")
+            
+            domain.upgrade_path = self._solve_upgrade_path(domain, release_catalog)
+            
+            if applicable_releases:
+                next_release = applicable_releases[0]
+                # Follow the shortest path when its first hop can be installed now
+                if domain.upgrade_path and domain.upgrade_path["releases"][0] in applicable_releases:
+                    next_release = domain.upgrade_path["releases"][0]
+                domain.set_update_info(current_version, "updates_available", next_release)
+                self._prestage_release(domain.id, next_release)
+            else:
+                domain.set_update_info(current_version, "up_to_date")
+            
+        except Exception as e:
+            _LOGGER.error(f"Error checking updates for domain {domain.name}: {e}")
+            domain.set_update_info(current_version, "error")
+    
+    def _solve_upgrade_path(self, domain, release_catalog):
+        """Compute the shortest release path to the configured target (or latest) release."""
+        target_version = get_entry_option(self.config_entry, "upgrade_target_version") or None
+        try:
+            upgrade_path = self.path_solver.solve(release_catalog, domain.current_version, target_version)
+        except Exception as e:
+            _LOGGER.warning(f"Domain {domain.name}: Could not compute upgrade path: {e}")
+            return None
         
-        return domain_updates
+        if upgrade_path:
+            _LOGGER.info(f"Domain {domain.name}: Upgrade path to {upgrade_path['target_version']} "
+                         f"takes {upgrade_path['hops']} hops: {' -> '.join(upgrade_path['path'])}")
+        return upgrade_path
+    
+    def _prestage_release(self, domain_id, next_release):
+        """Hand a newly applicable release to the bundle pre-stager, if enabled."""
+        upgrade_service = self.hass.data.get(_DOMAIN, {}).get("upgrade_service")
+        if upgrade_service:
+            upgrade_service.prestager.release_available(domain_id, next_release)
     
     async def fetch_resources_data(self):
         """Fetch VCF domain resource information with state preservation during outages."""
@@ -224,6 +476,11 @@ class VCFCoordinatorManager:
             _LOGGER.warning("VCF not configured with URL")
             return {"domains": [], "domain_resources": {}}
 
+        # Skip the full inventory walk while the API is known to be down
+        if self._in_outage_mode() and not await self._api_answers():
+            _LOGGER.debug("SDDC Manager API unavailable, serving preserved resource data")
+            return self._stale_snapshot("resources", self._last_successful_resource_data, {"domains": [], "domain_resources": {}})
+
         try:
             # Get active domains (simpler structure for resources)
             domains_data = await self.vcf_client.api_request("/v1/domains")
@@ -241,11 +498,9 @@ class VCFCoordinatorManager:
                 "domain_resources": domain_resources
             }
             
-            # Update last successful data if this is not a preserved state fetch
-            if not hasattr(self, '_last_successful_resource_data'):
-                self._last_successful_resource_data = current_data
-            elif not self._is_sddc_upgrade_in_progress:
-                self._last_successful_resource_data = current_data
+            self._last_successful_resource_data = current_data
+            self._stale_since["resources"] = None
+            self._schedule_snapshot_save()
             
             return current_data
             
@@ -254,14 +509,108 @@ class VCFCoordinatorManager:
             
             # Check if we should preserve state during expected outage
             if self._should_preserve_state(e):
-                if hasattr(self, '_last_successful_resource_data') and self._last_successful_resource_data:
+                if self._last_successful_resource_data:
                     _LOGGER.info("Preserving last known resource state during SDDC Manager upgrade API outage")
-                    return self._last_successful_resource_data
+                    return self._stale_snapshot("resources", self._last_successful_resource_data, {"domains": [], "domain_resources": {}})
                 else:
                     _LOGGER.warning("No previous resource state to preserve during API outage")
             
             return {"domains": [], "domain_resources": {}, "error": str(e)}
     
+    async def async_refresh_subtree(self, domain_id=None, cluster_id=None, host_id=None):
+        """Re-fetch one domain, cluster or host and merge it into the resource snapshot.
+        
+        The coordinator listeners are not notified. The entity materializer diffs the
+        merged snapshot and only entities of the affected domain are signalled. Without
+        any ID, or when the ID is not in the snapshot, both coordinators are refreshed
+        completely. Raises HomeAssistantError when the refresh failed or was incomplete.
+        """
+        data = self.resource_coordinator.data if self.resource_coordinator else None
+        target = self._find_in_snapshot(data, domain_id, cluster_id, host_id) if data else None
+        
+        if target is None:
+            if domain_id or cluster_id or host_id:
+                _LOGGER.info(f"Resource {host_id or cluster_id or domain_id} not in current data, refreshing everything")
+            errors = []
+            for coordinator in (self.coordinator, self.resource_coordinator):
+                if coordinator:
+                    await coordinator.async_refresh()
+                    if not coordinator.last_update_success or (coordinator.data or {}).get("error"):
+                        errors.append((coordinator.data or {}).get("error") or f"{coordinator.name} update failed")
+            if errors:
+                raise HomeAssistantError(f"VCF refresh failed: {'; '.join(errors)}")
+            return
+        
+        found_domain_id, domain, cluster_index, host_index = target
+        domain_resources = dict(data["domain_resources"])
+        domain_data = dict(domain_resources[found_domain_id])
+        clusters = list(domain_data.get("clusters", []))
+        update = {"domain": False, "cluster_ids": set(), "host_ids": set()}
+        incomplete = False
+        
+        if host_id:
+            cluster = dict(clusters[cluster_index])
+            hosts = list(cluster["hosts"])
+            hosts[host_index] = await self._get_host_data(host_id)
+            cluster["hosts"] = hosts
+            clusters[cluster_index] = cluster
+            domain_data["clusters"] = clusters
+            update["host_ids"].add(host_id)
+        elif cluster_id:
+            old_cluster = clusters[cluster_index]
+            clusters[cluster_index] = await self._get_cluster_data(cluster_id)
+            domain_data["clusters"] = clusters
+            if clusters[cluster_index].get("incomplete"):
+                domain_data["incomplete"] = incomplete = True
+            update["cluster_ids"].add(cluster_id)
+            update["host_ids"].update(host.get("id") for host in old_cluster.get("hosts", []))
+            update["host_ids"].update(host.get("id") for host in clusters[cluster_index]["hosts"])
+        else:
+            domain_data = await self._get_domain_resource_data(domain)
+            incomplete = bool(domain_data.get("incomplete"))
+            update["domain"] = True
+        
+        domain_resources[found_domain_id] = domain_data
+        merged = {**data, "domain_resources": domain_resources}
+        # Assigned directly: async_set_updated_data would wake every resource entity
+        self.resource_coordinator.data = merged
+        if "stale_since" not in merged:
+            self._last_successful_resource_data = merged
+        
+        _LOGGER.debug(f"Domain {found_domain_id}: Refreshed resources of {host_id or cluster_id or 'the domain'}")
+        # Entities of new clusters and hosts first, so the per-domain signal reaches them too
+        async_dispatcher_send(self.hass, RESOURCE_SNAPSHOT_SIGNAL)
+        async_dispatcher_send(self.hass, resource_update_signal(found_domain_id), update)
+        
+        if incomplete:
+            raise HomeAssistantError(f"Resources of {host_id or cluster_id or found_domain_id} could only be read partially")
+    
+    @staticmethod
+    def _find_in_snapshot(data, domain_id=None, cluster_id=None, host_id=None):
+        """Locate a domain, cluster or host in resource data.
+        
+        Returns (domain_id, domain, cluster_index, host_index) or None when not found.
+        """
+        domains = {domain["id"]: domain for domain in data.get("domains", [])}
+        
+        for current_domain_id, domain_data in data.get("domain_resources", {}).items():
+            if domain_id and current_domain_id != domain_id:
+                continue
+            if current_domain_id not in domains:
+                continue
+            if not cluster_id and not host_id:
+                return current_domain_id, domains[current_domain_id], None, None
+            
+            for cluster_index, cluster in enumerate(domain_data.get("clusters", [])):
+                if cluster_id and cluster.get("id") != cluster_id:
+                    continue
+                if not host_id:
+                    return current_domain_id, domains[current_domain_id], cluster_index, None
+                for host_index, host in enumerate(cluster.get("hosts", [])):
+                    if host.get("id") == host_id:
+                        return current_domain_id, domains[current_domain_id], cluster_index, host_index
+        return None
+    
     def _extract_active_domains(self, domains_data):
         """Extract active domains with basic info."""
         active_domains = []
@@ -321,8 +670,12 @@ class VCFCoordinatorManager:
                 try:
                     cluster_data = await self._get_cluster_data(cluster_id)
                     domain_resource_data["clusters"].append(cluster_data)
+                    if cluster_data.get("incomplete"):
+                        domain_resource_data["incomplete"] = True
                 except Exception as e:
                     _LOGGER.error(f"Error getting cluster details for {cluster_id}: {e}")
+                    # Missing clusters must not be taken for removed ones
+                    domain_resource_data["incomplete"] = True
         
         return domain_resource_data
     
@@ -347,6 +700,7 @@ class VCFCoordinatorManager:
                     cluster_data["hosts"].append(host_data)
                 except Exception as e:
                     _LOGGER.error(f"Error getting host details for {host_id}: {e}")
+                    cluster_data["incomplete"] = True
         
         return cluster_data
     
@@ -393,7 +747,7 @@ def get_coordinator(hass, config_entry):
         _LOGGER,
         name="VCF Upgrades",
         update_method=coordinator_manager.fetch_upgrades_data,
-        update_interval=timedelta(minutes=15),
+        update_interval=UPGRADES_REFRESH_INTERVAL,
     )
     
     resource_coordinator = DataUpdateCoordinator(
@@ -404,15 +758,26 @@ def get_coordinator(hass, config_entry):
         update_interval=timedelta(seconds=10),
     )
 
-    # Store both coordinators globally for other components
+    coordinator_manager.coordinator = coordinator
+    coordinator_manager.resource_coordinator = resource_coordinator
+    coordinator_manager.start_upgrade_task_watch()
+
+    # Store both coordinators and their manager globally for other components
     hass.data.setdefault(_DOMAIN, {})["coordinator"] = coordinator
     hass.data.setdefault(_DOMAIN, {})["resource_coordinator"] = resource_coordinator
+    hass.data.setdefault(_DOMAIN, {})["coordinator_manager"] = coordinator_manager
     
     _LOGGER.info(f"Created VCF coordinators - Upgrades: {coordinator.name}, Resources: {resource_coordinator.name}")
     _LOGGER.info(f"Resource coordinator update interval: {resource_coordinator.update_interval}")
     
     return coordinator
 
+def request_upgrades_refresh(hass, reason):
+    """Ask the upgrades coordinator to refresh, if it has been set up."""
+    coordinator_manager = hass.data.get(_DOMAIN, {}).get("coordinator_manager")
+    if coordinator_manager:
+        coordinator_manager.request_upgrades_refresh(reason)
+
 def get_resource_coordinator(hass, config_entry):
     """Get the resource data update coordinator."""
     return hass.data.get(_DOMAIN, {}).get("resource_coordinator")
@@ -0,0 +1,41 @@
+"""Diagnostics support for the DataCenter Assistant integration."""
+from typing import Any, Dict
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from .task_supervisor import get_task_supervisor
+
+_DOMAIN = "datacenter_assistant"
+
+TO_REDACT = {"vcf_password", "vcf_token", "vcf_username"}
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry) -> Dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    domain_data = hass.data.get(_DOMAIN, {})
+    diagnostics = {
+        "entry": {
+            "data": async_redact_data(dict(entry.data), TO_REDACT),
+            "options": dict(entry.options)
+        },
+        "background_tasks": get_task_supervisor(hass).get_diagnostics()
+    }
+
+    for key in ("coordinator", "resource_coordinator"):
+        coordinator = domain_data.get(key)
+        if coordinator:
+            diagnostics[key] = {
+                "last_update_success": coordinator.last_update_success,
+                "update_interval": str(coordinator.update_interval),
+                "stale_since": coordinator.data.get("stale_since") if coordinator.data else None
+            }
+
+    upgrade_service = domain_data.get("upgrade_service")
+    if upgrade_service:
+        diagnostics["upgrades"] = {
+            domain_id: upgrade_service.get_upgrade_status(domain_id)
+            for domain_id in upgrade_service._upgrade_states
+        }
+        diagnostics["upgrade_queue"] = upgrade_service.scheduler.get_queue()
+
+    return diagnostics
@@ -1,10 +1,21 @@
 """Entity factory for creating VCF sensors."""
 import logging
-from .base_sensors import VCFDomainBaseSensor, VCFResourceBaseSensor, VCFHostResourceBaseSensor
-from .utils import safe_name_conversion
+from homeassistant.components.sensor import SensorDeviceClass
+from homeassistant.core import callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.util import dt as dt_util
+from .base_sensors import VCFDomainBaseSensor, VCFDomainUpgradeBaseSensor, VCFResourceBaseSensor, VCFHostResourceBaseSensor, host_usage_percent
+from .upgrade_log import NO_MESSAGES
+from .utils import safe_name_conversion, truncate_description, resource_update_signal
 
 _LOGGER = logging.getLogger(__name__)
 
+# Host metrics summarized by the cluster resource summary sensor
+SUMMARY_METRICS = ("cpu", "memory", "storage")
+
+# Number of busiest hosts listed per metric in the cluster resource summary
+SUMMARY_TOP_N = 5
+
 
 class VCFEntityFactory:
     """Factory class to create VCF sensor entities."""
@@ -15,50 +26,88 @@ class VCFEntityFactory:
         return [
             VCFDomainUpdateStatusSensor(coordinator, domain_id, domain_name, domain_prefix),
             VCFDomainUpgradeStatusSensor(coordinator, domain_id, domain_name, domain_prefix),
-            VCFDomainUpgradeLogsSensor(coordinator, domain_id, domain_name, domain_prefix)
+            VCFDomainUpgradeLogsSensor(coordinator, domain_id, domain_name, domain_prefix),
+            VCFDomainUpgradeProgressSensor(coordinator, domain_id, domain_name, domain_prefix),
+            VCFDomainUpgradeETASensor(coordinator, domain_id, domain_name, domain_prefix)
         ]
     
     @staticmethod
-    def create_resource_sensors(resource_coordinator, domain_id, domain_name, domain_prefix, domain_data):
-        """Create all resource sensors for a domain."""
-        entities = []
-        
-        # Create domain capacity sensors
-        capacity = domain_data.get("capacity", {})
-        if capacity:
-            for resource_type in ["cpu", "memory", "storage"]:
-                entities.append(
-                    VCFDomainCapacitySensor(resource_coordinator, domain_id, domain_name, domain_prefix, resource_type)
-                )
+    def create_capacity_sensors(resource_coordinator, domain_id, domain_name, domain_prefix):
+        """Create the capacity sensors of a domain."""
+        return [
+            VCFDomainCapacitySensor(resource_coordinator, domain_id, domain_name, domain_prefix, resource_type)
+            for resource_type in ["cpu", "memory", "storage"]
+        ]
+    
+    @staticmethod
+    def create_cluster_sensors(resource_coordinator, domain_id, domain_name, domain_prefix, cluster):
+        """Create the sensors of a cluster."""
+        return [
+            VCFClusterHostCountSensor(resource_coordinator, domain_id, domain_name, domain_prefix,
+                                      cluster.get("id"), cluster.get("name", "Unknown"))
+        ]
+    
+    @staticmethod
+    def create_host_sensors(resource_coordinator, domain_id, domain_name, domain_prefix, host):
+        """Create the resource sensors of a host."""
+        return [
+            VCFHostResourceSensor(resource_coordinator, domain_id, domain_name, domain_prefix,
+                                  host.get("id"), host.get("hostname", "Unknown"), resource_type)
+            for resource_type in ["cpu", "memory", "storage"]
+        ]
+    
+    @staticmethod
+    def get_resource_items(domain_resources, compact=False, host_allowlist=frozenset()):
+        """Flatten domain resources into the items that own resource sensors.
         
-        # Create cluster and host sensors
-        clusters = domain_data.get("clusters", [])
-        for cluster in clusters:
-            cluster_id = cluster.get("id")
-            cluster_name = cluster.get("name", "Unknown")
-            
-            # Create cluster host count sensor
-            entities.append(
-                VCFClusterHostCountSensor(resource_coordinator, domain_id, domain_name, domain_prefix, cluster_id, cluster_name)
-            )
-            
-            # Create host resource sensors
-            hosts = cluster.get("hosts", [])
-            for host in hosts:
-                host_id = host.get("id")
-                hostname = host.get("hostname", "Unknown")
-                
-                for resource_type in ["cpu", "memory", "storage"]:
-                    entities.append(
-                        VCFHostResourceSensor(resource_coordinator, domain_id, domain_name, domain_prefix, host_id, hostname, resource_type)
-                    )
+        Keys are ``(domain_id, kind, id)`` with kind ``domain``, ``cluster``,
+        ``cluster_summary`` or ``host``; values are ``(domain_data, item_data)``. In
+        compact mode every cluster gets a summary item and only allowlisted hosts
+        get their own items.
+        """
+        items = {}
+        for domain_id, domain_data in domain_resources.items():
+            if domain_data.get("capacity"):
+                items[(domain_id, "domain", domain_id)] = (domain_data, domain_data)
+            for cluster in domain_data.get("clusters", []):
+                if cluster.get("id"):
+                    items[(domain_id, "cluster", cluster["id"])] = (domain_data, cluster)
+                    if compact:
+                        items[(domain_id, "cluster_summary", cluster["id"])] = (domain_data, cluster)
+                for host in cluster.get("hosts", []):
+                    if not host.get("id"):
+                        continue
+                    if compact and not {host["id"].lower(), str(host.get("hostname", "")).lower(),
+                                        str(host.get("fqdn", "")).lower()} & host_allowlist:
+                        continue
+                    items[(domain_id, "host", host["id"])] = (domain_data, host)
+        return items
+    
+    @staticmethod
+    def create_resource_item_sensors(resource_coordinator, key, item):
+        """Create the sensors of one item returned by get_resource_items."""
+        domain_id, kind, _ = key
+        domain_data, item_data = item
+        domain_name = domain_data.get("domain_name", "Unknown")
+        domain_prefix = domain_data.get("domain_prefix", "domain")
         
-        return entities
+        if kind == "domain":
+            return VCFEntityFactory.create_capacity_sensors(resource_coordinator, domain_id, domain_name, domain_prefix)
+        if kind == "cluster":
+            return VCFEntityFactory.create_cluster_sensors(resource_coordinator, domain_id, domain_name, domain_prefix, item_data)
+        if kind == "cluster_summary":
+            return [VCFClusterResourceSummarySensor(resource_coordinator, domain_id, domain_name, domain_prefix,
+                                                    item_data.get("id"), item_data.get("name", "Unknown"))]
+        return VCFEntityFactory.create_host_sensors(resource_coordinator, domain_id, domain_name, domain_prefix, item_data)
 
 
 class VCFDomainUpdateStatusSensor(VCFDomainBaseSensor):
     """Sensor for individual domain update status."""
     
+    _unrecorded_attributes = VCFDomainBaseSensor._unrecorded_attributes | frozenset({
+        "next_release_date", "next_description", "next_downloadUrl", "next_bundleId", "upgrade_path"
+    })
+    
     def __init__(self, coordinator, domain_id, domain_name, domain_prefix):
         super().__init__(coordinator, domain_id, domain_name, domain_prefix, "Status")
     
@@ -107,6 +156,14 @@ class VCFDomainUpdateStatusSensor(VCFDomainBaseSensor):
                     "next_bundleId": next_release.get("bundleId", "")
                 })
             
+            upgrade_path = domain_data.get("upgrade_path")
+            if upgrade_path:
+                attributes.update({
+                    "upgrade_path": upgrade_path["path"],
+                    "upgrade_path_hops": upgrade_path["hops"],
+                    "upgrade_path_target": upgrade_path["target_version"]
+                })
+            
             return attributes
         except Exception as e:
             _LOGGER.error(f"Error getting domain update attributes for {self._domain_name}: {e}")
@@ -116,6 +173,10 @@ class VCFDomainUpdateStatusSensor(VCFDomainBaseSensor):
 class VCFDomainCapacitySensor(VCFResourceBaseSensor):
     """Sensor for domain capacity (CPU, Memory, Storage)."""
     
+    _unrecorded_attributes = VCFResourceBaseSensor._unrecorded_attributes | frozenset({
+        "used_unit", "total_value", "total_unit", "number_of_cores"
+    })
+    
     def __init__(self, coordinator, domain_id, domain_name, domain_prefix, resource_type):
         super().__init__(coordinator, domain_id, domain_name, domain_prefix, resource_type)
     
@@ -198,6 +259,8 @@ class VCFDomainCapacitySensor(VCFResourceBaseSensor):
 class VCFClusterHostCountSensor(VCFDomainBaseSensor):
     """Sensor for cluster host count."""
     
+    _unrecorded_attributes = frozenset({"domain", "domain_prefix", "cluster_name", "cluster_id"})
+    
     def __init__(self, coordinator, domain_id, domain_name, domain_prefix, cluster_id, cluster_name):
         self._cluster_id = cluster_id
         self._cluster_name = cluster_name
@@ -215,6 +278,21 @@ class VCFClusterHostCountSensor(VCFDomainBaseSensor):
         self._attr_name = name
         self._attr_unique_id = unique_id
     
+    async def async_added_to_hass(self):
+        """Run when sensor is added to Home Assistant."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass, resource_update_signal(self._domain_id), self._handle_resource_update
+            )
+        )
+    
+    @callback
+    def _handle_resource_update(self, update):
+        """Update state when a partial refresh touched this cluster."""
+        if update["domain"] or self._cluster_id in update["cluster_ids"]:
+            self.async_write_ha_state()
+    
     @property
     def state(self):
         """Return the host count for this cluster."""
@@ -243,22 +321,12 @@ class VCFClusterHostCountSensor(VCFDomainBaseSensor):
             clusters = domain_data.get("clusters", [])
             for cluster in clusters:
                 if cluster.get("id") == self._cluster_id:
-                    hosts = cluster.get("hosts", [])
-                    host_details = []
-                    
-                    for host in hosts:
-                        host_details.append({
-                            "hostname": host.get("hostname", "Unknown"),
-                            "fqdn": host.get("fqdn", "Unknown"),
-                            "host_id": host.get("id")
-                        })
-                    
+                    # The host list is available on demand via the get_inventory service
                     return {
                         "domain": self._domain_name,
                         "domain_prefix": self._domain_prefix,
                         "cluster_name": self._cluster_name,
-                        "cluster_id": self._cluster_id,
-                        "hosts": host_details
+                        "cluster_id": self._cluster_id
                     }
             
             return {"error": "Cluster not found"}
@@ -267,6 +335,87 @@ class VCFClusterHostCountSensor(VCFDomainBaseSensor):
             return {"error": str(e)}
 
 
+class VCFClusterResourceSummarySensor(VCFResourceBaseSensor):
+    """Aggregate host resource usage of a cluster, replacing per-host sensors in compact mode.
+    
+    The state is the mean CPU usage. Per-host values are kept as arrays in the order
+    of ``hosts`` and are not recorded; only the rollups go to the recorder.
+    """
+    
+    _unrecorded_attributes = VCFResourceBaseSensor._unrecorded_attributes | frozenset({
+        "cluster_name", "cluster_id", "hosts", *SUMMARY_METRICS, *(f"top_{metric}" for metric in SUMMARY_METRICS)
+    })
+    
+    def __init__(self, coordinator, domain_id, domain_name, domain_prefix, cluster_id, cluster_name):
+        self._cluster_id = cluster_id
+        self._cluster_name = cluster_name
+        super().__init__(coordinator, domain_id, domain_name, domain_prefix, "cpu")
+        
+        safe_domain_name = safe_name_conversion(domain_name)
+        safe_cluster_name = safe_name_conversion(cluster_name)
+        self._attr_name = f"VCF {domain_prefix} {cluster_name} host resources"
+        self._attr_unique_id = f"vcf_{domain_prefix}_{safe_domain_name}_{safe_cluster_name}_host_resources"
+        self._attr_icon = "mdi:server-network"
+    
+    def resource_update_affects(self, update):
+        """Check if a partial refresh changed this cluster or one of its hosts."""
+        if update["domain"] or self._cluster_id in update["cluster_ids"]:
+            return True
+        return any(host.get("id") in update["host_ids"] for host in self.get_cluster_data().get("hosts", []))
+    
+    def get_cluster_data(self):
+        """Get data for this specific cluster."""
+        for cluster in self.get_resource_data().get("clusters", []):
+            if cluster.get("id") == self._cluster_id:
+                return cluster
+        return {}
+    
+    @property
+    def state(self):
+        """Return the mean CPU usage of the cluster hosts."""
+        try:
+            hosts = self.get_cluster_data().get("hosts", [])
+            if not hosts:
+                return None
+            return round(sum(host_usage_percent(host, "cpu") for host in hosts) / len(hosts), 1)
+        except Exception as e:
+            _LOGGER.error(f"Error getting host resource summary for cluster {self._cluster_name}: {e}")
+            return None
+    
+    @property
+    def extra_state_attributes(self):
+        """Return per-host metric arrays and their rollups."""
+        try:
+            hosts = self.get_cluster_data().get("hosts", [])
+            hostnames = [host.get("hostname", "Unknown") for host in hosts]
+            attributes = {
+                "domain": self._domain_name,
+                "domain_prefix": self._domain_prefix,
+                "cluster_name": self._cluster_name,
+                "cluster_id": self._cluster_id,
+                "host_count": len(hosts),
+                "hosts": hostnames
+            }
+            
+            for metric in SUMMARY_METRICS:
+                values = [host_usage_percent(host, metric) for host in hosts]
+                attributes[metric] = values
+                if not values:
+                    continue
+                attributes.update({
+                    f"{metric}_min": min(values),
+                    f"{metric}_max": max(values),
+                    f"{metric}_mean": round(sum(values) / len(values), 1)
+                })
+                busiest = sorted(zip(hostnames, values), key=lambda pair: pair[1], reverse=True)[:SUMMARY_TOP_N]
+                attributes[f"top_{metric}"] = [{"host": hostname, "usage": value} for hostname, value in busiest]
+            
+            return attributes
+        except Exception as e:
+            _LOGGER.error(f"Error getting host resource summary attributes for cluster {self._cluster_name}: {e}")
+            return {"error": str(e)}
+
+
 class VCFHostResourceSensor(VCFHostResourceBaseSensor):
     """Sensor for host resource usage (CPU, Memory, Storage)."""
     
@@ -274,48 +423,17 @@ class VCFHostResourceSensor(VCFHostResourceBaseSensor):
         super().__init__(coordinator, domain_id, domain_name, domain_prefix, host_id, hostname, resource_type)
 
 
-class VCFDomainUpgradeStatusSensor(VCFDomainBaseSensor):
+class VCFDomainUpgradeStatusSensor(VCFDomainUpgradeBaseSensor):
     """Sensor for individual domain upgrade status."""
     
     def __init__(self, coordinator, domain_id, domain_name, domain_prefix):
         super().__init__(coordinator, domain_id, domain_name, domain_prefix, "Upgrade Status")
-        
-        # Listen for upgrade status change events
-        self._remove_listener = None
-        
-    async def async_added_to_hass(self):
-        """Run when sensor is added to Home Assistant."""
-        await super().async_added_to_hass()
-        
-        # Listen for VCF upgrade status change events
-        self._remove_listener = self.hass.bus.async_listen(
-            "vcf_upgrade_status_changed",
-            self._handle_upgrade_status_change
-        )
-    
-    async def async_will_remove_from_hass(self):
-        """Run when sensor is removed from Home Assistant."""
-        if self._remove_listener:
-            self._remove_listener()
-    
-    def _handle_upgrade_status_change(self, event):
-        """Handle upgrade status change events."""
-        if event.data.get("domain_id") == self._domain_id:
-            # Schedule update on the Home Assistant event loop (thread-safe)
-            self.hass.loop.call_soon_threadsafe(
-                lambda: self.hass.async_create_task(self._async_update_state())
-            )
-    
-    async def _async_update_state(self):
-        """Async method to update entity state."""
-        self.async_schedule_update_ha_state()
     
     @property
     def state(self):
         """Return the upgrade status of this domain."""
         try:
-            # Get upgrade service from hass data
-            upgrade_service = self.hass.data.get("datacenter_assistant", {}).get("upgrade_service")
+            upgrade_service = self.get_upgrade_service()
             if upgrade_service:
                 return upgrade_service.get_upgrade_status(self._domain_id)
             return "waiting_for_initiation"
@@ -333,6 +451,7 @@ class VCFDomainUpgradeStatusSensor(VCFDomainBaseSensor):
             "running_prechecks": "mdi:check-circle-outline",
             "waiting_acknowledgement": "mdi:alert-circle-check",
             "starting_upgrades": "mdi:rocket-launch-outline",
+            "waiting_for_window": "mdi:calendar-clock",
             "upgrading_sddcmanager": "mdi:server-network",
             "upgrading_nsx": "mdi:network",
             "upgrading_vcenter": "mdi:server",
@@ -371,56 +490,29 @@ class VCFDomainUpgradeStatusSensor(VCFDomainBaseSensor):
             return {"error": str(e)}
 
 
-class VCFDomainUpgradeLogsSensor(VCFDomainBaseSensor):
+class VCFDomainUpgradeLogsSensor(VCFDomainUpgradeBaseSensor):
     """Sensor for individual domain upgrade logs."""
     
-    def __init__(self, coordinator, domain_id, domain_name, domain_prefix):
-        super().__init__(coordinator, domain_id, domain_name, domain_prefix, "Upgrade Logs")
-        
-        # Listen for upgrade logs change events
-        self._remove_listener = None
-        
-    async def async_added_to_hass(self):
-        """Run when sensor is added to Home Assistant."""
-        await super().async_added_to_hass()
-        
-        # Listen for VCF upgrade logs change events
-        self._remove_listener = self.hass.bus.async_listen(
-            "vcf_upgrade_logs_changed",
-            self._handle_upgrade_logs_change
-        )
+    _unrecorded_attributes = VCFDomainBaseSensor._unrecorded_attributes | frozenset({"markdown", "full_logs"})
     
-    async def async_will_remove_from_hass(self):
-        """Run when sensor is removed from Home Assistant."""
-        if self._remove_listener:
-            self._remove_listener()
-    
-    def _handle_upgrade_logs_change(self, event):
-        """Handle upgrade logs change events."""
-        if event.data.get("domain_id") == self._domain_id:
-            # Schedule update on the Home Assistant event loop (thread-safe)
-            self.hass.loop.call_soon_threadsafe(
-                lambda: self.hass.async_create_task(self._async_update_logs_state())
-            )
+    upgrade_update_keys = ("entries",)
     
-    async def _async_update_logs_state(self):
-        """Async method to update entity state."""
-        self.async_schedule_update_ha_state()
+    def __init__(self, coordinator, domain_id, domain_name, domain_prefix):
+        super().__init__(coordinator, domain_id, domain_name, domain_prefix, "Upgrade Logs")
     
     @property
     def state(self):
-        """Return the upgrade logs of this domain."""
+        """Return the latest upgrade log message of this domain."""
         try:
-            # Get upgrade service from hass data
-            upgrade_service = self.hass.data.get("datacenter_assistant", {}).get("upgrade_service")
-            if upgrade_service:
-                logs = upgrade_service.get_upgrade_logs(self._domain_id)
-                # Return first 255 characters for state (Home Assistant limitation)
-                return logs[:255] if len(logs) > 255 else logs
-            return "No Messages"
+            upgrade_service = self.get_upgrade_service()
+            latest = upgrade_service.get_latest_upgrade_log(self._domain_id) if upgrade_service else None
+            if not latest:
+                return NO_MESSAGES
+            # State is limited to 255 characters; the tail view is in the markdown attribute
+            return truncate_description(latest["message"].split("\n", 1)[0], 250)
         except Exception as e:
             _LOGGER.error(f"Error getting upgrade logs for domain {self._domain_name}: {e}")
-            return "No Messages"
+            return NO_MESSAGES
     
     @property
     def icon(self):
@@ -428,24 +520,99 @@ class VCFDomainUpgradeLogsSensor(VCFDomainBaseSensor):
     
     @property
     def extra_state_attributes(self):
-        """Return full logs in attributes."""
+        """Return a markdown tail view of the logs in attributes."""
         try:
             attributes = {
                 "domain_name": self._domain_name,
                 "domain_prefix": self._domain_prefix
             }
             
-            # Get full logs for markdown display
-            upgrade_service = self.hass.data.get("datacenter_assistant", {}).get("upgrade_service")
+            # Tail view for markdown display; the full log is available via the get_upgrade_logs service
+            upgrade_service = self.get_upgrade_service()
             if upgrade_service:
-                full_logs = upgrade_service.get_upgrade_logs(self._domain_id)
-                attributes["full_logs"] = full_logs
-                attributes["markdown"] = full_logs  # For dashboard card display
+                latest = upgrade_service.get_latest_upgrade_log(self._domain_id)
+                attributes["markdown"] = upgrade_service.get_upgrade_logs(self._domain_id)  # For dashboard card display
+                # Kept for existing dashboards and templates; same tail view as markdown
+                attributes["full_logs"] = attributes["markdown"]
+                attributes["entry_count"] = upgrade_service.get_upgrade_log_entries(self._domain_id, limit=0)["total"]
+                attributes["latest_level"] = latest["level"] if latest else None
             else:
-                attributes["full_logs"] = "No Messages"
-                attributes["markdown"] = "No Messages"
+                attributes["markdown"] = NO_MESSAGES
+                attributes["full_logs"] = NO_MESSAGES
+                attributes["entry_count"] = 0
             
             return attributes
         except Exception as e:
             _LOGGER.error(f"Error getting upgrade logs attributes for {self._domain_name}: {e}")
             return {"error": str(e)}
+
+
+class VCFDomainUpgradeProgressSensor(VCFDomainUpgradeBaseSensor):
+    """Sensor for the estimated percent complete of a domain upgrade."""
+    
+    _unrecorded_attributes = VCFDomainBaseSensor._unrecorded_attributes | frozenset({"steps", "clusters", "current_task"})
+    
+    upgrade_update_keys = ("status", "progress")
+    
+    def __init__(self, coordinator, domain_id, domain_name, domain_prefix):
+        super().__init__(coordinator, domain_id, domain_name, domain_prefix, "Upgrade Progress", "mdi:progress-clock")
+        self._attr_native_unit_of_measurement = "%"
+    
+    def get_progress(self):
+        """Get upgrade progress for this domain."""
+        upgrade_service = self.get_upgrade_service()
+        return upgrade_service.get_upgrade_progress(self._domain_id) if upgrade_service else None
+    
+    @property
+    def native_value(self):
+        """Return the estimated percent complete."""
+        progress = self.get_progress()
+        return progress["percent_complete"] if progress else None
+    
+    @property
+    def extra_state_attributes(self):
+        """Return step details of the current upgrade."""
+        try:
+            progress = self.get_progress()
+            attributes = {
+                "domain_name": self._domain_name,
+                "domain_prefix": self._domain_prefix
+            }
+            if progress:
+                attributes.update({
+                    "current_step": progress["current_step"],
+                    "remaining_seconds": progress["remaining_seconds"],
+                    "failed": progress["failed"],
+                    "steps": progress["steps"]
+                })
+                if progress["current_task"]:
+                    attributes["current_task"] = progress["current_task"]
+                if progress["clusters"]:
+                    attributes["clusters"] = [
+                        {"name": cluster["cluster_name"], "status": cluster["status"],
+                         "upgrade_status": cluster["upgrade_status"]}
+                        for cluster in progress["clusters"]
+                    ]
+            return attributes
+        except Exception as e:
+            _LOGGER.error(f"Error getting upgrade progress attributes for {self._domain_name}: {e}")
+            return {"error": str(e)}
+
+
+class VCFDomainUpgradeETASensor(VCFDomainUpgradeBaseSensor):
+    """Sensor for the estimated completion time of a domain upgrade."""
+    
+    upgrade_update_keys = ("status", "progress")
+    
+    def __init__(self, coordinator, domain_id, domain_name, domain_prefix):
+        super().__init__(coordinator, domain_id, domain_name, domain_prefix, "Upgrade ETA", "mdi:timer-sand")
+        self._attr_device_class = SensorDeviceClass.TIMESTAMP
+    
+    @property
+    def native_value(self):
+        """Return the estimated completion time."""
+        upgrade_service = self.get_upgrade_service()
+        progress = upgrade_service.get_upgrade_progress(self._domain_id) if upgrade_service else None
+        if not progress or progress["eta"] is None:
+            return None
+        return dt_util.utc_from_timestamp(progress["eta"])
@@ -0,0 +1,126 @@
+"""Creation and removal of per-domain entities from coordinator data."""
+import logging
+from typing import Any, Callable, Dict, List, Optional
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from .task_supervisor import get_task_supervisor
+
+_LOGGER = logging.getLogger(__name__)
+
+# Consecutive complete refreshes an item must be missing from before its entities are removed
+REMOVAL_CONFIRMATIONS = 3
+
+# Markers of coordinator data that does not reflect the full live inventory
+INCOMPLETE_DATA_KEYS = ("error", "stale_since", "setup_failed")
+
+
+class VCFEntityMaterializer:
+    """Keep the entities of a coordinator's items in line with its data after each refresh.
+
+    ``get_items`` maps the coordinator data to ``{key: item}`` (e.g. domain ID to
+    domain data) and ``build_entities`` creates the entities of one new item. The
+    data is diffed once per refresh against the known keys. New entities are added
+    in one batch without update-before-add, since coordinator entities read their
+    state from data that is already there.
+
+    Items that disappear are removed together with their entity registry entries,
+    but only after they have been missing from several complete refreshes. Data
+    marked as stale or failed never removes anything, and ``keep_key`` can protect
+    items whose part of the data could not be read. Data replaced without notifying
+    the coordinator listeners (partial refreshes) is diffed on ``update_signal``.
+    """
+
+    def __init__(self, hass: HomeAssistant, coordinator, name: str, async_add_entities,
+                 get_items: Callable[[Dict[str, Any]], Dict[Any, Any]],
+                 build_entities: Callable[[Any, Any], List[Any]],
+                 keep_key: Optional[Callable[[Any, Dict[str, Any]], bool]] = None,
+                 update_signal: Optional[str] = None):
+        self.hass = hass
+        self.coordinator = coordinator
+        self.name = name
+        self.async_add_entities = async_add_entities
+        self.get_items = get_items
+        self.build_entities = build_entities
+        self.keep_key = keep_key
+        self.update_signal = update_signal
+        self._entities: Dict[Any, List[Any]] = {}
+        self._missing: Dict[Any, int] = {}
+        self._last_data = None
+
+    @property
+    def known_keys(self):
+        """Keys of the items that currently have entities."""
+        return self._entities.keys()
+
+    @callback
+    def async_start(self):
+        """Materialize the current data and follow every coordinator update."""
+        get_task_supervisor(self.hass).track(
+            f"{self.name}_materializer",
+            self.coordinator.async_add_listener(self._async_materialize)
+        )
+        if self.update_signal:
+            get_task_supervisor(self.hass).track(
+                f"{self.name}_materializer_signal",
+                async_dispatcher_connect(self.hass, self.update_signal, self._async_materialize)
+            )
+        self._async_materialize()
+
+    @callback
+    def _async_materialize(self):
+        """Add entities for new items and remove those of items that are gone."""
+        data = self.coordinator.data
+        if not data or data is self._last_data:
+            return
+        self._last_data = data
+
+        try:
+            items = self.get_items(data) or {}
+        except Exception as e:
+            _LOGGER.error(f"Error reading {self.name} items from coordinator data: {e}")
+            return
+
+        new_entities = []
+        for key, item in items.items():
+            if key in self._entities:
+                continue
+            try:
+                entities = self.build_entities(key, item)
+            except Exception as e:
+                _LOGGER.error(f"Error creating {self.name} entities for {key}: {e}")
+                continue
+            self._entities[key] = entities
+            new_entities.extend(entities)
+
+        if new_entities:
+            _LOGGER.info(f"Adding {len(new_entities)} {self.name} entities")
+            self.async_add_entities(new_entities)
+
+        if not any(data.get(key) for key in INCOMPLETE_DATA_KEYS):
+            self._async_remove_missing(items, data)
+
+    @callback
+    def _async_remove_missing(self, items: Dict[Any, Any], data: Dict[str, Any]):
+        """Remove the entities of items missing from enough consecutive refreshes."""
+        registry = er.async_get(self.hass)
+
+        for key in list(self._entities):
+            if key in items or (self.keep_key and self.keep_key(key, data)):
+                self._missing.pop(key, None)
+                continue
+
+            self._missing[key] = self._missing.get(key, 0) + 1
+            if self._missing[key] < REMOVAL_CONFIRMATIONS:
+                continue
+
+            entities = self._entities.pop(key)
+            del self._missing[key]
+            _LOGGER.info(f"Removing {len(entities)} {self.name} entities of {key}, no longer in the inventory")
+
+            for entity in entities:
+                if entity.registry_entry:
+                    # The platform removes the entity itself when its registry entry goes
+                    registry.async_remove(entity.entity_id)
+                elif entity.hass:
+                    self.hass.async_create_task(entity.async_remove())
@@ -8,8 +8,12 @@ from aiohttp import ClientError
 import asyncio
 from .coordinator import get_coordinator, get_resource_coordinator
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
-from .utils import truncate_description, get_resource_icon, safe_name_conversion
+from .utils import truncate_description, get_resource_icon, safe_name_conversion, UPGRADE_QUEUE_SIGNAL, RESOURCE_SNAPSHOT_SIGNAL, get_entry_option, get_host_allowlist
+from homeassistant.core import callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from .base_sensors import VCFBaseSensor
+from .task_supervisor import get_task_supervisor
+from .entity_materializer import VCFEntityMaterializer
 from .entity_factory import VCFEntityFactory, VCFDomainUpdateStatusSensor, VCFDomainCapacitySensor, VCFClusterHostCountSensor, VCFHostResourceSensor
 
 _LOGGER = logging.getLogger(__name__)
@@ -24,8 +28,6 @@ class VCFSensorSetupManager:
         self.hass = hass
         self.entry = entry
         self.async_add_entities = async_add_entities
-        self.existing_domain_entities = set()
-        self.existing_resource_entities = set()
         
     async def setup_sensors(self):
         """Setup all VCF sensors."""
@@ -36,23 +38,32 @@ class VCFSensorSetupManager:
             coordinator = get_coordinator(self.hass, self.entry)
             resource_coordinator = self.hass.data.get(_DOMAIN, {}).get("resource_coordinator")
             
-            # Refresh coordinators
-            await self._refresh_coordinators(coordinator, resource_coordinator)
+            # Start from the persisted inventory when there is one, otherwise wait for the API
+            coordinator_manager = self.hass.data.get(_DOMAIN, {}).get("coordinator_manager")
+            from_snapshot = bool(coordinator_manager and resource_coordinator
+                                 and await coordinator_manager.async_load_snapshot())
+            if from_snapshot:
+                get_task_supervisor(self.hass).create_task(
+                    self._refresh_in_background(coordinator, resource_coordinator), "initial_refresh"
+                )
+            else:
+                await self._refresh_coordinators(coordinator, resource_coordinator)
 
             # Create overall status sensors
             entities.extend([
                 VCFOverallStatusSensor(coordinator),
-                VCFDomainCountSensor(coordinator)
+                VCFDomainCountSensor(coordinator),
+                VCFUpgradeQueueSensor(coordinator)
             ])
 
             # Store coordinator and add_entities for dynamic entity creation
             self._store_coordinator_data(coordinator)
             
-            # Set up dynamic entity creation
-            await self._setup_dynamic_entities(coordinator, resource_coordinator)
-
             # Add initial entities
-            self.async_add_entities(entities, True)
+            self.async_add_entities(entities)
+            
+            # Domain and resource entities follow the coordinator data
+            self._setup_dynamic_entities(coordinator, resource_coordinator)
 
         except Exception as e:
             _LOGGER.error("VCF sensors could not be initialized: %s", e)
@@ -72,73 +83,49 @@ class VCFSensorSetupManager:
             except Exception as e:
                 _LOGGER.warning("VCF resource coordinator first refresh failed: %s", e)
     
+    async def _refresh_in_background(self, coordinator, resource_coordinator):
+        """Replace the snapshot data with live data after startup."""
+        await asyncio.gather(coordinator.async_refresh(), resource_coordinator.async_refresh())
+        _LOGGER.info("VCF coordinators refreshed after starting from snapshot")
+    
     def _store_coordinator_data(self, coordinator):
         """Store coordinator data for other components."""
         self.hass.data.setdefault(_DOMAIN, {})["coordinator"] = coordinator
         self.hass.data.setdefault(_DOMAIN, {})["async_add_entities"] = self.async_add_entities
     
-    async def _setup_dynamic_entities(self, coordinator, resource_coordinator):
-        """Setup dynamic entity creation."""
-        # Set up listeners for dynamic entity creation
-        def coordinator_update_callback():
-            # Schedule task on event loop (thread-safe)
-            self.hass.loop.call_soon_threadsafe(
-                lambda: self.hass.async_create_task(self._create_domain_entities(coordinator))
+    @callback
+    def _setup_dynamic_entities(self, coordinator, resource_coordinator):
+        """Add and remove domain and resource entities as the inventory changes."""
+        self.domain_materializer = VCFEntityMaterializer(
+            self.hass, coordinator, "domain", self.async_add_entities,
+            lambda data: data.get("domain_updates", {}),
+            lambda domain_id, domain_data: VCFEntityFactory.create_domain_sensors(
+                coordinator, domain_id, domain_data.get("domain_name", "Unknown"),
+                domain_data.get("domain_prefix", f"domain{len(self.domain_materializer.known_keys) + 1}")
             )
+        )
+        self.domain_materializer.async_start()
         
-        def resource_coordinator_update_callback():
-            # Schedule task on event loop (thread-safe)
-            self.hass.loop.call_soon_threadsafe(
-                lambda: self.hass.async_create_task(self._create_resource_entities(resource_coordinator))
-            )
-
-        # Add listeners
-        coordinator.async_add_listener(coordinator_update_callback)
         if resource_coordinator:
-            resource_coordinator.async_add_listener(resource_coordinator_update_callback)
-
-        # Schedule initial entity creation
-        self.hass.loop.call_later(2.0, lambda: self.hass.async_create_task(self._create_domain_entities(coordinator)))
-        self.hass.loop.call_later(3.0, lambda: self.hass.async_create_task(self._create_resource_entities(resource_coordinator)))
+            # One item per domain, cluster and host, so removed clusters and hosts lose their sensors
+            self.resource_materializer = VCFEntityMaterializer(
+                self.hass, resource_coordinator, "resource", self.async_add_entities,
+                lambda data: VCFEntityFactory.get_resource_items(
+                    data.get("domain_resources", {}),
+                    compact=get_entry_option(self.entry, "compact_host_sensors"),
+                    host_allowlist=get_host_allowlist(self.entry)
+                ),
+                lambda key, item: VCFEntityFactory.create_resource_item_sensors(resource_coordinator, key, item),
+                keep_key=self._resource_data_incomplete,
+                update_signal=RESOURCE_SNAPSHOT_SIGNAL
+            )
+            self.resource_materializer.async_start()
     
-    async def _create_domain_entities(self, coordinator):
-        """Create domain-specific entities using factory."""
-        if coordinator.data and "domain_updates" in coordinator.data:
-            new_entities = []
-            for domain_id, domain_data in coordinator.data["domain_updates"].items():
-                if domain_id not in self.existing_domain_entities:
-                    domain_name = domain_data.get("domain_name", "Unknown")
-                    domain_prefix = domain_data.get("domain_prefix", f"domain{len(self.existing_domain_entities) + 1}")
-                    
-                    domain_entities = VCFEntityFactory.create_domain_sensors(coordinator, domain_id, domain_name, domain_prefix)
-                    new_entities.extend(domain_entities)
-                    self.existing_domain_entities.add(domain_id)
-            
-            if new_entities:
-                _LOGGER.info(f"Adding {len(new_entities)} domain entities")
-                self.async_add_entities(new_entities, True)
-
-    async def _create_resource_entities(self, resource_coordinator):
-        """Create resource-specific entities using factory."""
-        if resource_coordinator and resource_coordinator.data and "domain_resources" in resource_coordinator.data:
-            new_entities = []
-            domain_resources = resource_coordinator.data["domain_resources"]
-            
-            for domain_id, domain_data in domain_resources.items():
-                domain_key = f"{domain_id}_resources"
-                if domain_key not in self.existing_resource_entities:
-                    domain_name = domain_data.get("domain_name", "Unknown")
-                    domain_prefix = domain_data.get("domain_prefix", f"domain{len(self.existing_resource_entities) + 1}")
-                    
-                    resource_entities = VCFEntityFactory.create_resource_sensors(
-                        resource_coordinator, domain_id, domain_name, domain_prefix, domain_data
-                    )
-                    new_entities.extend(resource_entities)
-                    self.existing_resource_entities.add(domain_key)
-            
-            if new_entities:
-                _LOGGER.info(f"Adding {len(new_entities)} resource entities")
-                self.async_add_entities(new_entities, True)
+    @staticmethod
+    def _resource_data_incomplete(key, data):
+        """Keep the sensors of domains whose resources could not be read completely."""
+        domain_data = data.get("domain_resources", {}).get(key[0])
+        return bool(domain_data and (domain_data.get("error") or domain_data.get("incomplete")))
 
 async def async_setup_entry(hass, entry, async_add_entities):
     """Setup sensor platform using OOP approach."""
@@ -149,6 +136,9 @@ async def async_setup_entry(hass, entry, async_add_entities):
 class VCFOverallStatusSensor(VCFBaseSensor):
     """Overall VCF system status sensor."""
     
+    # The per-domain list is available on demand via the get_inventory service
+    _unrecorded_attributes = frozenset({"domains"})
+    
     def __init__(self, coordinator):
         super().__init__(coordinator, "VCF Overall Status", "vcf_overall_status")
 
@@ -225,6 +215,9 @@ class VCFOverallStatusSensor(VCFBaseSensor):
 class VCFDomainCountSensor(VCFBaseSensor):
     """Sensor showing count of active domains."""
     
+    # The per-domain list is available on demand via the get_inventory service
+    _unrecorded_attributes = frozenset({"domains"})
+    
     def __init__(self, coordinator):
         super().__init__(coordinator, "VCF Active Domains Count", "vcf_active_domains_count", "mdi:server-network")
 
@@ -264,6 +257,58 @@ class VCFDomainCountSensor(VCFBaseSensor):
 
 
 
+class VCFUpgradeQueueSensor(VCFBaseSensor):
+    """Sensor showing the domain upgrades scheduled for maintenance windows."""
+    
+    def __init__(self, coordinator):
+        super().__init__(coordinator, "VCF Upgrade Queue", "vcf_upgrade_queue", "mdi:calendar-clock")
+    
+    async def async_added_to_hass(self):
+        """Run when sensor is added to Home Assistant."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            async_dispatcher_connect(self.hass, UPGRADE_QUEUE_SIGNAL, self._handle_queue_update)
+        )
+    
+    @callback
+    def _handle_queue_update(self):
+        """Update state when the upgrade queue changes."""
+        self.async_write_ha_state()
+    
+    def get_queue(self):
+        """Get the scheduled upgrades from the upgrade service."""
+        upgrade_service = self.hass.data.get(_DOMAIN, {}).get("upgrade_service")
+        return upgrade_service.scheduler.get_queue() if upgrade_service else []
+    
+    @property
+    def state(self):
+        """Return the number of scheduled upgrades."""
+        return len(self.get_queue())
+    
+    @property
+    def extra_state_attributes(self):
+        """Return the scheduled upgrades."""
+        try:
+            upgrade_service = self.hass.data.get(_DOMAIN, {}).get("upgrade_service")
+            fleet_window = upgrade_service.scheduler.fleet_window() if upgrade_service else None
+            return {
+                "fleet_window": str(fleet_window) if fleet_window else None,
+                "queue": [
+                    {
+                        "domainName": entry["domain_name"],
+                        "domainID": entry["domain_id"],
+                        "state": entry["state"],
+                        "window": entry["window"],
+                        "next_window_start": entry["next_window_start"]
+                    }
+                    for entry in self.get_queue()
+                ]
+            }
+        except Exception as e:
+            _LOGGER.error(f"Error getting upgrade queue attributes: {e}")
+            return {"error": str(e)}
+
+
 # All sensor classes except the main status sensors are now defined in entity_factory.py and base_sensors.py
 # This provides better organization and reduces code duplication through inheritance and factory patterns
 
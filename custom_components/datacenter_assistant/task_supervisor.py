@@ -0,0 +1,97 @@
+"""Registry of background tasks and listeners owned by a config entry."""
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Coroutine, Dict, List
+from homeassistant.core import HomeAssistant, callback
+
+_LOGGER = logging.getLogger(__name__)
+_DOMAIN = "datacenter_assistant"
+
+# Seconds to wait for cancelled tasks to finish on unload
+SHUTDOWN_TIMEOUT = 10
+
+
+class VCFTaskSupervisor:
+    """Track long-running tasks and listener removers so they can be cancelled on unload.
+
+    Every task is registered under a name (e.g. ``upgrade_workflow_<domain_id>``) and
+    forgotten again when it finishes. Listener removers are kept
+    until shutdown, when they are all called.
+    """
+
+    def __init__(self, hass: HomeAssistant):
+        self.hass = hass
+        self._tasks: Dict[str, Dict[str, Any]] = {}
+        self._unsubs: List[Dict[str, Any]] = []
+        self._shutting_down = False
+
+    @callback
+    def create_task(self, coro: Coroutine, name: str) -> asyncio.Task:
+        """Start a supervised background task."""
+        if self._shutting_down:
+            coro.close()
+            raise Exception(f"Cannot start task {name}: integration is unloading")
+
+        task = self.hass.async_create_background_task(coro, f"{_DOMAIN}_{name}")
+        self._tasks[name] = {"task": task, "started": time.monotonic()}
+
+        def _forget(finished_task):
+            entry = self._tasks.get(name)
+            if entry and entry["task"] is finished_task:
+                del self._tasks[name]
+
+        task.add_done_callback(_forget)
+        return task
+
+    @callback
+    def track(self, name: str, unsub: Callable[[], Any]):
+        """Register a listener remover to call on shutdown."""
+        self._unsubs.append({"name": name, "unsub": unsub, "started": time.monotonic()})
+
+    def get_diagnostics(self) -> Dict[str, Any]:
+        """Get counts and ages of the supervised tasks and listeners."""
+        now = time.monotonic()
+        return {
+            "task_count": len(self._tasks),
+            "tasks": [
+                {"name": name, "age_seconds": round(now - entry["started"]), "done": entry["task"].done()}
+                for name, entry in self._tasks.items()
+            ],
+            "listener_count": len(self._unsubs),
+            "listeners": [
+                {"name": entry["name"], "age_seconds": round(now - entry["started"])}
+                for entry in self._unsubs
+            ]
+        }
+
+    async def async_shutdown(self):
+        """Remove all listeners and cancel all tasks, waiting briefly for them to finish."""
+        self._shutting_down = True
+
+        for entry in self._unsubs:
+            try:
+                entry["unsub"]()
+            except Exception as e:
+                _LOGGER.debug(f"Error removing listener {entry['name']}: {e}")
+        self._unsubs.clear()
+
+        tasks = [entry["task"] for entry in self._tasks.values() if not entry["task"].done()]
+        if not tasks:
+            return
+
+        _LOGGER.info(f"Cancelling {len(tasks)} background tasks: {', '.join(self._tasks)}")
+        for task in tasks:
+            task.cancel()
+
+        done, pending = await asyncio.wait(tasks, timeout=SHUTDOWN_TIMEOUT)
+        if pending:
+            _LOGGER.warning(f"{len(pending)} background tasks did not stop within {SHUTDOWN_TIMEOUT} seconds")
+
+
+def get_task_supervisor(hass: HomeAssistant) -> VCFTaskSupervisor:
+    """Get the task supervisor of the integration, creating it if needed."""
+    domain_data = hass.data.setdefault(_DOMAIN, {})
+    if "task_supervisor" not in domain_data:
+        domain_data["task_supervisor"] = VCFTaskSupervisor(hass)
+    return domain_data["task_supervisor"]
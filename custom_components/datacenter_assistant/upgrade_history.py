@@ -0,0 +1,83 @@
+"""Persistent history of VCF upgrade phase and component durations."""
+import logging
+from statistics import median
+from typing import Dict, List, Optional
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_KEY = "datacenter_assistant.upgrade_history"
+STORAGE_VERSION = 1
+MAX_SAMPLES = 10
+SAVE_DELAY = 10
+
+# Fallback estimates in seconds when no history exists yet
+DEFAULT_ESTIMATES = {
+    "phase:targeting_new_vcf_version": 60,
+    "phase:downloading_bundles": 1800,
+    "phase:running_prechecks": 1800,
+    "phase:final_validation": 300,
+    "component:SDDC_MANAGER": 7200,
+    "component:NSX_T_MANAGER": 14400,
+    "component:VCENTER": 5400,
+    "component:HOST": 3600,
+}
+DEFAULT_ESTIMATE = 1800
+
+
+class VCFUpgradeHistory:
+    """Record upgrade durations keyed by step and version jump and derive estimates from them."""
+
+    def __init__(self, hass: HomeAssistant):
+        self.hass = hass
+        self._store = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+        self._durations: Dict[str, List[float]] = {}
+        self._loaded = False
+
+    async def async_load(self):
+        """Load recorded durations from storage once."""
+        if self._loaded:
+            return
+
+        data = await self._store.async_load()
+        if isinstance(data, dict):
+            self._durations = data.get("durations", {})
+        self._loaded = True
+        _LOGGER.debug(f"Loaded upgrade duration history for {len(self._durations)} keys")
+
+    @staticmethod
+    def make_key(step: str, from_version: Optional[str] = None, to_version: Optional[str] = None) -> str:
+        """Build a history key from a step (e.g. ``component:VCENTER``) and its version jump."""
+        return f"{step}|{from_version or 'unknown'}->{to_version or 'unknown'}"
+
+    def record(self, key: str, seconds: float):
+        """Record a duration sample and schedule a save."""
+        samples = self._durations.setdefault(key, [])
+        samples.append(round(seconds, 1))
+        del samples[:-MAX_SAMPLES]
+
+        _LOGGER.debug(f"Recorded upgrade duration {seconds:.0f}s for {key}")
+        self._store.async_delay_save(lambda: {"durations": self._durations}, SAVE_DELAY)
+
+    def estimate(self, key: str) -> float:
+        """Estimate the duration of a step.
+
+        Uses samples for the exact version jump first, then samples for the same
+        step with any version jump, then the built-in default.
+        """
+        samples = self._durations.get(key)
+        if samples:
+            return median(samples)
+
+        step = key.split("|", 1)[0]
+        step_samples = [
+            sample
+            for history_key, history_samples in self._durations.items()
+            if history_key.split("|", 1)[0] == step
+            for sample in history_samples
+        ]
+        if step_samples:
+            return median(step_samples)
+
+        return DEFAULT_ESTIMATES.get(step, DEFAULT_ESTIMATE)
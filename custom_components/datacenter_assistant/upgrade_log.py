@@ -0,0 +1,92 @@
+"""Bounded, structured upgrade log for VCF domain upgrades."""
+from collections import deque
+from typing import Dict, Any, List, Optional
+from homeassistant.util import dt as dt_util
+
+MAX_ENTRIES = 500
+TAIL_ENTRIES = 15
+NO_MESSAGES = "No Messages"
+
+# Markdown headings for the upgrade phases (upgrade statuses)
+PHASE_TITLES = {
+    "waiting_for_initiation": "Upgrade",
+    "targeting_new_vcf_version": "Targeting VCF Version",
+    "downloading_bundles": "Downloading Bundles",
+    "running_prechecks": "Running Pre-checks",
+    "waiting_acknowledgement": "Pre-check Results",
+    "starting_upgrades": "Starting Component Upgrades",
+    "waiting_for_window": "Waiting for Maintenance Window",
+    "upgrading_sddcmanager": "Upgrading SDDC Manager",
+    "upgrading_nsx": "Upgrading NSX-T",
+    "upgrading_vcenter": "Upgrading vCenter",
+    "upgrading_esx_cluster": "Upgrading ESX Clusters",
+    "final_validation": "Final Validation",
+    "successfully_completed": "Upgrade Completed Successfully",
+    "failed": "Upgrade Failed",
+}
+
+LEVEL_PREFIXES = {
+    "warning": "⚠️ ",
+    "error": "❌ ",
+}
+
+
+class VCFUpgradeLog:
+    """Ring buffer of timestamped upgrade log entries for one domain."""
+
+    def __init__(self, max_entries: int = MAX_ENTRIES):
+        self._entries = deque(maxlen=max_entries)
+        self._sequence = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def add(self, message: str, level: str = "info", phase: Optional[str] = None) -> Dict[str, Any]:
+        """Append an entry and return it."""
+        self._sequence += 1
+        entry = {
+            "seq": self._sequence,
+            "timestamp": dt_util.utcnow().isoformat(),
+            "level": level,
+            "phase": phase,
+            "message": message,
+        }
+        self._entries.append(entry)
+        return entry
+
+    def clear(self):
+        """Remove all entries. Sequence numbers keep increasing."""
+        self._entries.clear()
+
+    @property
+    def latest(self) -> Optional[Dict[str, Any]]:
+        """Return the most recent entry."""
+        return self._entries[-1] if self._entries else None
+
+    def get_page(self, offset: int = 0, limit: int = 100) -> List[Dict[str, Any]]:
+        """Return a page of entries, oldest first."""
+        entries = list(self._entries)
+        return entries[offset:offset + limit]
+
+    def render_markdown(self, tail: int = TAIL_ENTRIES) -> str:
+        """Render the last entries as markdown, grouped by phase."""
+        if not self._entries:
+            return NO_MESSAGES
+
+        entries = list(self._entries)[-tail:]
+        lines = []
+        current_phase = object()
+
+        for entry in entries:
+            if entry["phase"] != current_phase:
+                current_phase = entry["phase"]
+                if lines:
+                    lines.append("")
+                lines.append(f"**{PHASE_TITLES.get(current_phase, 'Upgrade')}**")
+                lines.append("")
+
+            local_time = dt_util.as_local(dt_util.parse_datetime(entry["timestamp"])).strftime("%H:%M:%S")
+            message = entry["message"].replace("\n", "  \n  ")
+            lines.append(f"- `{local_time}` {LEVEL_PREFIXES.get(entry['level'], '')}{message}")
+
+        return "\n".join(lines)
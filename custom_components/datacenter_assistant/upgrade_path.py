@@ -0,0 +1,112 @@
+"""Multi-hop upgrade path solving across future VCF releases."""
+import logging
+from collections import OrderedDict, deque
+from typing import Dict, Any, Optional
+from .utils import version_key
+
+_LOGGER = logging.getLogger(__name__)
+
+# Number of release catalogs whose graphs are kept
+MAX_CACHED_CATALOGS = 8
+
+
+class VCFUpgradePathSolver:
+    """Find the shortest sequence of releases from a domain's version to a target release.
+
+    A release can be installed on any version ``v`` with
+    ``release > v >= minCompatibleVcfVersion``. These bounds define a graph over the
+    versions of all future releases; a breadth-first search over it gives the path
+    with the fewest hops. The graph is built once per release catalog key (the set of
+    releases and their bounds) and paths are cached on it, so domains sharing a
+    catalog and a version are solved once.
+    """
+
+    def __init__(self):
+        self._graphs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+    def solve(self, release_catalog, current_version: str,
+              target_version: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Get the shortest upgrade path to the target (default: latest) release.
+
+        Returns None when the target cannot be reached from the current version.
+        """
+        if not current_version:
+            return None
+
+        current = version_key(current_version)
+        graph = self._get_graph(release_catalog)
+        path_key = (current, target_version or "")
+        if path_key not in graph["paths"]:
+            graph["paths"][path_key] = self._search(graph, current, current_version, target_version)
+        return graph["paths"][path_key]
+
+    def _get_graph(self, release_catalog) -> Dict[str, Any]:
+        """Get the graph of a release catalog, building it on first use."""
+        graph = self._graphs.get(release_catalog.key)
+        if graph is not None:
+            self._graphs.move_to_end(release_catalog.key)
+            return graph
+
+        nodes = {}
+        for entry in release_catalog.releases:
+            nodes.setdefault(entry["version"], entry)
+
+        graph = {
+            # Newest first, so that among equally short paths newer intermediate releases win
+            "nodes": sorted(nodes.values(), key=lambda node: node["version"], reverse=True),
+            "paths": {}
+        }
+        self._graphs[release_catalog.key] = graph
+        while len(self._graphs) > MAX_CACHED_CATALOGS:
+            self._graphs.popitem(last=False)
+
+        _LOGGER.debug(f"Built upgrade path graph over {len(graph['nodes'])} releases")
+        return graph
+
+    def _search(self, graph: Dict[str, Any], current: tuple, current_version: str,
+                target_version: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Breadth-first search from the current version to the target release."""
+        nodes = graph["nodes"]
+        if not nodes:
+            return None
+
+        if target_version:
+            target = version_key(target_version)
+            if not any(node["version"] == target for node in nodes):
+                _LOGGER.warning(f"Upgrade target {target_version} is not a known future release")
+                return None
+        else:
+            target = nodes[0]["version"]
+
+        if target <= current:
+            return None
+
+        parents = {current: None}
+        queue = deque([current])
+        while queue:
+            version = queue.popleft()
+            if version == target:
+                break
+            for node in nodes:
+                if node["version"] not in parents and node["version"] > version >= node["min_compatible"]:
+                    parents[node["version"]] = version
+                    queue.append(node["version"])
+
+        if target not in parents:
+            return None
+
+        releases_by_version = {node["version"]: node["release"] for node in nodes}
+        hops = []
+        version = target
+        while version != current:
+            hops.append(releases_by_version[version])
+            version = parents[version]
+        hops.reverse()
+
+        return {
+            "from_version": current_version,
+            "target_version": hops[-1].get("version"),
+            "hops": len(hops),
+            "path": [release.get("version") for release in hops],
+            "releases": hops
+        }
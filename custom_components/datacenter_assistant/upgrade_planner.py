@@ -0,0 +1,220 @@
+"""Dry-run planning for VCF domain upgrades."""
+import asyncio
+import logging
+import time
+from typing import Dict, Any, List, Optional
+from .utils import get_component_kind
+
+_LOGGER = logging.getLogger(__name__)
+
+# Default component order used by the upgrade workflow when a release defines no upgradeOrder
+DEFAULT_UPGRADE_ORDER = ["SDDC_MANAGER", "NSX_T_MANAGER", "VCENTER", "HOST"]
+
+# Component types the upgrade workflow knows how to upgrade
+SUPPORTED_COMPONENTS = {
+    "SDDC_MANAGER": "upgrading_sddcmanager",
+    "NSX_T_MANAGER": "upgrading_nsx",
+    "VCENTER": "upgrading_vcenter",
+    "HOST": "upgrading_esx_cluster",
+}
+
+# Maximum number of domains planned at the same time
+MAX_PARALLEL_PLANS = 4
+
+
+class VCFUpgradePlanner:
+    """Compute what the upgrade workflow would do for a domain without starting it.
+
+    Only read endpoints are used (plus the check-set query, which does not start a run).
+    Bundle metadata comes from the upgrade service's bundle catalog, which is refreshed
+    once per planning call so that one request serves a whole fleet.
+    """
+
+    def __init__(self, upgrade_service):
+        self.upgrade_service = upgrade_service
+        self.vcf_client = upgrade_service.vcf_client
+        self.bundle_catalog = upgrade_service.bundle_catalog
+
+    async def plan_domains(self, domain_updates: Dict[str, Dict[str, Any]], domain_ids: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Plan upgrades for several domains, refreshing the bundle catalog only once."""
+        await self.bundle_catalog.async_load(force=True)
+
+        if domain_ids is None:
+            domain_ids = [
+                domain_id for domain_id, domain_data in domain_updates.items()
+                if domain_data.get("update_status") == "updates_available"
+            ]
+
+        semaphore = asyncio.Semaphore(MAX_PARALLEL_PLANS)
+
+        async def plan_one(domain_id):
+            async with semaphore:
+                try:
+                    return await self.plan_domain(domain_id, domain_updates.get(domain_id, {}), refresh_catalog=False)
+                except Exception as e:
+                    _LOGGER.error(f"Domain {domain_id}: Error planning upgrade: {e}")
+                    return {"domain_id": domain_id, "error": str(e)}
+
+        plans = await asyncio.gather(*(plan_one(domain_id) for domain_id in domain_ids))
+
+        return {
+            "generated_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "plans": {plan["domain_id"]: plan for plan in plans}
+        }
+
+    async def plan_domain(self, domain_id: str, domain_data: Dict[str, Any], refresh_catalog: bool = True) -> Dict[str, Any]:
+        """Build a structured upgrade plan for a single domain."""
+        if refresh_catalog:
+            await self.bundle_catalog.async_load(force=True)
+
+        plan = {
+            "domain_id": domain_id,
+            "domain_name": domain_data.get("domain_name"),
+            "current_version": domain_data.get("current_version"),
+            "update_status": domain_data.get("update_status", "unknown"),
+        }
+
+        next_release = domain_data.get("next_release") or {}
+        target_version = next_release.get("version")
+        if domain_data.get("update_status") != "updates_available" or not target_version:
+            plan["target_version"] = None
+            plan["message"] = "No VCF update available for this domain"
+            return plan
+
+        plan["target_version"] = target_version
+
+        bundles = await self._plan_bundles(next_release)
+        plan["bundles"] = bundles
+        plan["bundles_to_download"] = [bundle["bundle_id"] for bundle in bundles if bundle["needs_download"]]
+        plan["download_size_mb"] = round(sum(bundle["size_mb"] or 0 for bundle in bundles if bundle["needs_download"]), 1)
+
+        plan["prechecks"] = await self._plan_prechecks(domain_id, target_version, next_release)
+        plan["upgrade_sequence"] = await self._plan_upgrade_sequence(domain_id, target_version, next_release)
+
+        return plan
+
+    async def _plan_bundles(self, next_release: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Describe the release bundles and whether they still need downloading."""
+        bundles = []
+
+        for patch_bundle in next_release.get("patchBundles", []) or []:
+            bundle_id = patch_bundle.get("bundleId") if isinstance(patch_bundle, dict) else None
+            if not bundle_id:
+                continue
+
+            bundle = await self.bundle_catalog.async_get_bundle(bundle_id) or {}
+            download_status = bundle.get("downloadStatus")
+
+            bundles.append({
+                "bundle_id": bundle_id,
+                "bundle_type": patch_bundle.get("bundleType") or bundle.get("type"),
+                "version": bundle.get("version"),
+                "size_mb": bundle.get("sizeMB"),
+                "download_status": download_status,
+                "needs_download": download_status != "SUCCESSFUL"
+            })
+
+        return bundles
+
+    async def _plan_prechecks(self, domain_id: str, target_version: str, next_release: Dict[str, Any]) -> Dict[str, Any]:
+        """Describe the pre-check resources and check sets that would be submitted."""
+        try:
+            check_set_data, _ = await self.upgrade_service._build_precheck_spec(domain_id, target_version, next_release)
+        except Exception as e:
+            _LOGGER.warning(f"Domain {domain_id}: Could not query check-sets for plan: {e}")
+            return {"error": str(e)}
+
+        return {
+            "query_id": check_set_data.get("queryId"),
+            "resources": [
+                {
+                    "resource_type": resource.get("resourceType"),
+                    "resource_id": resource.get("resourceId"),
+                    "resource_name": resource.get("resourceName"),
+                    "check_set_ids": [check_set.get("checkSetId") for check_set in resource.get("checkSets", [])]
+                }
+                for resource in check_set_data.get("resources", [])
+            ]
+        }
+
+    async def _plan_upgrade_sequence(self, domain_id: str, target_version: str, next_release: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Compute the ordered component upgrade sequence."""
+        # Upgradable status is informational; the sequence itself comes from the release bundles
+        upgradable_status = {}
+        try:
+            upgradables_response = await self.vcf_client.api_request(
+                f"/v1/upgradables/domains/{domain_id}",
+                params={"targetVersion": target_version}
+            )
+            for element in upgradables_response.get("elements", []):
+                if isinstance(element, dict) and element.get("bundleId"):
+                    upgradable_status[element["bundleId"]] = element.get("status")
+        except Exception as e:
+            _LOGGER.debug(f"Domain {domain_id}: Could not read upgradables for plan: {e}")
+
+        upgrade_order = self._upgrade_order(next_release)
+        bundle_ids = [
+            patch_bundle.get("bundleId")
+            for patch_bundle in next_release.get("patchBundles", []) or []
+            if isinstance(patch_bundle, dict) and patch_bundle.get("bundleId")
+        ]
+        for bundle_id in upgradable_status:
+            if bundle_id not in bundle_ids:
+                bundle_ids.append(bundle_id)
+
+        ordered_steps = []
+        for bundle_id in bundle_ids:
+            bundle = await self.bundle_catalog.async_get_bundle(bundle_id) or {}
+            components = bundle.get("components") or [{}]
+            component = components[0] if isinstance(components[0], dict) else {}
+            component_type = component.get("type", "")
+
+            order = (self._order_index(component_type, upgrade_order), bundle.get("applicabilityOrder") or 0)
+            ordered_steps.append((order, {
+                "bundle_id": bundle_id,
+                "component_type": component_type,
+                "component": component.get("description"),
+                "from_version": component.get("fromVersion"),
+                "to_version": component.get("toVersion"),
+                "upgradable_status": upgradable_status.get(bundle_id),
+                "action": self._action(component_type)
+            }))
+
+        ordered_steps.sort(key=lambda ordered_step: ordered_step[0])
+        steps = [step for _, step in ordered_steps]
+        for position, step in enumerate(steps, 1):
+            step["step"] = position
+
+        return steps
+
+    @staticmethod
+    def _upgrade_order(next_release: Dict[str, Any]) -> List[str]:
+        """Get the component upgrade order of a release.
+
+        The release's ``upgradeOrder`` only lists NSX, vCenter and ESX hosts. The
+        workflow always upgrades SDDC Manager first, so it is kept at the front.
+        """
+        upgrade_order = next_release.get("upgradeOrder")
+        if not upgrade_order:
+            return DEFAULT_UPGRADE_ORDER
+        components = [
+            get_component_kind(component.strip()) or component.strip()
+            for component in upgrade_order.split(",") if component.strip()
+        ]
+        return ["SDDC_MANAGER"] + [component for component in components if component != "SDDC_MANAGER"]
+
+    @staticmethod
+    def _order_index(component_type: str, upgrade_order: List[str]) -> int:
+        """Get the position of a component type in the upgrade order."""
+        for index, ordered_type in enumerate(upgrade_order):
+            if ordered_type in component_type:
+                return index
+        return len(upgrade_order)
+
+    @staticmethod
+    def _action(component_type: str) -> str:
+        """Describe what the workflow will do with a component type."""
+        for supported_type, status in SUPPORTED_COMPONENTS.items():
+            if supported_type in component_type:
+                return status
+        return "skipped (unknown component type)"
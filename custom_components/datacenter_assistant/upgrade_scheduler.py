@@ -0,0 +1,268 @@
+"""Maintenance-window scheduling of VCF domain upgrades."""
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional, Tuple
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+from .utils import get_entry_option, UPGRADE_QUEUE_SIGNAL
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_KEY = "datacenter_assistant.upgrade_queue"
+STORAGE_VERSION = 1
+
+# How often queued upgrades are checked against their windows
+TICK_INTERVAL = timedelta(minutes=1)
+
+WEEKDAYS = ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]
+
+
+class MaintenanceWindow:
+    """Weekly maintenance windows parsed from a cron-like spec.
+
+    A spec is one or more rules separated by ``;``. Each rule is an optional day
+    list followed by a time range, e.g. ``mon-fri 22:00-04:00; sat,sun 00:00-08:00``.
+    Days default to every day. A range that ends before it starts runs past
+    midnight and belongs to the day it starts on; equal start and end times mean
+    the whole day.
+    """
+
+    def __init__(self, spec: str):
+        self.spec = spec.strip()
+        self.rules: List[Tuple[set, int, int]] = [self._parse_rule(rule) for rule in self.spec.split(";") if rule.strip()]
+        if not self.rules:
+            raise ValueError("Maintenance window is empty")
+
+    def __str__(self):
+        return self.spec
+
+    @staticmethod
+    def _parse_rule(rule: str) -> Tuple[set, int, int]:
+        parts = rule.split()
+        if len(parts) == 1:
+            days, time_range = "*", parts[0]
+        elif len(parts) == 2:
+            days, time_range = parts
+        else:
+            raise ValueError(f"Invalid maintenance window rule: '{rule.strip()}'")
+
+        start, _, end = time_range.partition("-")
+        return MaintenanceWindow._parse_days(days), MaintenanceWindow._parse_time(start), MaintenanceWindow._parse_time(end)
+
+    @staticmethod
+    def _parse_days(days: str) -> set:
+        if days == "*":
+            return set(range(7))
+
+        weekdays = set()
+        for token in days.lower().split(","):
+            first, _, last = token.partition("-")
+            if first not in WEEKDAYS or (last and last not in WEEKDAYS):
+                raise ValueError(f"Invalid weekday in maintenance window: '{token}'")
+            start_index = WEEKDAYS.index(first)
+            end_index = WEEKDAYS.index(last) if last else start_index
+            index = start_index
+            while True:
+                weekdays.add(index)
+                if index == end_index:
+                    break
+                index = (index + 1) % 7
+        return weekdays
+
+    @staticmethod
+    def _parse_time(value: str) -> int:
+        try:
+            hours, minutes = value.split(":")
+            hours, minutes = int(hours), int(minutes)
+        except ValueError:
+            raise ValueError(f"Invalid time in maintenance window: '{value}'")
+        if not (0 <= hours <= 23 and 0 <= minutes <= 59):
+            raise ValueError(f"Invalid time in maintenance window: '{value}'")
+        return hours * 60 + minutes
+
+    def is_open(self, now: datetime) -> bool:
+        """Check if any rule of the window is open at the given local time."""
+        minute = now.hour * 60 + now.minute
+        weekday = now.weekday()
+        previous_day = (weekday - 1) % 7
+
+        for days, start, end in self.rules:
+            if start == end:
+                if weekday in days:
+                    return True
+            elif start < end:
+                if weekday in days and start <= minute < end:
+                    return True
+            elif (weekday in days and minute >= start) or (previous_day in days and minute < end):
+                return True
+        return False
+
+    def next_open(self, now: datetime) -> datetime:
+        """Get the time the window next opens (now if it is open)."""
+        if self.is_open(now):
+            return now
+
+        midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        candidates = []
+        for day_offset in range(8):
+            day = midnight + timedelta(days=day_offset)
+            for days, start, _ in self.rules:
+                opens = day + timedelta(minutes=start)
+                if day.weekday() in days and opens > now:
+                    candidates.append(opens)
+        return min(candidates)
+
+
+class VCFUpgradeScheduler:
+    """Persisted queue of domain upgrades started automatically in maintenance windows.
+
+    A queued upgrade starts ``upgrade_run_ahead_hours`` before its window opens, so
+    downloads and pre-checks finish ahead of time. Component upgrades only start
+    while the window is open; between components the workflow pauses when the
+    window has closed.
+    """
+
+    def __init__(self, upgrade_service):
+        self.upgrade_service = upgrade_service
+        self.hass: HomeAssistant = upgrade_service.hass
+        self.config_entry = upgrade_service.config_entry
+        self._store = Store(self.hass, STORAGE_VERSION, STORAGE_KEY)
+        self._queue: Dict[str, Dict[str, Any]] = {}
+
+    async def async_start(self):
+        """Load the persisted queue and start checking windows."""
+        data = await self._store.async_load()
+        if isinstance(data, dict):
+            self._queue = data.get("queue", {})
+
+        # Upgrades that were running before a restart have to be started again
+        for entry in self._queue.values():
+            if entry["state"] == "running":
+                entry["state"] = "queued"
+
+        _LOGGER.info(f"Loaded {len(self._queue)} scheduled domain upgrades")
+        self.upgrade_service.supervisor.track(
+            "upgrade_scheduler_tick",
+            async_track_time_interval(self.hass, self._async_tick, TICK_INTERVAL)
+        )
+        self._async_notify()
+
+    def fleet_window(self) -> Optional[MaintenanceWindow]:
+        """Get the maintenance window configured for all domains."""
+        spec = get_entry_option(self.config_entry, "maintenance_window")
+        if not spec:
+            return None
+        try:
+            return MaintenanceWindow(spec)
+        except ValueError as e:
+            _LOGGER.error(f"Ignoring invalid fleet maintenance window: {e}")
+            return None
+
+    def get_window(self, domain_id: str) -> Optional[MaintenanceWindow]:
+        """Get the window of a scheduled domain upgrade, or None when the domain is not scheduled."""
+        entry = self._queue.get(domain_id)
+        if not entry:
+            return None
+        if entry.get("window"):
+            return MaintenanceWindow(entry["window"])
+        return self.fleet_window()
+
+    def get_queue(self) -> List[Dict[str, Any]]:
+        """Get the queued upgrades with the next opening of their windows."""
+        now = dt_util.now()
+        queue = []
+        for domain_id, entry in self._queue.items():
+            window = self.get_window(domain_id)
+            queue.append({
+                **entry,
+                "window": str(window) if window else None,
+                "next_window_start": window.next_open(now).isoformat() if window else None
+            })
+        return queue
+
+    async def schedule(self, domain_id: str, domain_name: str, window: Optional[str] = None):
+        """Queue an upgrade for a domain, optionally with its own maintenance window."""
+        if window:
+            # Validate before storing
+            MaintenanceWindow(window)
+
+        if self._queue.get(domain_id, {}).get("state") == "running":
+            raise Exception(f"Upgrade for domain {domain_name} is already running")
+
+        self._queue[domain_id] = {
+            "domain_id": domain_id,
+            "domain_name": domain_name,
+            "window": window or None,
+            "state": "queued",
+            "queued_at": dt_util.utcnow().isoformat()
+        }
+        _LOGGER.info(f"Domain {domain_id}: Upgrade scheduled (window: {window or 'fleet default'})")
+        self._async_save()
+        await self._async_tick()
+
+    def cancel(self, domain_id: str) -> bool:
+        """Remove a queued upgrade that has not started yet."""
+        entry = self._queue.get(domain_id)
+        if not entry or entry["state"] == "running":
+            return False
+
+        del self._queue[domain_id]
+        _LOGGER.info(f"Domain {domain_id}: Scheduled upgrade cancelled")
+        self._async_save()
+        return True
+
+    @callback
+    def upgrade_finished(self, domain_id: str):
+        """Drop a domain from the queue once its upgrade workflow has ended."""
+        if self._queue.pop(domain_id, None) is not None:
+            self._async_save()
+
+    async def _async_tick(self, now=None):
+        """Start queued upgrades whose run-ahead time has been reached."""
+        now = dt_util.now()
+        run_ahead = timedelta(hours=float(get_entry_option(self.config_entry, "upgrade_run_ahead_hours")))
+        changed = False
+
+        for domain_id, entry in list(self._queue.items()):
+            if entry["state"] != "queued":
+                continue
+
+            window = self.get_window(domain_id)
+            if window and window.next_open(now) - run_ahead > now:
+                continue
+
+            coordinator = self.hass.data.get("datacenter_assistant", {}).get("coordinator")
+            data = coordinator.data if coordinator and coordinator.data else {}
+            domain_data = data.get("domain_updates", {}).get(domain_id, {})
+            update_status = domain_data.get("update_status")
+
+            if update_status != "updates_available":
+                # Missing, stale or failed checks leave the entry queued; only a confirmed up-to-date domain drops it
+                if update_status == "up_to_date" and not data.get("stale_since"):
+                    _LOGGER.warning(f"Domain {domain_id}: No update available, removing scheduled upgrade")
+                    del self._queue[domain_id]
+                    changed = True
+                else:
+                    _LOGGER.debug(f"Domain {domain_id}: Update status unknown ({update_status}), keeping scheduled upgrade")
+                continue
+
+            _LOGGER.info(f"Domain {domain_id}: Starting scheduled upgrade (window: {window or 'none'})")
+            if await self.upgrade_service.start_upgrade(domain_id, domain_data):
+                entry["state"] = "running"
+                changed = True
+
+        if changed:
+            self._async_save()
+
+    @callback
+    def _async_save(self):
+        """Persist the queue and update the queue entities."""
+        self._store.async_delay_save(lambda: {"queue": self._queue}, 1)
+        self._async_notify()
+
+    @callback
+    def _async_notify(self):
+        async_dispatcher_send(self.hass, UPGRADE_QUEUE_SIGNAL)
@@ -1,15 +1,45 @@
 """VCF Upgrade Service for handling VCF domain upgrades."""
 import asyncio
+import hashlib
+import json
 import logging
 import time
+from contextlib import contextmanager
 from typing import Dict, Any, Optional, List
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers.dispatcher import async_dispatcher_send
 from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.util import dt as dt_util
 from datetime import timedelta
-from .vcf_api import VCFAPIClient
+from .vcf_api import VCFAPIClient, VCFBundleCatalog, VCFLivenessProber
+from .upgrade_planner import VCFUpgradePlanner
+from .cluster_scheduler import VCFClusterUpgradeScheduler
+from .bundle_prestager import VCFBundlePrestager, ACTIVE_DOWNLOAD_STATES
+from .upgrade_scheduler import VCFUpgradeScheduler
+from .task_supervisor import get_task_supervisor
+from .coordinator import request_upgrades_refresh
+from .upgrade_history import VCFUpgradeHistory
+from .upgrade_log import VCFUpgradeLog, NO_MESSAGES
+from .utils import get_component_kind, get_entry_option, upgrade_update_signal
 
 _LOGGER = logging.getLogger(__name__)
 
+# Status, log and progress updates for a domain within this window (seconds) are sent together
+UPDATE_COALESCE_WINDOW = 1.0
+
+# Maximum time (seconds) the SDDC Manager API may stay unreachable during its own upgrade
+SDDC_MANAGER_OUTAGE_TIMEOUT = 7200
+
+# Seconds between progress checks of a running component upgrade
+UPGRADE_POLL_INTERVAL = 30
+
+# SDDC Manager task and subtask states (compared normalized, the API mixes "In Progress" and "IN_PROGRESS")
+TASK_DONE_STATES = ("SUCCESSFUL", "COMPLETED_WITH_WARNING", "SKIPPED", "NOT_APPLICABLE")
+TASK_FAILED_STATES = ("FAILED", "CANCELLED")
+
+# Seconds the upgrade status may lag behind its failed task before the upgrade is considered failed
+TASK_FAILURE_GRACE_PERIOD = 300
+
 class VCFUpgradeService:
     """Service to handle VCF domain upgrades following the upgrade workflow."""
     
@@ -17,8 +47,21 @@ class VCFUpgradeService:
         self.hass = hass
         self.config_entry = config_entry
         self.vcf_client = vcf_client
+        self.supervisor = get_task_supervisor(hass)
+        self.bundle_catalog = VCFBundleCatalog(vcf_client)
+        self.liveness_prober = VCFLivenessProber(vcf_client)
+        self.planner = VCFUpgradePlanner(self)
+        self.cluster_scheduler = VCFClusterUpgradeScheduler(self)
+        self.prestager = VCFBundlePrestager(self)
+        self.scheduler = VCFUpgradeScheduler(self)
+        self.history = VCFUpgradeHistory(hass)
         self._upgrade_states: Dict[str, Dict[str, Any]] = {}
         self._upgrade_tasks: Dict[str, asyncio.Task] = {}
+        self._precheck_tasks: Dict[str, asyncio.Task] = {}
+        self._upgrade_logs: Dict[str, VCFUpgradeLog] = {}
+        self._pending_updates: Dict[str, Dict[str, Any]] = {}
+        self._flush_handles: Dict[str, Optional[asyncio.TimerHandle]] = {}
+        self._precheck_cache: Dict[str, Dict[str, Any]] = {}
         
         # Initialize upgrade states for all domains
         self._initialize_upgrade_states()
@@ -33,8 +76,24 @@ class VCFUpgradeService:
         return self._upgrade_states.get(domain_id, {}).get("status", "waiting_for_initiation")
     
     def get_upgrade_logs(self, domain_id: str) -> str:
-        """Get current upgrade logs for a domain."""
-        return self._upgrade_states.get(domain_id, {}).get("logs", "No Messages")
+        """Get a markdown tail view of the upgrade log for a domain."""
+        upgrade_log = self._upgrade_logs.get(domain_id)
+        return upgrade_log.render_markdown() if upgrade_log else NO_MESSAGES
+    
+    def get_latest_upgrade_log(self, domain_id: str) -> Optional[Dict[str, Any]]:
+        """Get the most recent upgrade log entry for a domain."""
+        upgrade_log = self._upgrade_logs.get(domain_id)
+        return upgrade_log.latest if upgrade_log else None
+    
+    def get_upgrade_log_entries(self, domain_id: str, offset: int = 0, limit: int = 100) -> Dict[str, Any]:
+        """Get a page of structured upgrade log entries for a domain, oldest first."""
+        upgrade_log = self._upgrade_logs.get(domain_id)
+        return {
+            "domain_id": domain_id,
+            "total": len(upgrade_log) if upgrade_log else 0,
+            "offset": offset,
+            "entries": upgrade_log.get_page(offset, limit) if upgrade_log else []
+        }
     
     def set_upgrade_status(self, domain_id: str, status: str):
         """Set upgrade status for a domain."""
@@ -42,41 +101,214 @@ class VCFUpgradeService:
             self._upgrade_states[domain_id] = {}
         self._upgrade_states[domain_id]["status"] = status
         _LOGGER.info(f"Domain {domain_id} upgrade status changed to: {status}")
+        self._queue_update(domain_id, status=status)
+    
+    def add_upgrade_log(self, domain_id: str, message: str, level: str = "info", phase: Optional[str] = None):
+        """Append an entry to the upgrade log of a domain.
         
-        # Fire event for Home Assistant to update sensors (thread-safe)
-        def fire_status_event():
-            self.hass.bus.fire(
-                "vcf_upgrade_status_changed",
-                {"domain_id": domain_id, "status": status}
-            )
+        The phase defaults to the current upgrade status. Only the new entry is sent with the event.
+        """
+        upgrade_log = self._upgrade_logs.setdefault(domain_id, VCFUpgradeLog())
+        entry = upgrade_log.add(message, level, phase or self.get_upgrade_status(domain_id))
+        _LOGGER.debug(f"Domain {domain_id} upgrade log: {message}")
+        self._queue_update(domain_id, entry=entry)
+    
+    def _queue_update(self, domain_id: str, status: Optional[str] = None,
+                      entry: Optional[Dict[str, Any]] = None, progress: bool = False):
+        """Queue an update for a domain; updates within a short window are sent as one signal."""
+        pending = self._pending_updates.setdefault(domain_id, {"status": None, "entries": [], "progress": False})
+        if status is not None:
+            pending["status"] = status
+        if entry is not None:
+            pending["entries"].append(entry)
+        pending["progress"] = pending["progress"] or progress
         
-        if hasattr(self.hass, 'loop') and self.hass.loop.is_running():
-            # If called from a background thread, schedule on event loop
-            self.hass.loop.call_soon_threadsafe(fire_status_event)
+        if domain_id not in self._flush_handles:
+            # Placeholder until the timer is scheduled on the event loop (thread-safe)
+            self._flush_handles[domain_id] = None
+            self.hass.loop.call_soon_threadsafe(self._schedule_flush, domain_id)
+    
+    def _schedule_flush(self, domain_id: str):
+        """Schedule the coalesced update for a domain on the event loop."""
+        self._flush_handles[domain_id] = self.hass.loop.call_later(
+            UPDATE_COALESCE_WINDOW, self._flush_updates, domain_id
+        )
+    
+    def _flush_updates(self, domain_id: str):
+        """Send the coalesced update so that only this domain's entities wake up."""
+        self._flush_handles.pop(domain_id, None)
+        pending = self._pending_updates.pop(domain_id, None)
+        if pending:
+            async_dispatcher_send(self.hass, upgrade_update_signal(domain_id), pending)
+    
+    def get_upgrade_progress(self, domain_id: str) -> Optional[Dict[str, Any]]:
+        """Get percent complete and ETA for a domain based on recorded step durations."""
+        progress = self._upgrade_states.get(domain_id, {}).get("progress")
+        if not progress:
+            return None
+        
+        now = time.time()
+        done_seconds = 0.0
+        remaining_seconds = 0.0
+        current_step = None
+        
+        for step in progress["steps"]:
+            if step["status"] in ("done", "failed"):
+                done_seconds += step["duration"]
+            elif step["status"] == "running":
+                elapsed = now - step["started_at"]
+                fraction = step.get("task_fraction")
+                if fraction is not None:
+                    # Subtask progress of the SDDC Manager task refines the time-based estimate
+                    remaining = max(step["estimate"] * (1 - fraction), step["estimate"] * 0.05)
+                else:
+                    # A step running longer than estimated is assumed to be nearly done
+                    remaining = max(step["estimate"] - elapsed, step["estimate"] * 0.05)
+                done_seconds += elapsed
+                remaining_seconds += remaining
+                current_step = step["id"]
+            else:
+                remaining_seconds += step["estimate"]
+        
+        total_seconds = done_seconds + remaining_seconds
+        finished = progress.get("finished_at")
+        failed = progress.get("failed", False)
+        
+        if finished:
+            percent_complete, eta = 100.0, finished
         else:
-            # Already on main thread or loop not running
-            fire_status_event()
+            percent_complete = round(done_seconds / total_seconds * 100, 1) if total_seconds > 0 else 0.0
+            eta = None if failed else now + remaining_seconds
+        
+        return {
+            "percent_complete": percent_complete,
+            "remaining_seconds": None if failed else (0 if finished else round(remaining_seconds)),
+            "eta": eta,
+            "failed": failed,
+            "started_at": progress["started_at"],
+            "current_step": current_step,
+            "current_task": progress.get("task") if current_step else None,
+            "clusters": self.cluster_scheduler.get_cluster_states(domain_id),
+            "steps": [
+                {"id": step["id"], "status": step["status"], "estimate": round(step["estimate"]),
+                 "duration": round(step["duration"]) if step["duration"] is not None else None,
+                 "task_progress": round(step["task_fraction"] * 100) if step.get("task_fraction") is not None else None}
+                for step in progress["steps"]
+            ]
+        }
     
-    def set_upgrade_logs(self, domain_id: str, logs: str):
-        """Set upgrade logs for a domain."""
-        if domain_id not in self._upgrade_states:
-            self._upgrade_states[domain_id] = {}
-        self._upgrade_states[domain_id]["logs"] = logs
-        _LOGGER.debug(f"Domain {domain_id} upgrade logs updated")
-        
-        # Fire event for Home Assistant to update sensors (thread-safe)
-        def fire_logs_event():
-            self.hass.bus.fire(
-                "vcf_upgrade_logs_changed",
-                {"domain_id": domain_id, "logs": logs[:255]}  # Truncate for event
-            )
+    async def _begin_progress(self, domain_id: str, domain_data: Dict[str, Any], next_release: Dict[str, Any]):
+        """Set up progress tracking with estimated durations for every expected step."""
+        from_version = domain_data.get("current_version")
+        to_version = next_release.get("version")
+        
+        # Component steps follow the release bundles (bundle metadata comes from the catalog)
+        component_steps = []
+        for patch_bundle in next_release.get("patchBundles", []) or []:
+            bundle_id = patch_bundle.get("bundleId") if isinstance(patch_bundle, dict) else None
+            if not bundle_id:
+                continue
+            try:
+                component = await self.bundle_catalog.async_get_component(bundle_id) or {}
+            except Exception as e:
+                _LOGGER.debug(f"Domain {domain_id}: Could not read bundle {bundle_id} for progress estimate: {e}")
+                continue
+            kind = get_component_kind(component.get("type"))
+            if kind:
+                component_steps.append((f"component:{kind}", component.get("fromVersion"), component.get("toVersion")))
+        
+        step_definitions = [
+            ("phase:targeting_new_vcf_version", from_version, to_version),
+            ("phase:downloading_bundles", from_version, to_version),
+            ("phase:running_prechecks", from_version, to_version),
+            *component_steps,
+            ("phase:final_validation", from_version, to_version),
+        ]
+        
+        self._upgrade_states.setdefault(domain_id, {})["progress"] = {
+            "started_at": time.time(),
+            "finished_at": None,
+            "from_version": from_version,
+            "to_version": to_version,
+            "steps": [
+                {
+                    "id": step_id,
+                    "estimate": self.history.estimate(self.history.make_key(step_id, step_from, step_to)),
+                    "status": "pending",
+                    "started_at": None,
+                    "duration": None
+                }
+                for step_id, step_from, step_to in step_definitions
+            ]
+        }
+        self._notify_progress(domain_id)
+    
+    @contextmanager
+    def _timed_step(self, domain_id: str, step_id: str, from_version: Optional[str] = None, to_version: Optional[str] = None):
+        """Track a workflow step and record its duration in the history when it succeeds."""
+        progress = self._upgrade_states.get(domain_id, {}).get("progress")
+        if progress is None:
+            yield
+            return
+        
+        from_version = from_version or progress["from_version"]
+        to_version = to_version or progress["to_version"]
+        history_key = self.history.make_key(step_id, from_version, to_version)
+        
+        step = next((s for s in progress["steps"] if s["id"] == step_id and s["status"] == "pending"), None)
+        if step is None:
+            # Step was not expected when the upgrade started (e.g. bundle not in the release)
+            step = {"id": step_id, "estimate": self.history.estimate(history_key), "status": "pending",
+                    "started_at": None, "duration": None}
+            progress["steps"].insert(len(progress["steps"]) - 1, step)
+        
+        step["status"] = "running"
+        step["started_at"] = time.time()
+        progress["task"] = None
+        self._notify_progress(domain_id)
+        
+        try:
+            yield
+        except BaseException:
+            step["duration"] = time.time() - step["started_at"]
+            step["status"] = "failed"
+            self._notify_progress(domain_id)
+            raise
         
+        step["duration"] = time.time() - step["started_at"]
+        step["status"] = "done"
+        self.history.record(history_key, step["duration"])
+        _LOGGER.info(f"Domain {domain_id}: Step {step_id} finished in {step['duration']:.0f} seconds")
+        self._notify_progress(domain_id)
+        # Versions, bundles or release applicability may have changed
+        request_upgrades_refresh(self.hass, f"domain {domain_id} finished {step_id}")
+    
+    def _finish_progress(self, domain_id: str, success: bool = True):
+        """Mark progress tracking as finished or failed."""
+        progress = self._upgrade_states.get(domain_id, {}).get("progress")
+        if progress:
+            if success:
+                for step in progress["steps"]:
+                    if step["status"] == "pending":
+                        step["status"] = "skipped"
+                        step["estimate"] = 0
+                progress["finished_at"] = time.time()
+            else:
+                progress["failed"] = True
+            self._notify_progress(domain_id)
+    
+    def _fire_event(self, event_type: str, event_data: Dict[str, Any]):
+        """Fire a Home Assistant bus event (thread-safe)."""
         if hasattr(self.hass, 'loop') and self.hass.loop.is_running():
             # If called from a background thread, schedule on event loop
-            self.hass.loop.call_soon_threadsafe(fire_logs_event)
+            self.hass.loop.call_soon_threadsafe(self.hass.bus.async_fire, event_type, event_data)
         else:
             # Already on main thread or loop not running
-            fire_logs_event()
+            self.hass.bus.fire(event_type, event_data)
+    
+    def _notify_progress(self, domain_id: str):
+        """Notify sensors that upgrade progress changed."""
+        self._queue_update(domain_id, progress=True)
     
     async def start_upgrade(self, domain_id: str, domain_data: Dict[str, Any]) -> bool:
         """Start upgrade process for a domain."""
@@ -88,14 +320,15 @@ class VCFUpgradeService:
             
             # Check if update is available
             if domain_data.get("update_status") != "updates_available":
-                self.set_upgrade_logs(domain_id, "**No VCF update available**\n\nThere is currently no VCF update available for this domain.")
+                self.add_upgrade_log(domain_id, "There is currently no VCF update available for this domain.", "warning")
                 return False
             
-            # Start upgrade process
-            self.set_upgrade_logs(domain_id, "**VCF Upgrade Started**\n\nStarting VCF upgrade process...")
+            # Start upgrade process with a fresh log
+            self._upgrade_logs.setdefault(domain_id, VCFUpgradeLog()).clear()
+            self.add_upgrade_log(domain_id, "Starting VCF upgrade process...")
             
             # Create and start upgrade task
-            upgrade_task = asyncio.create_task(self._upgrade_workflow(domain_id, domain_data))
+            upgrade_task = self.supervisor.create_task(self._upgrade_after_prechecks(domain_id, domain_data), f"upgrade_workflow_{domain_id}")
             self._upgrade_tasks[domain_id] = upgrade_task
             
             return True
@@ -103,17 +336,28 @@ class VCFUpgradeService:
         except Exception as e:
             _LOGGER.error(f"Error starting upgrade for domain {domain_id}: {e}")
             self.set_upgrade_status(domain_id, "failed")
-            self.set_upgrade_logs(domain_id, f"**Upgrade Failed**\n\nError starting upgrade: {e}")
+            self.add_upgrade_log(domain_id, f"Error starting upgrade: {e}", "error")
             return False
     
+    async def _upgrade_after_prechecks(self, domain_id: str, domain_data: Dict[str, Any]):
+        """Run the upgrade workflow once separately started pre-checks have finished.
+        
+        The workflow then reuses their cached results instead of running the same checks again.
+        """
+        precheck_task = self._precheck_tasks.get(domain_id)
+        if precheck_task and not precheck_task.done():
+            self.add_upgrade_log(domain_id, "Waiting for the running pre-checks to finish...")
+            # Not awaited directly, so cancelling the upgrade leaves the pre-checks running
+            await asyncio.wait({precheck_task})
+        await self._upgrade_workflow(domain_id, domain_data)
+    
     async def acknowledge_alerts(self, domain_id: str) -> bool:
         """Acknowledge alerts and continue upgrade."""
         try:
             state = self._upgrade_states.get(domain_id, {})
             if state.get("status") == "waiting_acknowledgement":
                 state["acknowledged"] = True
-                self.set_upgrade_logs(domain_id, 
-                    state.get("logs", "") + "\n\n**Alerts Acknowledged**\n\nContinuing with upgrade process...")
+                self.add_upgrade_log(domain_id, "Alerts acknowledged. Continuing with upgrade process...")
                 return True
             return False
         except Exception as e:
@@ -129,14 +373,21 @@ class VCFUpgradeService:
             if not target_version:
                 raise ValueError("No target version found in next_release")
             
+            # Set up duration tracking for the ETA and progress sensors
+            await self.history.async_load()
+            await self._begin_progress(domain_id, domain_data, next_release)
+            
             # Step 1: Target the next VCF version
-            await self._target_vcf_version(domain_id, target_version)
+            with self._timed_step(domain_id, "phase:targeting_new_vcf_version"):
+                await self._target_vcf_version(domain_id, target_version)
             
             # Step 2: Download bundles
-            await self._download_bundles(domain_id, next_release)
+            with self._timed_step(domain_id, "phase:downloading_bundles"):
+                await self._download_bundles(domain_id, next_release)
             
             # Step 3: Run pre-checks
-            await self._run_prechecks(domain_id, target_version, next_release)
+            with self._timed_step(domain_id, "phase:running_prechecks"):
+                await self._run_prechecks(domain_id, target_version, next_release)
             
             # Step 4: Start upgrades
             _LOGGER.info(f"Domain {domain_id}: Starting component upgrades phase")
@@ -144,27 +395,59 @@ class VCFUpgradeService:
             
             # Step 5: Final validation
             _LOGGER.info(f"Domain {domain_id}: Starting final validation phase")
-            await self._final_validation(domain_id, target_version)
+            with self._timed_step(domain_id, "phase:final_validation"):
+                await self._final_validation(domain_id, target_version)
+            self._finish_progress(domain_id)
             
             # Success
             _LOGGER.info(f"Domain {domain_id}: Upgrade workflow completed successfully!")
             self.set_upgrade_status(domain_id, "successfully_completed")
-            self.set_upgrade_logs(domain_id, "**Upgrade Completed Successfully**\n\nVCF upgrade completed successfully!")
+            self.add_upgrade_log(domain_id, "VCF upgrade completed successfully!")
+            self._clear_precheck_cache(domain_id)
               # Reset to waiting state after a delay
             _LOGGER.info(f"Domain {domain_id}: Resetting upgrade status to waiting after 10 seconds")
             await asyncio.sleep(10)
             self.set_upgrade_status(domain_id, "waiting_for_initiation")
-            self.set_upgrade_logs(domain_id, "No Messages")
+            self.scheduler.upgrade_finished(domain_id)
+            
+        except asyncio.CancelledError:
+            # Integration unloaded; a scheduled upgrade stays queued and starts again after reload
+            _LOGGER.warning(f"Upgrade workflow for domain {domain_id} was cancelled")
+            self.add_upgrade_log(domain_id, "Upgrade workflow stopped because the integration was unloaded.", "warning")
+            raise
             
         except Exception as e:
             _LOGGER.error(f"Upgrade workflow failed for domain {domain_id}: {e}")
+            self._finish_progress(domain_id, success=False)
             self.set_upgrade_status(domain_id, "failed")
-            self.set_upgrade_logs(domain_id, f"**Upgrade Failed**\n\nError: {e}")
+            self.add_upgrade_log(domain_id, f"Error: {e}", "error")
+            self.scheduler.upgrade_finished(domain_id)
+            # Components upgraded before the failure have new versions
+            request_upgrades_refresh(self.hass, f"domain {domain_id} upgrade failed")
+    
+    async def _wait_for_maintenance_window(self, domain_id: str):
+        """Pause a scheduled upgrade until its maintenance window is open."""
+        window = self.scheduler.get_window(domain_id)
+        if window is None or window.is_open(dt_util.now()):
+            return
+        
+        previous_status = self.get_upgrade_status(domain_id)
+        next_open = window.next_open(dt_util.now())
+        
+        _LOGGER.info(f"Domain {domain_id}: Maintenance window closed, pausing until {next_open}")
+        self.set_upgrade_status(domain_id, "waiting_for_window")
+        self.add_upgrade_log(domain_id, f"Maintenance window is closed. Component upgrades continue at {next_open:%Y-%m-%d %H:%M}.")
+        
+        while not window.is_open(dt_util.now()):
+            await asyncio.sleep(60)
+        
+        self.set_upgrade_status(domain_id, previous_status)
+        self.add_upgrade_log(domain_id, "Maintenance window opened. Continuing component upgrades...")
     
     async def _target_vcf_version(self, domain_id: str, target_version: str):
         """Target the next VCF version for the domain."""
         self.set_upgrade_status(domain_id, "targeting_new_vcf_version")
-        self.set_upgrade_logs(domain_id, f"**Targeting VCF Version**\n\nTargeting VCF version {target_version}...")
+        self.add_upgrade_log(domain_id, f"Targeting VCF version {target_version}...")
         
         try:
             data = {"targetVersion": target_version}
@@ -189,7 +472,7 @@ class VCFUpgradeService:
     async def _download_bundles(self, domain_id: str, next_release: Dict[str, Any]):
         """Download all necessary bundles."""
         self.set_upgrade_status(domain_id, "downloading_bundles")
-        self.set_upgrade_logs(domain_id, "**Downloading Bundles**\n\nDownloading required bundles...")
+        self.add_upgrade_log(domain_id, "Downloading required bundles...")
         
         try:
             patch_bundles = next_release.get("patchBundles", [])
@@ -217,31 +500,35 @@ class VCFUpgradeService:
                     # Bundle already downloaded, skip
                     _LOGGER.info(f"Domain {domain_id}: Bundle {bundle_id} already downloaded, skipping")
                     downloaded += 1
-                    self.set_upgrade_logs(domain_id, 
-                        f"**Downloading Bundles**\n\nProgress: {downloaded}/{total_bundles} bundles downloaded... (bundle {bundle_id} already downloaded)")
+                    self.add_upgrade_log(domain_id, 
+                        f"Progress: {downloaded}/{total_bundles} bundles downloaded... (bundle {bundle_id} already downloaded)")
                     continue
                 
-                # Start download with correct data structure
-                _LOGGER.debug(f"Domain {domain_id}: Starting download for bundle {bundle_id}")
-                download_data = {
-                    "bundleDownloadSpec": {
-                        "downloadNow": True
+                if current_download_status in ACTIVE_DOWNLOAD_STATES:
+                    # Download already running (e.g. started by pre-staging), just wait for it
+                    _LOGGER.info(f"Domain {domain_id}: Bundle {bundle_id} download already in progress, waiting")
+                else:
+                    # Start download with correct data structure
+                    _LOGGER.debug(f"Domain {domain_id}: Starting download for bundle {bundle_id}")
+                    download_data = {
+                        "bundleDownloadSpec": {
+                            "downloadNow": True
+                        }
                     }
-                }
-                
-                try:
-                    await self.vcf_client.api_request(f"/v1/bundles/{bundle_id}", method="PATCH", data=download_data)
-                except Exception as e:
-                    # If bundle is already downloaded or download request fails, check status
-                    bundle_status = await self.vcf_client.api_request(f"/v1/bundles/{bundle_id}")
-                    current_download_status = bundle_status.get("downloadStatus")
-                    if current_download_status == "SUCCESSFUL":
-                        downloaded += 1
-                        self.set_upgrade_logs(domain_id, 
-                            f"**Downloading Bundles**\n\nProgress: {downloaded}/{total_bundles} bundles downloaded... (bundle {bundle_id} was already downloaded)")
-                        continue
-                    else:
-                        raise Exception(f"Failed to start download for bundle {bundle_id}: {e}")
+                    
+                    try:
+                        await self.vcf_client.api_request(f"/v1/bundles/{bundle_id}", method="PATCH", data=download_data)
+                    except Exception as e:
+                        # If bundle is already downloaded or download request fails, check status
+                        bundle_status = await self.vcf_client.api_request(f"/v1/bundles/{bundle_id}")
+                        current_download_status = bundle_status.get("downloadStatus")
+                        if current_download_status == "SUCCESSFUL":
+                            downloaded += 1
+                            self.add_upgrade_log(domain_id, 
+                                f"Progress: {downloaded}/{total_bundles} bundles downloaded... (bundle {bundle_id} was already downloaded)")
+                            continue
+                        elif current_download_status not in ACTIVE_DOWNLOAD_STATES:
+                            raise Exception(f"Failed to start download for bundle {bundle_id}: {e}")
                 
                 # Wait for download completion
                 while True:
@@ -250,8 +537,8 @@ class VCFUpgradeService:
                     
                     if download_status == "SUCCESSFUL":
                         downloaded += 1
-                        self.set_upgrade_logs(domain_id, 
-                            f"**Downloading Bundles**\n\nProgress: {downloaded}/{total_bundles} bundles downloaded...")
+                        self.add_upgrade_log(domain_id, 
+                            f"Progress: {downloaded}/{total_bundles} bundles downloaded...")
                         break
                     elif download_status == "FAILED":
                         raise Exception(f"Bundle download failed for bundle {bundle_id}")
@@ -267,210 +554,10 @@ class VCFUpgradeService:
         """Run pre-checks for the upgrade."""
         _LOGGER.info(f"Domain {domain_id}: Starting pre-checks for target version {target_version}")
         self.set_upgrade_status(domain_id, "running_prechecks")
-        self.set_upgrade_logs(domain_id, "**Running Pre-checks**\n\nRunning upgrade pre-checks...")
+        self.add_upgrade_log(domain_id, "Running upgrade pre-checks...")
         
         try:
-            # Step 1: Get available check-sets (initial query)
-            _LOGGER.debug(f"Domain {domain_id}: Step 1 - Getting available check-sets")
-            query_data = {
-                "checkSetType": "UPGRADE",
-                "domains": [{"domainId": domain_id}]
-            }
-            
-            _LOGGER.debug(f"Domain {domain_id}: Sending initial check-sets query: {query_data}")
-            first_response = await self.vcf_client.api_request("/v1/system/check-sets/queries", method="POST", data=query_data)
-            _LOGGER.debug(f"Domain {domain_id}: Initial check-sets response: {first_response}")
-            
-            # Extract resource types from initial response
-            initial_resources_data = []
-            first_response_resources = first_response.get("resources", [])
-            _LOGGER.info(f"Domain {domain_id}: Found {len(first_response_resources) if isinstance(first_response_resources, list) else 0} resources in initial response")
-            
-            if isinstance(first_response_resources, list):
-                for i, resource in enumerate(first_response_resources, 1):
-                    if isinstance(resource, dict):
-                        resource_type = resource.get("resourceType")
-                        resource_id = resource.get("resourceId")
-                        resource_name = resource.get("resourceName")
-                        num_check_sets = len(resource.get("checkSets", [])) if isinstance(resource.get("checkSets"), list) else 0
-                        
-                        _LOGGER.info(f"Domain {domain_id}: Initial resource {i} - Type: {resource_type}, ID: {resource_id}, Name: {resource_name}, Check sets: {num_check_sets}")
-                        
-                        if resource_type:
-                            # Store the complete initial resource data
-                            initial_resources_data.append({
-                                "resourceType": resource_type,
-                                "resourceId": resource_id,
-                                "resourceName": resource_name,
-                                "domain": resource.get("domain"),
-                                "checkSets": resource.get("checkSets", [])
-                            })
-                        else:
-                            _LOGGER.warning(f"Domain {domain_id}: Skipping resource {i} with no resource type: {resource}")
-                    else:
-                        _LOGGER.warning(f"Domain {domain_id}: Skipping invalid resource {i}: {resource}")
-            else:
-                _LOGGER.warning(f"Domain {domain_id}: Initial response resources is not a list: {first_response_resources}")
-            
-            _LOGGER.info(f"Domain {domain_id}: Processed {len(initial_resources_data)} valid resources from initial response")
-            
-            # Step 2: Process BOM (Bill of Materials) and prepare resources with target versions
-            _LOGGER.debug(f"Domain {domain_id}: Step 2 - Processing BOM (Bill of Materials)")
-            bom_data = next_release.get("bom", [])
-            _LOGGER.info(f"Domain {domain_id}: Found {len(bom_data) if isinstance(bom_data, list) else 0} BOM entries")
-            
-            bom_map = {}
-            if isinstance(bom_data, list):
-                for i, item in enumerate(bom_data, 1):
-                    if isinstance(item, dict):
-                        name = item.get("name")
-                        version = item.get("version")
-                        _LOGGER.debug(f"Domain {domain_id}: BOM {i} - Component: {name}, Version: {version}")
-                        if name and version:
-                            bom_map[name] = version
-            
-            _LOGGER.info(f"Domain {domain_id}: Created BOM mapping for {len(bom_map)} components: {list(bom_map.keys())}")
-            
-            # Build resources with target versions for detailed query (only for resources that have target versions)
-            resources_with_versions = []
-            _LOGGER.debug(f"Domain {domain_id}: Mapping resources to target versions")
-            
-            for resource_data in initial_resources_data:
-                resource_type = resource_data["resourceType"]
-
-                if resource_type == "CLUSTER":
-                    resource_type = "HOST"
-
-                target_resource_version = bom_map.get(resource_type)
-                
-                _LOGGER.debug(f"Domain {domain_id}: Resource {resource_type} -> Target version: {target_resource_version}")
-                
-                if target_resource_version:
-                    resource_spec = {
-                        "resourceType": resource_type,
-                        "resourceTargetVersion": target_resource_version
-                    }
-                    resources_with_versions.append(resource_spec)
-                    _LOGGER.info(f"Domain {domain_id}: Mapped {resource_type} to version {target_resource_version}")
-                else:
-                    _LOGGER.info(f"Domain {domain_id}: Including {resource_type} without target version (will use check sets from initial response)")
-            
-            _LOGGER.info(f"Domain {domain_id}: {len(resources_with_versions)} resources prepared for detailed query")
-            
-            # Step 3: Get detailed check-sets (only for resources with target versions)
-            detailed_resources_data = []
-            if resources_with_versions:
-                _LOGGER.debug(f"Domain {domain_id}: Step 3 - Getting detailed check-sets")
-                detailed_query_data = {
-                    "checkSetType": "UPGRADE",
-                    "domains": [{
-                        "domainId": domain_id,
-                        "resources": resources_with_versions
-                    }]
-                }
-                
-                _LOGGER.debug(f"Domain {domain_id}: Sending detailed check-sets query: {detailed_query_data}")
-                second_response = await self.vcf_client.api_request("/v1/system/check-sets/queries", method="POST", data=detailed_query_data)
-                _LOGGER.debug(f"Domain {domain_id}: Detailed check-sets response keys: {list(second_response.keys()) if isinstance(second_response, dict) else 'Not a dict'}")
-                
-                query_id = second_response.get("queryId")
-                _LOGGER.info(f"Domain {domain_id}: Got query ID: {query_id}")
-                
-                # Extract detailed resources
-                second_response_resources = second_response.get("resources", [])
-                if isinstance(second_response_resources, list):
-                    for i, resource in enumerate(second_response_resources, 1):
-                        if isinstance(resource, dict):
-                            resource_type = resource.get("resourceType")
-                            resource_id = resource.get("resourceId")
-                            resource_name = resource.get("resourceName")
-                            num_check_sets = len(resource.get("checkSets", [])) if isinstance(resource.get("checkSets"), list) else 0
-                            
-                            _LOGGER.info(f"Domain {domain_id}: Detailed resource {i} - Type: {resource_type}, ID: {resource_id}, Name: {resource_name}, Check sets: {num_check_sets}")
-                            
-                            if resource_type:
-                                detailed_resources_data.append(resource)
-                
-                _LOGGER.info(f"Domain {domain_id}: Processed {len(detailed_resources_data)} resources from detailed response")
-            else:
-                query_id = first_response.get("queryId")
-                _LOGGER.info(f"Domain {domain_id}: No resources with target versions, using initial query ID: {query_id}")
-            
-            # Step 4: Build final check-sets request data
-            _LOGGER.debug(f"Domain {domain_id}: Step 4 - Building final check-sets request")
-            check_set_data = {
-                "resources": [],
-                "queryId": query_id,
-                "metadata": {
-                    "targetVersion": target_version
-                }
-            }
-            
-            # Store resource info for later use
-            resource_info = {}
-            
-            # Create map of detailed resources by type for lookup
-            detailed_resources_map = {}
-            for resource in detailed_resources_data:
-                resource_type = resource.get("resourceType")
-                if resource_type:
-                    detailed_resources_map[resource_type] = resource
-            
-            # Process all initial resources and use detailed data when available
-            _LOGGER.info(f"Domain {domain_id}: Building final check-sets data using all {len(initial_resources_data)} initial resources")
-            
-            for i, initial_resource in enumerate(initial_resources_data, 1):
-                resource_type = initial_resource["resourceType"]
-                resource_id = initial_resource["resourceId"]
-                resource_name = initial_resource["resourceName"]
-                
-                _LOGGER.info(f"Domain {domain_id}: Processing resource {i}/{len(initial_resources_data)} - Type: {resource_type}, ID: {resource_id}, Name: {resource_name}")
-                
-                if resource_id and resource_type:
-                    resource_info[resource_type] = resource_id
-                
-                # Use detailed response if available, otherwise use initial response
-                if resource_type in detailed_resources_map:
-                    resource_to_use = detailed_resources_map[resource_type]
-                    _LOGGER.debug(f"Domain {domain_id}: Using detailed response data for {resource_type}")
-                else:
-                    resource_to_use = initial_resource
-                    _LOGGER.info(f"Domain {domain_id}: Using initial response data for {resource_type} (not in detailed response)")
-                
-                # Build check sets list
-                check_sets_list = []
-                resource_check_sets = resource_to_use.get("checkSets", [])
-                
-                _LOGGER.info(f"Domain {domain_id}: Resource {resource_type} has {len(resource_check_sets) if isinstance(resource_check_sets, list) else 0} check sets")
-                
-                if isinstance(resource_check_sets, list):
-                    for j, cs in enumerate(resource_check_sets, 1):
-                        if isinstance(cs, dict):
-                            check_set_id = cs.get("checkSetId")
-                            check_set_name = cs.get("checkSetName", "Unknown")
-                            _LOGGER.debug(f"Domain {domain_id}: Check set {j} for {resource_type} - ID: {check_set_id}, Name: {check_set_name}")
-                            if check_set_id:
-                                check_sets_list.append({"checkSetId": check_set_id})
-                
-                _LOGGER.info(f"Domain {domain_id}: Added {len(check_sets_list)} valid check sets for resource {resource_type}")
-                
-                # Build final resource entry
-                final_resource_entry = {
-                    "resourceType": resource_to_use.get("resourceType"),
-                    "resourceId": resource_to_use.get("resourceId"),
-                    "resourceName": resource_to_use.get("resourceName"),
-                    "checkSets": check_sets_list
-                }
-                
-                # Add domain info if available
-                domain_info = resource_to_use.get("domain")
-                if domain_info:
-                    final_resource_entry["domain"] = domain_info
-                
-                check_set_data["resources"].append(final_resource_entry)
-                _LOGGER.debug(f"Domain {domain_id}: Added resource {resource_type} to final check-sets (with {len(check_sets_list)} check sets)")
-            
-            _LOGGER.info(f"Domain {domain_id}: Prepared check-sets for {len(check_set_data['resources'])} resources")
+            check_set_data, resource_info = await self._build_precheck_spec(domain_id, target_version, next_release)
             
             # Store resource info for upgrade execution
             if domain_id not in self._upgrade_states:
@@ -478,87 +565,15 @@ class VCFUpgradeService:
             self._upgrade_states[domain_id]["resource_info"] = resource_info
             _LOGGER.debug(f"Domain {domain_id}: Stored resource info: {resource_info}")
             
-            # Execute pre-checks
-            _LOGGER.info(f"Domain {domain_id}: Executing pre-checks with final check-set data...")
-            _LOGGER.debug(f"Domain {domain_id}: Final check-set data: {check_set_data}")
-            precheck_response = await self.vcf_client.api_request("/v1/system/check-sets", method="POST", data=check_set_data)
-            _LOGGER.debug(f"Domain {domain_id}: Pre-check execution response: {precheck_response}")
-            
-            # Handle potential string response from PATCH operations
-            if isinstance(precheck_response, dict):
-                run_id = precheck_response.get("id")
+            cached_run = self._get_cached_precheck(domain_id, target_version, check_set_data)
+            if cached_run:
+                age_minutes = round((time.time() - cached_run["finished_at"]) / 60)
+                _LOGGER.info(f"Domain {domain_id}: Reusing pre-check run {cached_run['run_id']} from {age_minutes} minutes ago")
+                self.add_upgrade_log(domain_id, f"Reusing pre-check results from {age_minutes} minutes ago (same target version and resources).")
+                error_count, warning_count = cached_run["error_count"], cached_run["warning_count"]
             else:
-                _LOGGER.warning(f"Domain {domain_id}: Pre-check response is not a dict: {precheck_response}")
-                raise Exception("Pre-check execution did not return expected response format")
+                error_count, warning_count = await self._execute_prechecks(domain_id, target_version, check_set_data)
             
-            if not run_id:
-                raise Exception(f"No run ID returned from pre-check execution. Response: {precheck_response}")
-            
-            _LOGGER.info(f"Domain {domain_id}: Pre-checks started with run ID: {run_id}")
-            
-            # Wait for pre-checks to complete
-            check_count = 0
-            while True:
-                check_count += 1
-                _LOGGER.debug(f"Domain {domain_id}: Pre-check status check #{check_count}")
-                
-                status_response = await self.vcf_client.api_request(f"/v1/system/check-sets/{run_id}")
-                
-                if not isinstance(status_response, dict):
-                    raise Exception(f"Unexpected response format from status check: {status_response}")
-                    
-                status = status_response.get("status")
-                progress = status_response.get("progress", {})
-                
-                _LOGGER.info(f"Domain {domain_id}: Pre-check status: {status}")
-                if isinstance(progress, dict) and progress:
-                    _LOGGER.debug(f"Domain {domain_id}: Pre-check progress: {progress}")
-                
-                if status == "COMPLETED_WITH_SUCCESS":
-                    _LOGGER.info(f"Domain {domain_id}: Pre-checks completed successfully")
-                    break
-                elif status == "COMPLETED_WITH_FAILURE":
-                    _LOGGER.error(f"Domain {domain_id}: Pre-checks failed")
-                    raise Exception("Pre-checks failed")
-                elif status in ["FAILED", "CANCELLED"]:
-                    _LOGGER.error(f"Domain {domain_id}: Pre-checks ended with status: {status}")
-                    raise Exception(f"Pre-checks ended with status: {status}")
-                
-                _LOGGER.debug(f"Domain {domain_id}: Pre-checks still running, waiting 30 seconds...")
-                await asyncio.sleep(30)  # Check every 30 seconds
-            
-            # Check for errors and warnings
-            _LOGGER.debug(f"Domain {domain_id}: Processing pre-check results")
-            assessment_output = status_response.get("presentedArtifactsMap", {})
-            _LOGGER.debug(f"Domain {domain_id}: Assessment output keys: {list(assessment_output.keys()) if isinstance(assessment_output, dict) else 'Not a dict'}")
-            
-            error_count = 0
-            warning_count = 0
-            
-            if isinstance(assessment_output, dict):
-                validation_summary = assessment_output.get("validation-domain-summary", [{}])
-                _LOGGER.debug(f"Domain {domain_id}: Validation summary type: {type(validation_summary)}, length: {len(validation_summary) if isinstance(validation_summary, list) else 'N/A'}")
-                
-                if isinstance(validation_summary, list) and len(validation_summary) > 0:
-                    validation_data = validation_summary[0]
-                    _LOGGER.debug(f"Domain {domain_id}: Validation data: {validation_data}")
-                    
-                    if isinstance(validation_data, dict):
-                        error_count = validation_data.get("errorValidationsCount", 0)
-                        warning_count = validation_data.get("warningGapsCount", 0)
-                        
-                        # Log additional validation details if available
-                        for key, value in validation_data.items():
-                            if "count" in key.lower() or "error" in key.lower() or "warning" in key.lower():
-                                _LOGGER.debug(f"Domain {domain_id}: {key}: {value}")
-                    else:
-                        _LOGGER.warning(f"Domain {domain_id}: Validation data is not a dict: {validation_data}")
-                else:
-                    _LOGGER.warning(f"Domain {domain_id}: Validation summary is empty or not a list")
-            else:
-                _LOGGER.warning(f"Domain {domain_id}: Assessment output is not a dict")
-            
-            _LOGGER.info(f"Domain {domain_id}: Pre-check results - Errors: {error_count}, Warnings: {warning_count}")
             
             if error_count > 0 or warning_count > 0:
                 _LOGGER.warning(f"Domain {domain_id}: Pre-checks completed with issues - Errors: {error_count}, Warnings: {warning_count}")
@@ -577,18 +592,12 @@ class VCFUpgradeService:
                 if not domain_fqdn:
                     _LOGGER.warning(f"Domain {domain_id}: Could not find domain FQDN for pre-check details URL")
                 
-                logs = f"""**Pre-check Results**
-
-Errors: {error_count}
-Warnings: {warning_count}
-
-More detailscan be found in the SDDC Manager UI at:
-https://{domain_fqdn}/ui/sddc-manager/inventory/domains/mgmt-vi-domains/{domain_id}/summary(monitoring-panel:monitoring/tasks)
-
-Waiting for acknowledgement..."""
-                
                 self.set_upgrade_status(domain_id, "waiting_acknowledgement")
-                self.set_upgrade_logs(domain_id, logs)
+                self.add_upgrade_log(domain_id, f"Errors: {error_count}\nWarnings: {warning_count}", "warning")
+                self.add_upgrade_log(domain_id, 
+                    f"More details can be found in the SDDC Manager UI at:\n"
+                    f"https://{domain_fqdn}/ui/sddc-manager/inventory/domains/mgmt-vi-domains/{domain_id}/summary(monitoring-panel:monitoring/tasks)")
+                self.add_upgrade_log(domain_id, "Waiting for acknowledgement...")
                 
                 _LOGGER.info(f"Domain {domain_id}: Waiting for user acknowledgement of pre-check issues")
                 
@@ -605,16 +614,390 @@ Waiting for acknowledgement..."""
                 self._upgrade_states[domain_id]["acknowledged"] = False
             else:
                 _LOGGER.info(f"Domain {domain_id}: Pre-checks passed successfully with no errors or warnings")
-                self.set_upgrade_logs(domain_id, "**Pre-check Results**\n\nPre-check passed successfully. No warnings or errors. Continuing...")
+                self.add_upgrade_log(domain_id, "Pre-check passed successfully. No warnings or errors. Continuing...")
             
         except Exception as e:
             _LOGGER.error(f"Domain {domain_id}: Pre-checks failed with exception: {e}")
             raise Exception(f"Pre-checks failed: {e}")
     
+    async def _execute_prechecks(self, domain_id: str, target_version: str, check_set_data: Dict[str, Any]):
+        """Run a check-set, wait for it and return its error and warning counts."""
+        # Execute pre-checks
+        _LOGGER.info(f"Domain {domain_id}: Executing pre-checks with final check-set data...")
+        _LOGGER.debug(f"Domain {domain_id}: Final check-set data: {check_set_data}")
+        precheck_response = await self.vcf_client.api_request("/v1/system/check-sets", method="POST", data=check_set_data)
+        _LOGGER.debug(f"Domain {domain_id}: Pre-check execution response: {precheck_response}")
+        
+        # Handle potential string response from PATCH operations
+        if isinstance(precheck_response, dict):
+            run_id = precheck_response.get("id")
+        else:
+            _LOGGER.warning(f"Domain {domain_id}: Pre-check response is not a dict: {precheck_response}")
+            raise Exception("Pre-check execution did not return expected response format")
+        
+        if not run_id:
+            raise Exception(f"No run ID returned from pre-check execution. Response: {precheck_response}")
+        
+        _LOGGER.info(f"Domain {domain_id}: Pre-checks started with run ID: {run_id}")
+        
+        # Wait for pre-checks to complete
+        check_count = 0
+        while True:
+            check_count += 1
+            _LOGGER.debug(f"Domain {domain_id}: Pre-check status check #{check_count}")
+            
+            status_response = await self.vcf_client.api_request(f"/v1/system/check-sets/{run_id}")
+            
+            if not isinstance(status_response, dict):
+                raise Exception(f"Unexpected response format from status check: {status_response}")
+                
+            status = status_response.get("status")
+            progress = status_response.get("progress", {})
+            
+            _LOGGER.info(f"Domain {domain_id}: Pre-check status: {status}")
+            if isinstance(progress, dict) and progress:
+                _LOGGER.debug(f"Domain {domain_id}: Pre-check progress: {progress}")
+            
+            if status == "COMPLETED_WITH_SUCCESS":
+                _LOGGER.info(f"Domain {domain_id}: Pre-checks completed successfully")
+                break
+            elif status == "COMPLETED_WITH_FAILURE":
+                _LOGGER.error(f"Domain {domain_id}: Pre-checks failed")
+                raise Exception("Pre-checks failed")
+            elif status in ["FAILED", "CANCELLED"]:
+                _LOGGER.error(f"Domain {domain_id}: Pre-checks ended with status: {status}")
+                raise Exception(f"Pre-checks ended with status: {status}")
+            
+            _LOGGER.debug(f"Domain {domain_id}: Pre-checks still running, waiting 30 seconds...")
+            await asyncio.sleep(30)  # Check every 30 seconds
+        
+        # Check for errors and warnings
+        _LOGGER.debug(f"Domain {domain_id}: Processing pre-check results")
+        assessment_output = status_response.get("presentedArtifactsMap", {})
+        _LOGGER.debug(f"Domain {domain_id}: Assessment output keys: {list(assessment_output.keys()) if isinstance(assessment_output, dict) else 'Not a dict'}")
+        
+        error_count = 0
+        warning_count = 0
+        
+        if isinstance(assessment_output, dict):
+            validation_summary = assessment_output.get("validation-domain-summary", [{}])
+            _LOGGER.debug(f"Domain {domain_id}: Validation summary type: {type(validation_summary)}, length: {len(validation_summary) if isinstance(validation_summary, list) else 'N/A'}")
+            
+            if isinstance(validation_summary, list) and len(validation_summary) > 0:
+                validation_data = validation_summary[0]
+                _LOGGER.debug(f"Domain {domain_id}: Validation data: {validation_data}")
+                
+                if isinstance(validation_data, dict):
+                    error_count = validation_data.get("errorValidationsCount", 0)
+                    warning_count = validation_data.get("warningGapsCount", 0)
+                    
+                    # Log additional validation details if available
+                    for key, value in validation_data.items():
+                        if "count" in key.lower() or "error" in key.lower() or "warning" in key.lower():
+                            _LOGGER.debug(f"Domain {domain_id}: {key}: {value}")
+                else:
+                    _LOGGER.warning(f"Domain {domain_id}: Validation data is not a dict: {validation_data}")
+            else:
+                _LOGGER.warning(f"Domain {domain_id}: Validation summary is empty or not a list")
+        else:
+            _LOGGER.warning(f"Domain {domain_id}: Assessment output is not a dict")
+        
+        _LOGGER.info(f"Domain {domain_id}: Pre-check results - Errors: {error_count}, Warnings: {warning_count}")
+        
+        self._cache_precheck(domain_id, target_version, check_set_data, run_id, error_count, warning_count)
+        return error_count, warning_count
+    
+    @staticmethod
+    def _precheck_cache_key(domain_id: str, target_version: str, check_set_data: Dict[str, Any]) -> str:
+        """Build the pre-check cache key from the domain, target version and submitted resources."""
+        resources = [
+            {
+                "resourceType": resource.get("resourceType"),
+                "resourceId": resource.get("resourceId"),
+                "resourceTargetVersion": resource.get("resourceTargetVersion"),
+                "checkSetIds": sorted(check_set.get("checkSetId") or "" for check_set in resource.get("checkSets", []))
+            }
+            for resource in check_set_data.get("resources", [])
+        ]
+        resources.sort(key=lambda resource: (resource["resourceType"] or "", resource["resourceId"] or ""))
+        resources_hash = hashlib.sha256(json.dumps(resources, sort_keys=True).encode()).hexdigest()[:16]
+        return f"{domain_id}|{target_version}|{resources_hash}"
+    
+    def _get_cached_precheck(self, domain_id: str, target_version: str, check_set_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Get a completed pre-check run for the same inputs that is still within the freshness window."""
+        max_age = float(get_entry_option(self.config_entry, "precheck_max_age_minutes")) * 60
+        if max_age <= 0:
+            return None
+        
+        cached_run = self._precheck_cache.get(self._precheck_cache_key(domain_id, target_version, check_set_data))
+        if cached_run and time.time() - cached_run["finished_at"] <= max_age:
+            return cached_run
+        return None
+    
+    def _cache_precheck(self, domain_id: str, target_version: str, check_set_data: Dict[str, Any],
+                        run_id: str, error_count: int, warning_count: int):
+        """Remember a completed pre-check run."""
+        self._precheck_cache[self._precheck_cache_key(domain_id, target_version, check_set_data)] = {
+            "run_id": run_id,
+            "domain_id": domain_id,
+            "target_version": target_version,
+            "finished_at": time.time(),
+            "error_count": error_count,
+            "warning_count": warning_count
+        }
+    
+    def _clear_precheck_cache(self, domain_id: str):
+        """Forget the pre-check runs of a domain, e.g. after its inventory changed."""
+        for key in [key for key, cached_run in self._precheck_cache.items() if cached_run["domain_id"] == domain_id]:
+            del self._precheck_cache[key]
+    
+    async def run_prechecks_only(self, domain_id: str, domain_data: Dict[str, Any]) -> bool:
+        """Run the pre-checks of the next upgrade in the background without starting the upgrade."""
+        if domain_id in self._upgrade_tasks and not self._upgrade_tasks[domain_id].done():
+            _LOGGER.warning(f"Upgrade already running for domain {domain_id}, not starting separate pre-checks")
+            return False
+        
+        if domain_id in self._precheck_tasks and not self._precheck_tasks[domain_id].done():
+            _LOGGER.warning(f"Pre-checks already running for domain {domain_id}")
+            return False
+        
+        next_release = domain_data.get("next_release") or {}
+        target_version = next_release.get("version")
+        if domain_data.get("update_status") != "updates_available" or not target_version:
+            self.add_upgrade_log(domain_id, "There is currently no VCF update available for this domain.", "warning")
+            return False
+        
+        async def prechecks():
+            self.add_upgrade_log(domain_id, f"Running pre-checks for VCF {target_version} ahead of the upgrade...", phase="running_prechecks")
+            try:
+                check_set_data, _ = await self._build_precheck_spec(domain_id, target_version, next_release)
+                if self._get_cached_precheck(domain_id, target_version, check_set_data):
+                    self.add_upgrade_log(domain_id, "Recent pre-check results for this target are still fresh, nothing to do.", phase="running_prechecks")
+                    return
+                error_count, warning_count = await self._execute_prechecks(domain_id, target_version, check_set_data)
+                level = "warning" if error_count or warning_count else "info"
+                self.add_upgrade_log(domain_id, f"Pre-checks finished. Errors: {error_count}, Warnings: {warning_count}", level, phase="running_prechecks")
+            except Exception as e:
+                _LOGGER.error(f"Domain {domain_id}: Pre-checks failed: {e}")
+                self.add_upgrade_log(domain_id, f"Pre-checks failed: {e}", "error", phase="running_prechecks")
+        
+        self._precheck_tasks[domain_id] = self.supervisor.create_task(prechecks(), f"prechecks_{domain_id}")
+        return True
+    
+    async def _build_precheck_spec(self, domain_id: str, target_version: str, next_release: Dict[str, Any]):
+        """Query available check-sets and build the pre-check request for a target version.
+        
+        Only the check-set query endpoint is used, so this is safe for planning.
+        Returns the check-set request data and the resource IDs by resource type.
+        """
+        # Step 1: Get available check-sets (initial query)
+        _LOGGER.debug(f"Domain {domain_id}: Step 1 - Getting available check-sets")
+        query_data = {
+            "checkSetType": "UPGRADE",
+            "domains": [{"domainId": domain_id}]
+        }
+        
+        _LOGGER.debug(f"Domain {domain_id}: Sending initial check-sets query: {query_data}")
+        first_response = await self.vcf_client.api_request("/v1/system/check-sets/queries", method="POST", data=query_data)
+        _LOGGER.debug(f"Domain {domain_id}: Initial check-sets response: {first_response}")
+        
+        # Extract resource types from initial response
+        initial_resources_data = []
+        first_response_resources = first_response.get("resources", [])
+        _LOGGER.info(f"Domain {domain_id}: Found {len(first_response_resources) if isinstance(first_response_resources, list) else 0} resources in initial response")
+        
+        if isinstance(first_response_resources, list):
+            for i, resource in enumerate(first_response_resources, 1):
+                if isinstance(resource, dict):
+                    resource_type = resource.get("resourceType")
+                    resource_id = resource.get("resourceId")
+                    resource_name = resource.get("resourceName")
+                    num_check_sets = len(resource.get("checkSets", [])) if isinstance(resource.get("checkSets"), list) else 0
+                    
+                    _LOGGER.info(f"Domain {domain_id}: Initial resource {i} - Type: {resource_type}, ID: {resource_id}, Name: {resource_name}, Check sets: {num_check_sets}")
+                    
+                    if resource_type:
+                        # Store the complete initial resource data
+                        initial_resources_data.append({
+                            "resourceType": resource_type,
+                            "resourceId": resource_id,
+                            "resourceName": resource_name,
+                            "domain": resource.get("domain"),
+                            "checkSets": resource.get("checkSets", [])
+                        })
+                    else:
+                        _LOGGER.warning(f"Domain {domain_id}: Skipping resource {i} with no resource type: {resource}")
+                else:
+                    _LOGGER.warning(f"Domain {domain_id}: Skipping invalid resource {i}: {resource}")
+        else:
+            _LOGGER.warning(f"Domain {domain_id}: Initial response resources is not a list: {first_response_resources}")
+        
+        _LOGGER.info(f"Domain {domain_id}: Processed {len(initial_resources_data)} valid resources from initial response")
+        
+        # Step 2: Process BOM (Bill of Materials) and prepare resources with target versions
+        _LOGGER.debug(f"Domain {domain_id}: Step 2 - Processing BOM (Bill of Materials)")
+        bom_data = next_release.get("bom", [])
+        _LOGGER.info(f"Domain {domain_id}: Found {len(bom_data) if isinstance(bom_data, list) else 0} BOM entries")
+        
+        bom_map = {}
+        if isinstance(bom_data, list):
+            for i, item in enumerate(bom_data, 1):
+                if isinstance(item, dict):
+                    name = item.get("name")
+                    version = item.get("version")
+                    _LOGGER.debug(f"Domain {domain_id}: BOM {i} - Component: {name}, Version: {version}")
+                    if name and version:
+                        bom_map[name] = version
+        
+        _LOGGER.info(f"Domain {domain_id}: Created BOM mapping for {len(bom_map)} components: {list(bom_map.keys())}")
+        
+        # Build resources with target versions for detailed query (only for resources that have target versions)
+        resources_with_versions = []
+        _LOGGER.debug(f"Domain {domain_id}: Mapping resources to target versions")
+        
+        for resource_data in initial_resources_data:
+            resource_type = resource_data["resourceType"]
+
+            if resource_type == "CLUSTER":
+                resource_type = "HOST"
+
+            target_resource_version = bom_map.get(resource_type)
+            
+            _LOGGER.debug(f"Domain {domain_id}: Resource {resource_type} -> Target version: {target_resource_version}")
+            
+            if target_resource_version:
+                resource_spec = {
+                    "resourceType": resource_type,
+                    "resourceTargetVersion": target_resource_version
+                }
+                resources_with_versions.append(resource_spec)
+                _LOGGER.info(f"Domain {domain_id}: Mapped {resource_type} to version {target_resource_version}")
+            else:
+                _LOGGER.info(f"Domain {domain_id}: Including {resource_type} without target version (will use check sets from initial response)")
+        
+        _LOGGER.info(f"Domain {domain_id}: {len(resources_with_versions)} resources prepared for detailed query")
+        
+        # Step 3: Get detailed check-sets (only for resources with target versions)
+        detailed_resources_data = []
+        if resources_with_versions:
+            _LOGGER.debug(f"Domain {domain_id}: Step 3 - Getting detailed check-sets")
+            detailed_query_data = {
+                "checkSetType": "UPGRADE",
+                "domains": [{
+                    "domainId": domain_id,
+                    "resources": resources_with_versions
+                }]
+            }
+            
+            _LOGGER.debug(f"Domain {domain_id}: Sending detailed check-sets query: {detailed_query_data}")
+            second_response = await self.vcf_client.api_request("/v1/system/check-sets/queries", method="POST", data=detailed_query_data)
+            _LOGGER.debug(f"Domain {domain_id}: Detailed check-sets response keys: {list(second_response.keys()) if isinstance(second_response, dict) else 'Not a dict'}")
+            
+            query_id = second_response.get("queryId")
+            _LOGGER.info(f"Domain {domain_id}: Got query ID: {query_id}")
+            
+            # Extract detailed resources
+            second_response_resources = second_response.get("resources", [])
+            if isinstance(second_response_resources, list):
+                for i, resource in enumerate(second_response_resources, 1):
+                    if isinstance(resource, dict):
+                        resource_type = resource.get("resourceType")
+                        resource_id = resource.get("resourceId")
+                        resource_name = resource.get("resourceName")
+                        num_check_sets = len(resource.get("checkSets", [])) if isinstance(resource.get("checkSets"), list) else 0
+                        
+                        _LOGGER.info(f"Domain {domain_id}: Detailed resource {i} - Type: {resource_type}, ID: {resource_id}, Name: {resource_name}, Check sets: {num_check_sets}")
+                        
+                        if resource_type:
+                            detailed_resources_data.append(resource)
+            
+            _LOGGER.info(f"Domain {domain_id}: Processed {len(detailed_resources_data)} resources from detailed response")
+        else:
+            query_id = first_response.get("queryId")
+            _LOGGER.info(f"Domain {domain_id}: No resources with target versions, using initial query ID: {query_id}")
+        
+        # Step 4: Build final check-sets request data
+        _LOGGER.debug(f"Domain {domain_id}: Step 4 - Building final check-sets request")
+        check_set_data = {
+            "resources": [],
+            "queryId": query_id,
+            "metadata": {
+                "targetVersion": target_version
+            }
+        }
+        
+        # Store resource info for later use
+        resource_info = {}
+        
+        # Create map of detailed resources by type for lookup
+        detailed_resources_map = {}
+        for resource in detailed_resources_data:
+            resource_type = resource.get("resourceType")
+            if resource_type:
+                detailed_resources_map[resource_type] = resource
+        
+        # Process all initial resources and use detailed data when available
+        _LOGGER.info(f"Domain {domain_id}: Building final check-sets data using all {len(initial_resources_data)} initial resources")
+        
+        for i, initial_resource in enumerate(initial_resources_data, 1):
+            resource_type = initial_resource["resourceType"]
+            resource_id = initial_resource["resourceId"]
+            resource_name = initial_resource["resourceName"]
+            
+            _LOGGER.info(f"Domain {domain_id}: Processing resource {i}/{len(initial_resources_data)} - Type: {resource_type}, ID: {resource_id}, Name: {resource_name}")
+            
+            if resource_id and resource_type:
+                resource_info[resource_type] = resource_id
+            
+            # Use detailed response if available, otherwise use initial response
+            if resource_type in detailed_resources_map:
+                resource_to_use = detailed_resources_map[resource_type]
+                _LOGGER.debug(f"Domain {domain_id}: Using detailed response data for {resource_type}")
+            else:
+                resource_to_use = initial_resource
+                _LOGGER.info(f"Domain {domain_id}: Using initial response data for {resource_type} (not in detailed response)")
+            
+            # Build check sets list
+            check_sets_list = []
+            resource_check_sets = resource_to_use.get("checkSets", [])
+            
+            _LOGGER.info(f"Domain {domain_id}: Resource {resource_type} has {len(resource_check_sets) if isinstance(resource_check_sets, list) else 0} check sets")
+            
+            if isinstance(resource_check_sets, list):
+                for j, cs in enumerate(resource_check_sets, 1):
+                    if isinstance(cs, dict):
+                        check_set_id = cs.get("checkSetId")
+                        check_set_name = cs.get("checkSetName", "Unknown")
+                        _LOGGER.debug(f"Domain {domain_id}: Check set {j} for {resource_type} - ID: {check_set_id}, Name: {check_set_name}")
+                        if check_set_id:
+                            check_sets_list.append({"checkSetId": check_set_id})
+            
+            _LOGGER.info(f"Domain {domain_id}: Added {len(check_sets_list)} valid check sets for resource {resource_type}")
+            
+            # Build final resource entry
+            final_resource_entry = {
+                "resourceType": resource_to_use.get("resourceType"),
+                "resourceId": resource_to_use.get("resourceId"),
+                "resourceName": resource_to_use.get("resourceName"),
+                "checkSets": check_sets_list
+            }
+            
+            # Add domain info if available
+            domain_info = resource_to_use.get("domain")
+            if domain_info:
+                final_resource_entry["domain"] = domain_info
+            
+            check_set_data["resources"].append(final_resource_entry)
+            _LOGGER.debug(f"Domain {domain_id}: Added resource {resource_type} to final check-sets (with {len(check_sets_list)} check sets)")
+        
+        _LOGGER.info(f"Domain {domain_id}: Prepared check-sets for {len(check_set_data['resources'])} resources")
+        
+        return check_set_data, resource_info
+    
     async def _start_upgrades(self, domain_id: str, target_version: str, domain_data: Dict[str, Any]):
         """Start component upgrades."""
         self.set_upgrade_status(domain_id, "starting_upgrades")
-        self.set_upgrade_logs(domain_id, "**Starting Component Upgrades**\n\nStarting component upgrades...")
+        self.add_upgrade_log(domain_id, "Starting component upgrades...")
         
         try:
             upgrade_cycle = 0
@@ -669,36 +1052,8 @@ Waiting for acknowledgement..."""
                         await asyncio.sleep(30)
                         continue
                 
-                # Check if we only have HOST components left (which we skip)
-                non_host_upgrades = []
-                for upgrade in available_upgrades:
-                    if not isinstance(upgrade, dict):
-                        continue
-                    bundle_id = upgrade.get("bundleId")
-                    if not bundle_id:
-                        continue
-                    
-                    try:
-                        bundle_response = await self.vcf_client.api_request(f"/v1/bundles/{bundle_id}")
-                        if isinstance(bundle_response, dict):
-                            components = bundle_response.get("components", [])
-                            if components and isinstance(components, list):
-                                component_data = components[0]
-                                if isinstance(component_data, dict):
-                                    component_type = component_data.get("type", "")
-                                    if component_type and "HOST" not in component_type:
-                                        non_host_upgrades.append(upgrade)
-                    except Exception as e:
-                        _LOGGER.debug(f"Domain {domain_id}: Failed to check component type for bundle {bundle_id}: {e}")
-                        non_host_upgrades.append(upgrade)  # Include if we can't check
-                
-                if not non_host_upgrades:
-                    _LOGGER.info(f"Domain {domain_id}: Only HOST upgrades remain, and HOST upgrades are not implemented. Considering upgrade complete.")
-                    break
-                
                 # Process each available upgrade
                 processed_count = 0
-                non_host_processed = 0
                 for i, upgrade in enumerate(available_upgrades, 1):
                     _LOGGER.info(f"Domain {domain_id}: Processing upgrade {i}/{len(available_upgrades)}")
                     
@@ -715,30 +1070,15 @@ Waiting for acknowledgement..."""
                         _LOGGER.warning(f"Domain {domain_id}: Skipping upgrade with no bundleId: {upgrade}")
                         continue
                     
-                    # Get bundle details to determine component type
-                    _LOGGER.debug(f"Domain {domain_id}: Fetching bundle details for {bundle_id}")
+                    # Get bundle details from the catalog to determine component type
                     try:
-                        bundle_response = await self.vcf_client.api_request(f"/v1/bundles/{bundle_id}")
+                        component_data = await self.bundle_catalog.async_get_component(bundle_id)
                     except Exception as e:
                         _LOGGER.error(f"Domain {domain_id}: Failed to fetch bundle {bundle_id}: {e}")
                         continue
                     
-                    _LOGGER.debug(f"Domain {domain_id}: Bundle {bundle_id} response: {bundle_response}")
-                    
-                    if not isinstance(bundle_response, dict):
-                        _LOGGER.warning(f"Domain {domain_id}: Unexpected bundle response format for {bundle_id}: {bundle_response}")
-                        continue
-                        
-                    components = bundle_response.get("components", [])
-                    _LOGGER.debug(f"Domain {domain_id}: Bundle {bundle_id} has {len(components)} components")
-                    
-                    if not components or not isinstance(components, list):
-                        _LOGGER.warning(f"Domain {domain_id}: Bundle {bundle_id} has no valid components: {components}")
-                        continue
-                    
-                    component_data = components[0]
-                    if not isinstance(component_data, dict):
-                        _LOGGER.warning(f"Domain {domain_id}: Bundle {bundle_id} first component is not a dict: {component_data}")
+                    if not component_data:
+                        _LOGGER.warning(f"Domain {domain_id}: Bundle {bundle_id} has no valid components")
                         continue
                         
                     component_type = component_data.get("type", "")
@@ -747,28 +1087,31 @@ Waiting for acknowledgement..."""
                     
                     _LOGGER.info(f"Domain {domain_id}: Processing component - Type: {component_type}, Name: {component_name}, Version: {component_version}")
                     
+                    # Component upgrades of scheduled domains only start inside the maintenance window
+                    await self._wait_for_maintenance_window(domain_id)
+                    
                     # Execute upgrade based on component type
                     try:
                         if "SDDC_MANAGER" in component_type:
                             _LOGGER.info(f"Domain {domain_id}: Starting SDDC Manager upgrade with bundle {bundle_id}")
-                            await self._upgrade_sddc_manager(domain_id, bundle_id)
+                            with self._timed_step(domain_id, "component:SDDC_MANAGER", component_data.get("fromVersion"), component_data.get("toVersion")):
+                                await self._upgrade_sddc_manager(domain_id, bundle_id)
                             processed_count += 1
-                            non_host_processed += 1
                         elif "NSX_T_MANAGER" in component_type:
                             _LOGGER.info(f"Domain {domain_id}: Starting NSX-T Manager upgrade with bundle {bundle_id}")
-                            await self._upgrade_nsx(domain_id, bundle_id)
+                            with self._timed_step(domain_id, "component:NSX_T_MANAGER", component_data.get("fromVersion"), component_data.get("toVersion")):
+                                await self._upgrade_nsx(domain_id, bundle_id)
                             processed_count += 1
-                            non_host_processed += 1
                         elif "VCENTER" in component_type:
                             _LOGGER.info(f"Domain {domain_id}: Starting vCenter upgrade with bundle {bundle_id}")
-                            await self._upgrade_vcenter(domain_id, bundle_id)
+                            with self._timed_step(domain_id, "component:VCENTER", component_data.get("fromVersion"), component_data.get("toVersion")):
+                                await self._upgrade_vcenter(domain_id, bundle_id)
+                            processed_count += 1
+                        elif "HOST" in component_type:
+                            _LOGGER.info(f"Domain {domain_id}: Starting ESX cluster upgrades with bundle {bundle_id}")
+                            with self._timed_step(domain_id, "component:HOST", component_data.get("fromVersion"), component_data.get("toVersion")):
+                                await self._upgrade_esx_clusters(domain_id, bundle_id)
                             processed_count += 1
-                            non_host_processed += 1
-                        elif "ESX_HOST" in component_type or "HOST" in component_type:
-                            # Skip ESX host upgrades as per requirements but log properly
-                            _LOGGER.info(f"Domain {domain_id}: Skipping ESX host upgrade for component {component_name} (HOST upgrades not implemented)")
-                            # Don't count HOST components as processed to avoid infinite loop
-                            continue
                         else:
                             _LOGGER.warning(f"Domain {domain_id}: Unknown component type: {component_type} for component {component_name}")
                             # For unknown types, still count as processed to avoid infinite loops
@@ -783,20 +1126,12 @@ Waiting for acknowledgement..."""
                     _LOGGER.debug(f"Domain {domain_id}: Waiting 10 seconds before next upgrade...")
                     await asyncio.sleep(10)
                 
-                _LOGGER.info(f"Domain {domain_id}: Completed upgrade cycle {upgrade_cycle}, processed {processed_count} upgrades ({non_host_processed} non-HOST)")
+                _LOGGER.info(f"Domain {domain_id}: Completed upgrade cycle {upgrade_cycle}, processed {processed_count} upgrades")
                 
-                # If we didn't process any non-HOST upgrades in this cycle, we might be done
-                if non_host_processed == 0:
-                    _LOGGER.info(f"Domain {domain_id}: No non-HOST upgrades processed this cycle")
-                    
-                    # Check if we should continue or exit
-                    if processed_count == 0:                        # Nothing processed at all - wait and try again
-                        _LOGGER.info(f"Domain {domain_id}: No upgrades processed at all, waiting 1 minute...")
-                        await asyncio.sleep(60)
-                    else:
-                        # Only HOST upgrades were found - exit the loop since we don't process them
-                        _LOGGER.info(f"Domain {domain_id}: Only HOST upgrades remain, exiting upgrade loop")
-                        break
+                if processed_count == 0:
+                    # Nothing processed at all - wait and try again
+                    _LOGGER.info(f"Domain {domain_id}: No upgrades processed at all, waiting 1 minute...")
+                    await asyncio.sleep(60)
         
         except Exception as e:
             raise Exception(f"Component upgrades failed: {e}")
@@ -805,7 +1140,7 @@ Waiting for acknowledgement..."""
         """Upgrade SDDC Manager."""
         _LOGGER.info(f"Domain {domain_id}: Starting SDDC Manager upgrade with bundle {bundle_id}")
         self.set_upgrade_status(domain_id, "upgrading_sddcmanager")
-        self.set_upgrade_logs(domain_id, "**Upgrading SDDC Manager**\n\nUpgrading SDDC Manager. This may take up to 2 hours...")
+        self.add_upgrade_log(domain_id, "Upgrading SDDC Manager. This may take up to 2 hours...")
         
         try:
             upgrade_data = {
@@ -829,21 +1164,11 @@ Waiting for acknowledgement..."""
             _LOGGER.info(f"Domain {domain_id}: SDDC Manager upgrade started with ID: {upgrade_id}")
             
             # Fire event to notify coordinators about impending API outage
-            def fire_api_outage_event():
-                self.hass.bus.fire(
-                    "vcf_api_outage_expected",
-                    {"domain_id": domain_id, "reason": "sddc_manager_upgrade"}
-                )
-            
-            if hasattr(self.hass, 'loop') and self.hass.loop.is_running():
-                self.hass.loop.call_soon_threadsafe(fire_api_outage_event)
-            else:
-                fire_api_outage_event()
+            self._fire_event("vcf_api_outage_expected", {"domain_id": domain_id, "reason": "sddc_manager_upgrade"})
             
             # Monitor upgrade progress
             check_count = 0
             api_available = True
-            last_connectivity_check = 0
             
             while True:
                 check_count += 1
@@ -851,91 +1176,62 @@ Waiting for acknowledgement..."""
                 
                 try:
                     status_response = await self.vcf_client.api_request(f"/v1/upgrades/{upgrade_id}")
-                    status = status_response.get("status")
-                    
-                    # If we regained API connectivity, log it
-                    if not api_available:
-                        _LOGGER.info(f"Domain {domain_id}: API connectivity restored during SDDC Manager upgrade")
-                        api_available = True
-                        # Fire event to notify coordinators that API is back
-                        def fire_api_restored_event():
-                            self.hass.bus.fire(
-                                "vcf_api_restored",
-                                {"domain_id": domain_id, "reason": "sddc_manager_upgrade"}
-                            )
-                        
-                        if hasattr(self.hass, 'loop') and self.hass.loop.is_running():
-                            self.hass.loop.call_soon_threadsafe(fire_api_restored_event)
-                        else:
-                            fire_api_restored_event()
-                    
-                    _LOGGER.info(f"Domain {domain_id}: SDDC Manager upgrade status: {status}")
-                    
-                    if status == "COMPLETED_WITH_SUCCESS":
-                        _LOGGER.info(f"Domain {domain_id}: SDDC Manager upgrade completed successfully")
-                        break
-                    elif status in ["FAILED", "COMPLETED_WITH_FAILURE"]:
-                        error_msg = f"SDDC Manager upgrade failed with status: {status}"
-                        _LOGGER.error(f"Domain {domain_id}: {error_msg}")
-                        raise Exception(error_msg)
-                    
                 except Exception as api_error:
                     # During SDDC Manager upgrade, API might be unavailable
                     if api_available:
                         _LOGGER.info(f"Domain {domain_id}: API became unavailable during SDDC Manager upgrade (expected): {api_error}")
                         api_available = False
-                      # Periodically test if API is back online (every 5 minutes)
-                    current_time = check_count * 30  # 30 seconds per check
-                    if current_time - last_connectivity_check >= 300:  # 5 minutes
-                        try:
-                            _LOGGER.debug(f"Domain {domain_id}: Testing if API is back online...")
-                            await self.vcf_client.api_request("/v1/domains")
-                            _LOGGER.info(f"Domain {domain_id}: API is back online after SDDC Manager upgrade")
-                            api_available = True
-                            
-                            # Fire event to notify coordinators that API is back
-                            def fire_api_restored_event():
-                                self.hass.bus.fire(
-                                    "vcf_api_restored",
-                                    {"domain_id": domain_id, "reason": "sddc_manager_upgrade"}
-                                )
-                            
-                            if hasattr(self.hass, 'loop') and self.hass.loop.is_running():
-                                self.hass.loop.call_soon_threadsafe(fire_api_restored_event)
-                            else:
-                                fire_api_restored_event()
-                              # Wait additional 6 minutes for SDDC Manager to fully stabilize
-                            _LOGGER.info(f"Domain {domain_id}: Waiting 6 minutes for SDDC Manager to fully stabilize...")
-                            await asyncio.sleep(360)
-                            break
-                        except Exception as test_error:
-                            _LOGGER.debug(f"Domain {domain_id}: API still not available: {test_error}")
-                            last_connectivity_check = current_time
+                    elif await self.liveness_prober.probe():
+                        # API answers but the upgrade status is not readable yet
+                        _LOGGER.debug(f"Domain {domain_id}: API is up but upgrade status is not available yet: {api_error}")
+                        await asyncio.sleep(30)
+                        continue
+                    
+                    # Wait for the API with short backed-off probes and resume polling the moment it answers
+                    _LOGGER.debug(f"Domain {domain_id}: Waiting for SDDC Manager API to answer again...")
+                    if not await self.liveness_prober.wait_until_alive(max_wait=SDDC_MANAGER_OUTAGE_TIMEOUT):
+                        raise Exception(f"SDDC Manager API did not come back within {SDDC_MANAGER_OUTAGE_TIMEOUT // 3600} hours")
+                    
+                    _LOGGER.info(f"Domain {domain_id}: API is back online during SDDC Manager upgrade")
+                    self.add_upgrade_log(domain_id, "SDDC Manager API is reachable again. Checking upgrade status...")
+                    # Notify coordinators so they resume polling right away
+                    self._fire_event("vcf_api_restored", {"domain_id": domain_id, "reason": "sddc_manager_upgrade"})
+                    continue
+                
+                status = status_response.get("status")
+                
+                # If we regained API connectivity, log it
+                if not api_available:
+                    _LOGGER.info(f"Domain {domain_id}: API connectivity restored during SDDC Manager upgrade")
+                    api_available = True
+                
+                _LOGGER.info(f"Domain {domain_id}: SDDC Manager upgrade status: {status}")
+                
+                if status == "COMPLETED_WITH_SUCCESS":
+                    _LOGGER.info(f"Domain {domain_id}: SDDC Manager upgrade completed successfully")
+                    break
+                elif status in ["FAILED", "COMPLETED_WITH_FAILURE"]:
+                    error_msg = f"SDDC Manager upgrade failed with status: {status}"
+                    _LOGGER.error(f"Domain {domain_id}: {error_msg}")
+                    raise Exception(error_msg)
                 
                 _LOGGER.debug(f"Domain {domain_id}: Waiting 30 seconds before next SDDC Manager upgrade status check...")
                 await asyncio.sleep(30)
             
+            # End the expected outage for the coordinators
+            self._fire_event("vcf_api_restored", {"domain_id": domain_id, "reason": "sddc_manager_upgrade"})
             _LOGGER.info(f"SDDC Manager upgrade completed for domain {domain_id}")
             
         except Exception as e:
             # Fire event to notify coordinators that API should be restored
-            def fire_api_restored_event():
-                self.hass.bus.fire(
-                    "vcf_api_restored",
-                    {"domain_id": domain_id, "reason": "sddc_manager_upgrade_failed"}
-                )
-            
-            if hasattr(self.hass, 'loop') and self.hass.loop.is_running():
-                self.hass.loop.call_soon_threadsafe(fire_api_restored_event)
-            else:
-                fire_api_restored_event()
+            self._fire_event("vcf_api_restored", {"domain_id": domain_id, "reason": "sddc_manager_upgrade_failed"})
             
             raise Exception(f"SDDC Manager upgrade failed: {e}")
     
     async def _upgrade_nsx(self, domain_id: str, bundle_id: str):
         """Upgrade NSX-T Manager."""
         self.set_upgrade_status(domain_id, "upgrading_nsx")
-        self.set_upgrade_logs(domain_id, "**Upgrading NSX-T**\n\nUpgrading NSX-T Manager. This may take up to 4 hours...")
+        self.add_upgrade_log(domain_id, "Upgrading NSX-T Manager. This may take up to 4 hours...")
         
         try:
             # Get NSX resources
@@ -955,14 +1251,32 @@ Waiting for acknowledgement..."""
             
             nsxt_manager_cluster_id = nsxt_manager_cluster.get("id")
             
-            if not nsxt_host_clusters or not isinstance(nsxt_host_clusters[0], dict):
-                raise Exception("Required NSX host clusters not found")
+            nsxt_host_cluster_ids = [
+                host_cluster.get("id") for host_cluster in nsxt_host_clusters
+                if isinstance(host_cluster, dict) and host_cluster.get("id")
+            ]
             
-            nsxt_host_cluster_id = nsxt_host_clusters[0].get("id")
+            if not nsxt_host_cluster_ids:
+                raise Exception("Required NSX host clusters not found")
             
-            if not nsxt_manager_cluster_id or not nsxt_host_cluster_id:
+            if not nsxt_manager_cluster_id:
                 raise Exception("Required NSX resource IDs not found")
             
+            # Every host cluster goes into one spec so the whole NSX fabric upgrades in a single pass
+            host_parallel_upgrade = get_entry_option(self.config_entry, "nsx_host_parallel_upgrade")
+            live_upgrade = get_entry_option(self.config_entry, "nsx_live_upgrade")
+            nsxt_host_cluster_specs = [
+                {
+                    "hostClusterId": host_cluster_id,
+                    "liveUpgrade": live_upgrade,
+                    "hostParallelUpgrade": host_parallel_upgrade
+                }
+                for host_cluster_id in nsxt_host_cluster_ids
+            ]
+            
+            _LOGGER.info(f"Domain {domain_id}: Upgrading NSX-T on {len(nsxt_host_cluster_specs)} host clusters")
+            self.add_upgrade_log(domain_id, f"NSX-T upgrade covers {len(nsxt_host_cluster_specs)} host clusters")
+            
             upgrade_data = {
                 "bundleId": bundle_id,
                 "resourceType": "DOMAIN",
@@ -970,15 +1284,11 @@ Waiting for acknowledgement..."""
                 "nsxtUpgradeUserInputSpecs": [{
                     "nsxtUpgradeOptions": {
                         "isEdgeOnlyUpgrade": False,
-                        "isHostClustersUpgradeParallel": True,
+                        "isHostClustersUpgradeParallel": get_entry_option(self.config_entry, "nsx_host_clusters_parallel"),
                         "isEdgeClustersUpgradeParallel": True
                     },
                     "nsxtId": nsxt_manager_cluster_id,
-                    "nsxtHostClusterUpgradeSpecs": [{
-                        "hostClusterId": nsxt_host_cluster_id,
-                        "liveUpgrade": False,
-                        "hostParallelUpgrade": False
-                    }]
+                    "nsxtHostClusterUpgradeSpecs": nsxt_host_cluster_specs
                 }],
                 "resourceUpgradeSpecs": [{
                     "resourceId": domain_id,
@@ -993,7 +1303,7 @@ Waiting for acknowledgement..."""
                 raise Exception("No upgrade ID returned")
             
             # Monitor upgrade progress
-            await self._monitor_upgrade_progress(upgrade_id, "NSX-T upgrade")
+            await self._monitor_upgrade_progress(domain_id, upgrade_id, "NSX-T upgrade")
             
             _LOGGER.info(f"NSX-T upgrade completed for domain {domain_id}")
             
@@ -1003,7 +1313,7 @@ Waiting for acknowledgement..."""
     async def _upgrade_vcenter(self, domain_id: str, bundle_id: str):
         """Upgrade vCenter."""
         self.set_upgrade_status(domain_id, "upgrading_vcenter")
-        self.set_upgrade_logs(domain_id, "**Upgrading vCenter**\n\nUpgrading vCenter Server...")
+        self.add_upgrade_log(domain_id, "Upgrading vCenter Server...")
         
         try:
             # Get vCenter resource ID from stored resource info
@@ -1033,38 +1343,172 @@ Waiting for acknowledgement..."""
                 raise Exception("No upgrade ID returned")
             
             # Monitor upgrade progress
-            await self._monitor_upgrade_progress(upgrade_id, "vCenter upgrade")
+            await self._monitor_upgrade_progress(domain_id, upgrade_id, "vCenter upgrade")
             
             _LOGGER.info(f"vCenter upgrade completed for domain {domain_id}")
             
         except Exception as e:
             raise Exception(f"vCenter upgrade failed: {e}")
     
-    async def _monitor_upgrade_progress(self, upgrade_id: str, upgrade_name: str):
-        """Monitor upgrade progress until completion."""
+    async def _upgrade_esx_clusters(self, domain_id: str, bundle_id: str):
+        """Upgrade the ESX host clusters of a domain in parallel."""
+        self.set_upgrade_status(domain_id, "upgrading_esx_cluster")
+        self.add_upgrade_log(domain_id, "Upgrading ESX clusters. Clusters are upgraded in parallel within the configured limits...")
+        
+        try:
+            await self.cluster_scheduler.upgrade_domain_clusters(domain_id, bundle_id)
+            _LOGGER.info(f"ESX cluster upgrades completed for domain {domain_id}")
+            
+        except Exception as e:
+            raise Exception(f"ESX cluster upgrade failed: {e}")
+    
+    async def _monitor_upgrade_progress(self, domain_id: str, upgrade_id: str, upgrade_name: str):
+        """Monitor upgrade progress until completion, following the SDDC Manager task and its subtasks.
+        
+        Once the upgrade reports its task only the task is polled; the upgrade itself is
+        read again when the task has reached a final state, to confirm the outcome. If the
+        task failed and the upgrade status is still not final after a grace period, the
+        upgrade fails with the task's failure details.
+        """
+        task_id = None
+        task_fingerprint = None
+        task_finished = False
+        task_failure = None
+        task_failed_at = None
+        
         while True:
+            if task_id and not task_finished:
+                try:
+                    task = await self.vcf_client.api_request(f"/v1/tasks/{task_id}")
+                except Exception as api_error:
+                    task = None
+                    _LOGGER.warning(f"Could not read task {task_id} of {upgrade_name}, retrying: {api_error}")
+                
+                if task:
+                    task_fingerprint = self._publish_task_progress(domain_id, upgrade_name, task, task_fingerprint)
+                    task_status = self._task_status(task.get("status"))
+                    task_finished = task_status in TASK_DONE_STATES + TASK_FAILED_STATES
+                    if task_status in TASK_FAILED_STATES:
+                        task_failure = self._task_failure_details(task)
+                        task_failed_at = time.monotonic()
+                    if not task_finished:
+                        await asyncio.sleep(UPGRADE_POLL_INTERVAL)
+                        continue
+            
             try:
                 status_response = await self.vcf_client.api_request(f"/v1/upgrades/{upgrade_id}")
-                status = status_response.get("status")
-                
-                if status == "COMPLETED_WITH_SUCCESS":
-                    break
-                elif status in ["FAILED", "COMPLETED_WITH_FAILURE"]:
-                    raise Exception(f"{upgrade_name} failed with status: {status}")
-                
             except Exception as api_error:
                 # Handle potential authorization errors during vCenter upgrade
                 if "vCenter" in upgrade_name:
                     _LOGGER.warning(f"API error during {upgrade_name}, retrying: {api_error}")
+                    status_response = {}
                 else:
                     raise api_error
             
-            await asyncio.sleep(30)
+            status = status_response.get("status")
+            if status == "COMPLETED_WITH_SUCCESS":
+                break
+            elif status in ["FAILED", "COMPLETED_WITH_FAILURE"]:
+                raise Exception(f"{upgrade_name} failed with status: {status}")
+            
+            if task_failed_at is not None and time.monotonic() - task_failed_at >= TASK_FAILURE_GRACE_PERIOD:
+                raise Exception(f"{upgrade_name} failed: task {task_id} {task_failure} (upgrade status still {status})")
+            
+            if not task_id and status_response.get("taskId"):
+                task_id = status_response["taskId"]
+                _LOGGER.debug(f"Domain {domain_id}: Following task {task_id} of {upgrade_name}")
+            
+            await asyncio.sleep(UPGRADE_POLL_INTERVAL)
+    
+    @classmethod
+    def _task_failure_details(cls, task: Dict[str, Any]) -> str:
+        """Describe why a task failed, from its errors and failed subtasks."""
+        details = [cls._task_status(task.get("status"))]
+        messages = [error.get("message") for error in task.get("errors", []) or [] if isinstance(error, dict) and error.get("message")]
+        if messages:
+            details.append("; ".join(messages))
+        failed = [
+            subtask.get("name") or subtask.get("description") or "subtask"
+            for subtask in cls._flatten_subtasks(task.get("subTasks", []))
+            if cls._task_status(subtask.get("status")) in TASK_FAILED_STATES
+        ]
+        if failed:
+            details.append(f"failed subtasks: {', '.join(failed)}")
+        return " - ".join(details)
+    
+    @staticmethod
+    def _task_status(status: Any) -> str:
+        """Normalize a task status, e.g. "In Progress" to "IN_PROGRESS"."""
+        return str(status or "").strip().upper().replace(" ", "_")
+    
+    @staticmethod
+    def _flatten_subtasks(subtasks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Get the leaf subtasks of a task in execution order."""
+        leaves = []
+        for subtask in subtasks or []:
+            if not isinstance(subtask, dict):
+                continue
+            if subtask.get("subTasks"):
+                leaves.extend(VCFUpgradeService._flatten_subtasks(subtask["subTasks"]))
+            else:
+                leaves.append(subtask)
+        return leaves
+    
+    def _publish_task_progress(self, domain_id: str, upgrade_name: str, task: Dict[str, Any],
+                               previous_fingerprint: Optional[tuple]) -> Optional[tuple]:
+        """Publish subtask progress to the log and progress entities when it changed.
+        
+        Returns the fingerprint of the published progress, to pass in on the next call.
+        """
+        subtasks = self._flatten_subtasks(task.get("subTasks", []))
+        states = [
+            (subtask.get("name") or subtask.get("description") or subtask.get("type") or "subtask",
+             self._task_status(subtask.get("status", "PENDING")))
+            for subtask in subtasks
+        ]
+        task_status = self._task_status(task.get("status"))
+        fingerprint = (task_status, tuple(states))
+        if fingerprint == previous_fingerprint:
+            return previous_fingerprint
+        
+        total = len(states)
+        done = sum(1 for _, status in states if status in TASK_DONE_STATES)
+        failed = [name for name, status in states if status in TASK_FAILED_STATES]
+        running = [name for name, status in states if status == "IN_PROGRESS"]
+        
+        progress = self._upgrade_states.get(domain_id, {}).get("progress")
+        if progress is not None:
+            progress["task"] = {
+                "task_id": task.get("id"),
+                "status": task_status,
+                "subtasks_done": done,
+                "subtasks_total": total,
+                "running": running,
+                "failed": failed
+            }
+            if total:
+                step = next((s for s in progress["steps"] if s["status"] == "running"), None)
+                if step is not None:
+                    step["task_fraction"] = done / total
+        
+        if total:
+            message = f"{upgrade_name}: {done}/{total} subtasks completed"
+            if running:
+                message += f", running: {', '.join(running)}"
+            self.add_upgrade_log(domain_id, message)
+        previous_failed = {name for name, status in previous_fingerprint[1] if status in TASK_FAILED_STATES} if previous_fingerprint else set()
+        for name in failed:
+            if name in previous_failed:
+                continue
+            self.add_upgrade_log(domain_id, f"{upgrade_name}: Subtask '{name}' failed", level="error")
+        
+        self._notify_progress(domain_id)
+        return fingerprint
     
     async def _final_validation(self, domain_id: str, target_version: str):
         """Run final validation after all upgrades."""
         self.set_upgrade_status(domain_id, "final_validation")
-        self.set_upgrade_logs(domain_id, "**Final Validation**\n\nRunning final validation...")
+        self.add_upgrade_log(domain_id, "Running final validation...")
         
         try:
             validation_data = {"targetVersion": target_version}
@@ -1,9 +1,13 @@
 """Utility functions for the DataCenter Assistant integration."""
 import logging
+import re
 import aiohttp
+from functools import lru_cache
 
 _LOGGER = logging.getLogger(__name__)
 
+_VERSION_PART = re.compile(r"(\d*)(.*)")
+
 # Icon mappings for different resource types
 RESOURCE_ICONS = {
     "cpu": "mdi:cpu-64-bit",
@@ -24,25 +28,80 @@ def truncate_description(text, max_length=61):
         return text
     return text[:max_length] + "..."
 
-def version_tuple(version_string):
-    """Convert version string to tuple for comparison."""
+@lru_cache(maxsize=1024)
+def version_key(version_string):
+    """Convert a version string to a comparable key.
+    
+    The key has four ``(number, suffix)`` pairs, so numeric and non-numeric parts
+    always compare consistently: ``5.2.0.0`` equals ``5.2``, ``5.2.1`` is greater,
+    and a part like ``0a`` sorts after ``0``. Parts without leading digits use -1
+    and sort first. A build suffix (``-24108943``) and parts after the fourth are ignored.
+    """
     if not version_string:
-        _LOGGER.debug("Empty version string provided, returning default (0,0,0,0)")
-        return (0, 0, 0, 0)
+        return ((0, ""),) * 4
     
-    parts = version_string.split('.')
-    # Normalize to 4 parts
-    while len(parts) < 4:
-        parts.append('0')
+    parts = str(version_string).split("-", 1)[0].split(".")[:4]
+    parts += ["0"] * (4 - len(parts))
     
-    try:
-        result = tuple(map(int, parts[:4]))
-        _LOGGER.debug(f"Converted version '{version_string}' to tuple {result}")
-        return result
-    except ValueError as e:
-        # Handle non-numeric version parts
-        _LOGGER.warning(f"Non-numeric version parts in '{version_string}': {e}, returning string tuple")
-        return tuple(parts[:4])
+    key = []
+    for part in parts:
+        match = _VERSION_PART.match(part.strip())
+        digits, suffix = match.group(1), match.group(2)
+        key.append((int(digits) if digits else -1, suffix))
+    return tuple(key)
+
+# Component kinds handled by the upgrade workflow, matched against bundle component types
+COMPONENT_KINDS = ("SDDC_MANAGER", "NSX_T_MANAGER", "VCENTER", "HOST")
+
+def get_component_kind(component_type):
+    """Map a bundle component type (e.g. ESX_HOST) to its upgrade component kind."""
+    if not component_type:
+        return None
+    for kind in COMPONENT_KINDS:
+        if kind in component_type:
+            return kind
+    return None
+
+# Defaults for the settings of the integration's options flow
+DEFAULT_OPTIONS = {
+    "esx_max_parallel_clusters": 4,
+    "esx_max_clusters_per_domain": 2,
+    "nsx_host_clusters_parallel": True,
+    "nsx_host_parallel_upgrade": False,
+    "nsx_live_upgrade": False,
+    "prestage_bundles": False,
+    "prestage_start_hour": 1,
+    "prestage_end_hour": 5,
+    "maintenance_window": "",
+    "upgrade_run_ahead_hours": 12,
+    "precheck_max_age_minutes": 120,
+    "upgrade_target_version": "",
+    "compact_host_sensors": False,
+    "host_sensor_allowlist": "",
+}
+
+def get_entry_option(config_entry, key):
+    """Get an options flow setting of a config entry, falling back to its default."""
+    return config_entry.options.get(key, DEFAULT_OPTIONS[key])
+
+def get_host_allowlist(config_entry):
+    """Get the hosts (IDs, hostnames or FQDNs, lower case) that keep their own sensors in compact mode."""
+    allowlist = get_entry_option(config_entry, "host_sensor_allowlist") or ""
+    return {token.strip().lower() for token in allowlist.split(",") if token.strip()}
+
+# Dispatcher signal sent when the scheduled upgrade queue changes
+UPGRADE_QUEUE_SIGNAL = "datacenter_assistant_upgrade_queue_update"
+
+def upgrade_update_signal(domain_id):
+    """Dispatcher signal carrying coalesced upgrade updates for one domain."""
+    return f"datacenter_assistant_upgrade_update_{domain_id}"
+
+# Dispatcher signal sent when a partial refresh replaced the resource coordinator data
+RESOURCE_SNAPSHOT_SIGNAL = "datacenter_assistant_resource_snapshot_update"
+
+def resource_update_signal(domain_id):
+    """Dispatcher signal for partial resource refreshes of one domain."""
+    return f"datacenter_assistant_resource_update_{domain_id}"
 
 def safe_name_conversion(name):
     """Convert domain/host names to safe entity names."""
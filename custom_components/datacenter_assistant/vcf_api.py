@@ -1,9 +1,13 @@
 """VCF API Client and Data Models for the DataCenter Assistant integration."""
+import asyncio
 import aiohttp
+import bisect
+import hashlib
+import json
 import logging
 import time
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
-from .utils import version_tuple
+from .utils import version_key
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -79,26 +83,28 @@ class VCFAPIClient:
             _LOGGER.error(f"Error refreshing VCF token: {e}")
             return None
     
-    async def api_request(self, endpoint, method="GET", data=None, params=None):
-        """Make a VCF API request with automatic token handling."""
+    async def api_request(self, endpoint, method="GET", data=None, params=None, timeout=None):
+        """Make a VCF API request with automatic token handling.
+        
+        An optional timeout in seconds overrides the session default.
+        """
         if not self.vcf_url:
             raise ValueError("VCF URL not configured")
         
         session, headers = await self.get_session_with_headers()
         url = f"{self.vcf_url}{endpoint}"
+        request_kwargs = {"headers": headers, "json": data, "params": params, "ssl": False}
+        if timeout is not None:
+            request_kwargs["timeout"] = aiohttp.ClientTimeout(total=timeout)
         
-        async with getattr(session, method.lower())(
-            url, headers=headers, json=data, params=params, ssl=False
-        ) as resp:
+        async with getattr(session, method.lower())(url, **request_kwargs) as resp:
             if resp.status == 401:
                 # Try refreshing token once
                 _LOGGER.info("Token expired, refreshing...")
                 new_token = await self.refresh_token()
                 if new_token:
                     headers["Authorization"] = f"Bearer {new_token}"
-                    async with getattr(session, method.lower())(
-                        url, headers=headers, json=data, params=params, ssl=False
-                    ) as retry_resp:
+                    async with getattr(session, method.lower())(url, **request_kwargs) as retry_resp:
                         if retry_resp.status not in [200, 202, 204]:
                             error_text = await retry_resp.text()
                             _LOGGER.error(f"API request failed after token refresh: {retry_resp.status} - {error_text}")
@@ -129,6 +135,205 @@ class VCFAPIClient:
                         raise
 
 
+class VCFLivenessProber:
+    """Detect when the SDDC Manager API answers again after an outage.
+    
+    Probes a cheap endpoint with a short timeout on a backed-off schedule,
+    so recovery is noticed within seconds instead of after a fixed sleep.
+    """
+    
+    PROBE_ENDPOINT = "/v1/sddcs/about"
+    
+    def __init__(self, vcf_client, timeout=10, initial_interval=5, max_interval=60):
+        self.vcf_client = vcf_client
+        self.timeout = timeout
+        self.initial_interval = initial_interval
+        self.max_interval = max_interval
+    
+    async def probe(self):
+        """Return True if the API answers the probe endpoint."""
+        try:
+            await self.vcf_client.api_request(self.PROBE_ENDPOINT, timeout=self.timeout)
+            return True
+        except Exception as e:
+            _LOGGER.debug(f"Liveness probe failed: {e}")
+            return False
+    
+    async def wait_until_alive(self, max_wait=None):
+        """Probe until the API answers or max_wait seconds have passed.
+        
+        Returns True as soon as the API answers, False on timeout.
+        """
+        deadline = time.monotonic() + max_wait if max_wait is not None else None
+        interval = self.initial_interval
+        
+        while True:
+            if await self.probe():
+                return True
+            
+            if deadline is not None and time.monotonic() + interval > deadline:
+                return False
+            
+            await asyncio.sleep(interval)
+            interval = min(interval * 2, self.max_interval)
+
+
+class VCFBundleCatalog:
+    """Cached bundle catalog indexed by bundle ID and component type.
+
+    Bundle metadata (type, components, versions, size) never changes for a given
+    bundle ID, so the catalog is loaded once through ``GET /v1/bundles`` and only
+    individual unknown bundles are fetched afterwards. Volatile fields such as
+    ``downloadStatus`` must still be read from the API directly.
+    """
+    
+    def __init__(self, vcf_client):
+        self.vcf_client = vcf_client
+        self._bundles = {}
+        self._by_component_type = {}
+        self._loaded = False
+        self._load_lock = asyncio.Lock()
+    
+    @property
+    def loaded(self):
+        """Return True once the full catalog has been loaded."""
+        return self._loaded
+    
+    async def async_load(self, force=False):
+        """Load the full bundle catalog with a single request."""
+        async with self._load_lock:
+            if self._loaded and not force:
+                return
+            
+            bundles_data = await self.vcf_client.api_request("/v1/bundles")
+            elements = bundles_data.get("elements", []) if isinstance(bundles_data, dict) else []
+            
+            self._bundles = {}
+            self._by_component_type = {}
+            for bundle in elements:
+                self._add(bundle)
+            
+            self._loaded = True
+            _LOGGER.info(f"Bundle catalog loaded with {len(self._bundles)} bundles")
+    
+    def _add(self, bundle):
+        """Add a bundle to the catalog indexes."""
+        if not isinstance(bundle, dict) or not bundle.get("id"):
+            return
+        
+        bundle_id = bundle["id"]
+        self._bundles[bundle_id] = bundle
+        
+        for component_type in self._component_types(bundle):
+            bundle_ids = self._by_component_type.setdefault(component_type, [])
+            if bundle_id not in bundle_ids:
+                bundle_ids.append(bundle_id)
+    
+    @staticmethod
+    def _component_types(bundle):
+        """Return the component types contained in a bundle."""
+        components = bundle.get("components", [])
+        if not isinstance(components, list):
+            return []
+        return [
+            component.get("type")
+            for component in components
+            if isinstance(component, dict) and component.get("type")
+        ]
+    
+    async def async_get_bundle(self, bundle_id):
+        """Get bundle metadata, fetching only bundles missing from the catalog."""
+        if not self._loaded:
+            try:
+                await self.async_load()
+            except Exception as e:
+                _LOGGER.warning(f"Could not load bundle catalog, falling back to single bundle lookup: {e}")
+        
+        bundle = self._bundles.get(bundle_id)
+        if bundle is None:
+            _LOGGER.debug(f"Bundle {bundle_id} not in catalog, fetching it")
+            bundle = await self.vcf_client.api_request(f"/v1/bundles/{bundle_id}")
+            self._add(bundle)
+        
+        return bundle
+    
+    def get_bundle(self, bundle_id):
+        """Get cached bundle metadata without making a request."""
+        return self._bundles.get(bundle_id)
+    
+    def get_bundles_by_component_type(self, component_type):
+        """Get cached bundles containing a component of the given type."""
+        return [self._bundles[bundle_id] for bundle_id in self._by_component_type.get(component_type, [])]
+    
+    async def async_get_component(self, bundle_id):
+        """Get the primary component of a bundle."""
+        bundle = await self.async_get_bundle(bundle_id)
+        if not isinstance(bundle, dict):
+            return None
+        
+        components = bundle.get("components", [])
+        if not components or not isinstance(components, list) or not isinstance(components[0], dict):
+            return None
+        return components[0]
+    
+    async def async_get_component_type(self, bundle_id):
+        """Get the primary component type of a bundle."""
+        component = await self.async_get_component(bundle_id)
+        return component.get("type", "") if component else ""
+
+
+class VCFReleaseCatalog:
+    """Future releases of one current version, parsed once per refresh and indexed for version lookups.
+    
+    The coordinator builds one catalog per distinct current version and shares it
+    between all domains on that version, so lookups are cached per version.
+    
+    Every release with a version and ``minCompatibleVcfVersion`` is kept with both
+    versions converted to keys. Applicable releases are additionally sorted by their
+    minimum compatible version, so the releases a version may upgrade to are found
+    with a bisect instead of evaluating every release for every domain.
+    """
+    
+    def __init__(self, releases):
+        self.releases = []
+        for release in releases or []:
+            if not isinstance(release, dict):
+                continue
+            if not release.get("version") or not release.get("minCompatibleVcfVersion"):
+                continue
+            self.releases.append({
+                "version": version_key(release["version"]),
+                "min_compatible": version_key(release["minCompatibleVcfVersion"]),
+                "applicable": release.get("applicabilityStatus") == "APPLICABLE" and release.get("isApplicable", False),
+                "release": release
+            })
+        self.releases.sort(key=lambda entry: entry["version"])
+        
+        self._applicable = sorted(
+            (entry for entry in self.releases if entry["applicable"]),
+            key=lambda entry: entry["min_compatible"]
+        )
+        self._min_compatible_keys = [entry["min_compatible"] for entry in self._applicable]
+        self._lookups = {}
+        self.key = hashlib.sha256(json.dumps(sorted(
+            (entry["release"]["version"], entry["release"]["minCompatibleVcfVersion"]) for entry in self.releases
+        )).encode()).hexdigest()
+    
+    def __len__(self):
+        return len(self.releases)
+    
+    def applicable_for(self, current_version):
+        """Get the applicable releases newer than a version and installable on it, oldest first."""
+        current = version_key(current_version)
+        if current not in self._lookups:
+            # Only releases with minCompatibleVcfVersion <= current can be installed
+            cut = bisect.bisect_right(self._min_compatible_keys, current)
+            candidates = [entry for entry in self._applicable[:cut] if entry["version"] > current]
+            candidates.sort(key=lambda entry: entry["version"])
+            self._lookups[current] = [entry["release"] for entry in candidates]
+        return list(self._lookups[current])
+
+
 class VCFDomain:
     """Data model for VCF Domain with business logic."""
     
@@ -142,6 +347,7 @@ class VCFDomain:
         self.current_version = None
         self.update_status = "unknown"
         self.next_release = None
+        self.upgrade_path = None
     
     def set_sddc_manager(self, sddc_id, sddc_fqdn):
         """Set SDDC manager information."""
@@ -154,49 +360,15 @@ class VCFDomain:
         self.update_status = update_status
         self.next_release = next_release
     
-    def find_applicable_releases(self, future_releases):
-        """Find applicable releases for this domain."""
+    def find_applicable_releases(self, release_catalog):
+        """Find applicable releases for this domain, oldest first."""
         if not self.current_version:
             _LOGGER.warning(f"Domain {self.name}: No current version set, cannot find applicable releases")
             return []
         
-        _LOGGER.debug(f"Domain {self.name}: Finding applicable releases from {len(future_releases)} future releases")
-        applicable_releases = []
-        
-        for release in future_releases:
-            applicability_status = release.get("applicabilityStatus")
-            is_applicable = release.get("isApplicable", False)
-            release_version = release.get("version")
-            min_compatible_version = release.get("minCompatibleVcfVersion")
-            
-            _LOGGER.debug(f"Domain {self.name}: Evaluating release {release_version}: "
-                        f"status={applicability_status}, applicable={is_applicable}, "
-                        f"minCompatible={min_compatible_version}")
-            
-            if (applicability_status == "APPLICABLE" and 
-                is_applicable and 
-                release_version and 
-                min_compatible_version):
-                
-                try:
-                    current_tuple = version_tuple(self.current_version)
-                    release_tuple = version_tuple(release_version)
-                    min_compatible_tuple = version_tuple(min_compatible_version)
-                    
-                    if release_tuple > current_tuple >= min_compatible_tuple:
-                        applicable_releases.append(release)
-                        _LOGGER.debug(f"Domain {self.name}: Release {release_version} is applicable")
-                    else:
-                        _LOGGER.debug(f"Domain {self.name}: Release {release_version} does not meet version criteria: "
-                                    f"{release_version} > {self.current_version} >= {min_compatible_version}")
-                
-                except Exception as ve:
-                    _LOGGER.warning(f"Domain {self.name}: Error comparing versions for release {release_version}: {ve}")
-                    continue
-            else:
-                _LOGGER.debug(f"Domain {self.name}: Release {release_version} does not meet applicability criteria")
-        
-        _LOGGER.info(f"Domain {self.name}: Found {len(applicable_releases)} applicable releases")
+        applicable_releases = release_catalog.applicable_for(self.current_version)
+        _LOGGER.debug(f"Domain {self.name}: {len(applicable_releases)} of {len(release_catalog)} future releases "
+                      f"apply to version {self.current_version}: {[r.get('version') for r in applicable_releases]}")
         return applicable_releases
     
     def to_dict(self):
@@ -217,5 +389,6 @@ class VCFDomain:
             "domain_prefix": self.prefix,
             "current_version": self.current_version,
             "update_status": self.update_status,
-            "next_release": self.next_release
+            "next_release": self.next_release,
+            "upgrade_path": self.upgrade_path
         }
@@ -0,0 +1 @@
+"""Tests for the DataCenter Assistant integration."""
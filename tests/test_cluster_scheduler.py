@@ -0,0 +1,175 @@
+"""Tests for the capacity limits of parallel ESX cluster upgrades."""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from custom_components.datacenter_assistant import cluster_scheduler
+from custom_components.datacenter_assistant.cluster_scheduler import VCFClusterUpgradeScheduler
+
+BUNDLE_ID = "esx-bundle"
+
+
+class FakeSDDCManager:
+    """Answers the upgrade API calls of the cluster scheduler and tracks running upgrades."""
+
+    def __init__(self, clusters, upgradable_status=None, final_status=None, polls=2, poll_errors=0):
+        self.clusters = clusters
+        self.upgradable_status = upgradable_status or {}
+        self.final_status = final_status or {}
+        self.polls = polls
+        self.poll_errors = poll_errors
+        self.upgrades = {}
+        self.running = {}
+        self.max_running = {}
+        self.max_running_total = 0
+        self.started = []
+
+    def _running_total(self):
+        return sum(self.running.values())
+
+    async def api_request(self, path, method="GET", data=None, params=None):
+        await asyncio.sleep(0)
+        if path.endswith("/clusters"):
+            domain_id = path.split("/")[-2]
+            return {"elements": [
+                {"resourceId": cluster_id, "resourceType": "CLUSTER", "primaryCluster": index == len(ids) - 1}
+                for ids in [self.clusters[domain_id]] for index, cluster_id in enumerate(ids)
+            ]}
+        if path.startswith("/v1/upgradables/domains/"):
+            return {"elements": [
+                {"bundleId": BUNDLE_ID, "resource": {"resourceId": cluster_id, "type": "CLUSTER"}, "status": status}
+                for cluster_id, status in self.upgradable_status.items()
+            ]}
+        if path == "/v1/upgrades" and method == "POST":
+            cluster_id = data["resourceUpgradeSpecs"][0]["resourceId"]
+            domain_id = next(domain for domain, ids in self.clusters.items() if cluster_id in ids)
+            self.started.append(cluster_id)
+            self.upgrades[cluster_id] = {"domain_id": domain_id, "polls": 0, "errors": self.poll_errors}
+            self.running[domain_id] = self.running.get(domain_id, 0) + 1
+            self.max_running[domain_id] = max(self.max_running.get(domain_id, 0), self.running[domain_id])
+            self.max_running_total = max(self.max_running_total, self._running_total())
+            return {"id": cluster_id}
+        if path.startswith("/v1/upgrades/"):
+            upgrade = self.upgrades[path.split("/")[-1]]
+            if upgrade["errors"]:
+                upgrade["errors"] -= 1
+                raise Exception("SDDC Manager unavailable")
+            upgrade["polls"] += 1
+            if upgrade["polls"] < self.polls:
+                return {"status": "IN_PROGRESS"}
+            self.running[upgrade["domain_id"]] -= 1
+            return {"status": self.final_status.get(path.split("/")[-1], "COMPLETED_WITH_SUCCESS")}
+        raise AssertionError(f"Unexpected request {method} {path}")
+
+
+def make_scheduler(sddc_manager, max_total=4, max_per_domain=2):
+    upgrade_service = SimpleNamespace(
+        hass=SimpleNamespace(data={}),
+        vcf_client=sddc_manager,
+        config_entry=SimpleNamespace(options={
+            "esx_max_parallel_clusters": max_total,
+            "esx_max_clusters_per_domain": max_per_domain,
+        }),
+        logs=[],
+    )
+    upgrade_service.add_upgrade_log = lambda domain_id, message, level="info": upgrade_service.logs.append((level, message))
+    upgrade_service._notify_progress = lambda domain_id: None
+    return VCFClusterUpgradeScheduler(upgrade_service)
+
+
+@pytest.fixture(autouse=True)
+def no_poll_delay(monkeypatch):
+    monkeypatch.setattr(cluster_scheduler, "STATUS_POLL_INTERVAL", 0)
+
+
+def test_per_domain_and_total_limits():
+    sddc_manager = FakeSDDCManager({
+        "d1": ["c1", "c2", "c3", "c4"],
+        "d2": ["c5", "c6", "c7"],
+    })
+    scheduler = make_scheduler(sddc_manager, max_total=3, max_per_domain=2)
+
+    async def run():
+        await asyncio.gather(
+            scheduler.upgrade_domain_clusters("d1", BUNDLE_ID),
+            scheduler.upgrade_domain_clusters("d2", BUNDLE_ID),
+        )
+
+    asyncio.run(run())
+
+    assert sddc_manager.max_running["d1"] <= 2
+    assert sddc_manager.max_running["d2"] <= 2
+    # The total limit is reached, so clusters did run in parallel
+    assert sddc_manager.max_running_total == 3
+    assert sorted(sddc_manager.started) == ["c1", "c2", "c3", "c4", "c5", "c6", "c7"]
+    assert all(state["status"] == "completed" for state in scheduler.get_cluster_states("d1"))
+    # Slots are all free again
+    assert scheduler._running_total == 0
+    assert scheduler._running_by_domain == {"d1": 0, "d2": 0}
+
+
+def test_primary_cluster_is_upgraded_first():
+    sddc_manager = FakeSDDCManager({"d1": ["c1", "c2", "mgmt"]})
+    scheduler = make_scheduler(sddc_manager, max_per_domain=1)
+
+    asyncio.run(scheduler.upgrade_domain_clusters("d1", BUNDLE_ID))
+
+    assert sddc_manager.started == ["mgmt", "c1", "c2"]
+
+
+def test_poll_errors_keep_the_slot():
+    sddc_manager = FakeSDDCManager({"d1": ["c1", "c2"]}, poll_errors=3)
+    scheduler = make_scheduler(sddc_manager, max_per_domain=1)
+
+    asyncio.run(scheduler.upgrade_domain_clusters("d1", BUNDLE_ID))
+
+    assert sddc_manager.max_running == {"d1": 1}
+    assert [state["status"] for state in scheduler.get_cluster_states("d1")] == ["completed", "completed"]
+
+
+def test_cancelled_upgrade_fails_and_frees_its_slot():
+    sddc_manager = FakeSDDCManager({"d1": ["c1", "c2"]}, final_status={"c1": "CANCELLED"})
+    scheduler = make_scheduler(sddc_manager, max_per_domain=1)
+
+    with pytest.raises(Exception, match="1 of 2 cluster upgrades failed: c1"):
+        asyncio.run(scheduler.upgrade_domain_clusters("d1", BUNDLE_ID))
+
+    states = {state["cluster_id"]: state for state in scheduler.get_cluster_states("d1")}
+    assert states["c1"]["status"] == "failed"
+    assert states["c2"]["status"] == "completed"
+    assert scheduler._running_by_domain == {"d1": 0}
+
+
+def test_upgrade_gives_up_after_timeout(monkeypatch):
+    monkeypatch.setattr(cluster_scheduler, "CLUSTER_UPGRADE_TIMEOUT", 0)
+    sddc_manager = FakeSDDCManager({"d1": ["c1"]})
+    scheduler = make_scheduler(sddc_manager)
+
+    with pytest.raises(Exception, match="cluster upgrades failed"):
+        asyncio.run(scheduler.upgrade_domain_clusters("d1", BUNDLE_ID))
+
+    assert "did not finish" in scheduler.get_cluster_states("d1")[0]["error"]
+    assert scheduler._running_total == 0
+
+
+def test_clusters_that_no_longer_need_the_bundle_are_skipped():
+    sddc_manager = FakeSDDCManager(
+        {"d1": ["c1", "c2", "c3"]},
+        upgradable_status={"c1": "COMPLETED", "c2": "AVAILABLE"},
+    )
+    scheduler = make_scheduler(sddc_manager)
+
+    asyncio.run(scheduler.upgrade_domain_clusters("d1", BUNDLE_ID))
+
+    # c3 has no per-cluster upgradable and is kept
+    assert sorted(sddc_manager.started) == ["c2", "c3"]
+
+
+def test_nothing_to_do_when_all_clusters_are_upgraded():
+    sddc_manager = FakeSDDCManager({"d1": ["c1"]}, upgradable_status={"c1": "COMPLETED"})
+    scheduler = make_scheduler(sddc_manager)
+
+    asyncio.run(scheduler.upgrade_domain_clusters("d1", BUNDLE_ID))
+
+    assert sddc_manager.started == []
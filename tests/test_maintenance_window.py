@@ -0,0 +1,74 @@
+"""Tests for maintenance window parsing and evaluation."""
+from datetime import datetime
+
+import pytest
+
+from custom_components.datacenter_assistant.upgrade_scheduler import MaintenanceWindow
+
+# 2024-01-01 is a Monday
+MONDAY = datetime(2024, 1, 1)
+
+
+def at(day_offset, hour, minute=0):
+    return MONDAY.replace(day=1 + day_offset, hour=hour, minute=minute)
+
+
+def test_parse_rules():
+    window = MaintenanceWindow("mon-fri 22:00-04:00; sat,sun 00:00-08:00")
+
+    assert window.rules == [({0, 1, 2, 3, 4}, 22 * 60, 4 * 60), ({5, 6}, 0, 8 * 60)]
+    assert str(window) == "mon-fri 22:00-04:00; sat,sun 00:00-08:00"
+
+
+def test_day_ranges_wrap_around_the_week():
+    assert MaintenanceWindow("fri-mon 01:00-02:00").rules[0][0] == {4, 5, 6, 0}
+
+
+def test_days_default_to_every_day():
+    assert MaintenanceWindow("01:00-02:00").rules[0][0] == set(range(7))
+
+
+@pytest.mark.parametrize("spec", [
+    "",
+    " ; ",
+    "mon 25:00-01:00",
+    "mon 01:60-02:00",
+    "mon 0100-0200",
+    "xyz 01:00-02:00",
+    "mon-xyz 01:00-02:00",
+    "mon 01:00-02:00 extra",
+])
+def test_invalid_specs(spec):
+    with pytest.raises(ValueError):
+        MaintenanceWindow(spec)
+
+
+def test_window_past_midnight_belongs_to_its_start_day():
+    window = MaintenanceWindow("mon-fri 22:00-04:00")
+
+    assert window.is_open(at(0, 23))
+    assert window.is_open(at(1, 3, 59))
+    assert not window.is_open(at(1, 4))
+    # Saturday morning is the end of Friday's window
+    assert window.is_open(at(5, 3))
+    assert not window.is_open(at(5, 23))
+    # Monday morning would be the end of Sunday's window
+    assert not window.is_open(at(0, 2))
+
+
+def test_equal_start_and_end_is_the_whole_day():
+    window = MaintenanceWindow("sat 00:00-00:00")
+
+    assert window.is_open(at(5, 0))
+    assert window.is_open(at(5, 23, 59))
+    assert not window.is_open(at(6, 0))
+
+
+def test_next_open():
+    window = MaintenanceWindow("mon-fri 22:00-04:00")
+
+    assert window.next_open(at(0, 12)) == at(0, 22)
+    assert window.next_open(at(0, 23)) == at(0, 23)
+    # Friday 05:00 -> Friday 22:00, Saturday 05:00 -> Monday 22:00
+    assert window.next_open(at(4, 5)) == at(4, 22)
+    assert window.next_open(at(5, 5)) == at(7, 22)
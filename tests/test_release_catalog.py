@@ -0,0 +1,76 @@
+"""Tests for version keys and the indexed release catalog."""
+from custom_components.datacenter_assistant.utils import version_key
+from custom_components.datacenter_assistant.vcf_api import VCFDomain, VCFReleaseCatalog
+
+
+def release(version, min_compatible, applicable=True):
+    return {
+        "version": version,
+        "minCompatibleVcfVersion": min_compatible,
+        "applicabilityStatus": "APPLICABLE" if applicable else "NOT_APPLICABLE",
+        "isApplicable": applicable,
+    }
+
+
+def test_version_key_pads_and_ignores_build_suffix():
+    assert version_key("5.2") == version_key("5.2.0.0")
+    assert version_key("5.2.1.0-24307856") == version_key("5.2.1.0")
+    assert version_key("5.2.1.0.1") == version_key("5.2.1.0")
+
+
+def test_version_key_ordering():
+    assert version_key("5.2.1") > version_key("5.2")
+    assert version_key("5.10") > version_key("5.9")
+    assert version_key("5.2.0a") > version_key("5.2.0")
+    assert version_key("5.x") < version_key("5.0")
+    assert version_key(None) == version_key("") == version_key("0.0.0.0")
+
+
+def test_applicable_releases_for_a_version():
+    catalog = VCFReleaseCatalog([
+        release("5.2.0.0", "5.1.0.0"),
+        release("5.1.0.0", "4.5.0.0"),
+        release("5.0.0.0", "4.4.0.0"),
+        release("5.1.1.0", "4.5.0.0", applicable=False),
+        release("4.5.0.0", "4.4.0.0"),
+    ])
+
+    # 5.2 needs 5.1, the not applicable release and the current version are excluded
+    assert [r["version"] for r in catalog.applicable_for("4.5.0.0")] == ["5.0.0.0", "5.1.0.0"]
+    assert [r["version"] for r in catalog.applicable_for("5.1.0.0")] == ["5.2.0.0"]
+    assert catalog.applicable_for("5.2.0.0") == []
+
+
+def test_lookups_return_copies():
+    catalog = VCFReleaseCatalog([release("5.1.0.0", "4.5.0.0")])
+
+    catalog.applicable_for("4.5.0.0").clear()
+
+    assert len(catalog.applicable_for("4.5.0.0")) == 1
+
+
+def test_incomplete_releases_are_skipped():
+    catalog = VCFReleaseCatalog([
+        release("5.1.0.0", "4.5.0.0"),
+        {"version": "5.2.0.0"},
+        {"minCompatibleVcfVersion": "4.5.0.0"},
+        "not a release",
+    ])
+
+    assert len(catalog) == 1
+
+
+def test_catalog_key_ignores_release_order():
+    releases = [release("5.1.0.0", "4.5.0.0"), release("5.2.0.0", "5.1.0.0")]
+
+    assert VCFReleaseCatalog(releases).key == VCFReleaseCatalog(list(reversed(releases))).key
+    assert VCFReleaseCatalog(releases).key != VCFReleaseCatalog(releases[:1]).key
+
+
+def test_domain_finds_releases_for_its_version():
+    domain = VCFDomain({"id": "d1", "name": "mgmt"})
+    catalog = VCFReleaseCatalog([release("5.1.0.0", "4.5.0.0")])
+
+    assert domain.find_applicable_releases(catalog) == []
+    domain.current_version = "4.5.0.0"
+    assert [r["version"] for r in domain.find_applicable_releases(catalog)] == ["5.1.0.0"]
@@ -0,0 +1,55 @@
+"""Tests for the bounded upgrade log."""
+from custom_components.datacenter_assistant.upgrade_log import NO_MESSAGES, VCFUpgradeLog
+
+
+def test_ring_buffer_drops_the_oldest_entries():
+    log = VCFUpgradeLog(max_entries=3)
+    for index in range(5):
+        log.add(f"message {index}")
+
+    assert len(log) == 3
+    assert [entry["message"] for entry in log.get_page()] == ["message 2", "message 3", "message 4"]
+    assert log.latest["seq"] == 5
+
+
+def test_paging():
+    log = VCFUpgradeLog()
+    for index in range(10):
+        log.add(f"message {index}")
+
+    assert [entry["seq"] for entry in log.get_page(offset=2, limit=3)] == [3, 4, 5]
+    assert log.get_page(offset=10) == []
+    assert len(log.get_page(limit=0)) == 0
+
+
+def test_clear_keeps_sequence_numbers_increasing():
+    log = VCFUpgradeLog()
+    log.add("before")
+    log.clear()
+
+    assert log.latest is None
+    assert log.add("after")["seq"] == 2
+
+
+def test_markdown_groups_entries_by_phase():
+    log = VCFUpgradeLog()
+    assert log.render_markdown() == NO_MESSAGES
+
+    log.add("Starting", phase="running_prechecks")
+    log.add("Check failed", level="error", phase="running_prechecks")
+    log.add("Upgrading", phase="upgrading_nsx")
+
+    markdown = log.render_markdown()
+    assert markdown.count("**Running Pre-checks**") == 1
+    assert markdown.index("**Running Pre-checks**") < markdown.index("**Upgrading NSX-T**")
+    assert "❌ Check failed" in markdown
+
+
+def test_markdown_shows_only_the_tail():
+    log = VCFUpgradeLog()
+    for index in range(20):
+        log.add(f"message {index:02d}")
+
+    markdown = log.render_markdown(tail=5)
+    assert "message 15" in markdown and "message 19" in markdown
+    assert "message 14" not in markdown
@@ -0,0 +1,65 @@
+"""Tests for the multi-hop upgrade path solver."""
+from custom_components.datacenter_assistant.upgrade_path import VCFUpgradePathSolver
+from custom_components.datacenter_assistant.vcf_api import VCFReleaseCatalog
+
+
+def release(version, min_compatible):
+    return {
+        "version": version,
+        "minCompatibleVcfVersion": min_compatible,
+        "applicabilityStatus": "APPLICABLE",
+        "isApplicable": True,
+    }
+
+
+CATALOG = VCFReleaseCatalog([
+    release("5.0.0.0", "4.4.0.0"),
+    release("5.1.0.0", "4.5.0.0"),
+    release("5.2.0.0", "5.1.0.0"),
+])
+
+
+def test_shortest_path_to_latest_release():
+    path = VCFUpgradePathSolver().solve(CATALOG, "4.5.0.0")
+
+    assert path["path"] == ["5.1.0.0", "5.2.0.0"]
+    assert path["hops"] == 2
+    assert path["from_version"] == "4.5.0.0"
+    assert path["target_version"] == "5.2.0.0"
+    assert [r["version"] for r in path["releases"]] == path["path"]
+
+
+def test_direct_hop_when_target_is_installable():
+    path = VCFUpgradePathSolver().solve(CATALOG, "5.1.0.0")
+
+    assert path["path"] == ["5.2.0.0"]
+    assert path["hops"] == 1
+
+
+def test_explicit_target_version():
+    path = VCFUpgradePathSolver().solve(CATALOG, "4.5.0.0", "5.1.0.0")
+
+    assert path["path"] == ["5.1.0.0"]
+
+
+def test_unreachable_target():
+    catalog = VCFReleaseCatalog([release("5.2.0.0", "5.1.0.0")])
+
+    assert VCFUpgradePathSolver().solve(catalog, "4.5.0.0") is None
+
+
+def test_unknown_or_older_target():
+    solver = VCFUpgradePathSolver()
+
+    assert solver.solve(CATALOG, "4.5.0.0", "6.0.0.0") is None
+    assert solver.solve(CATALOG, "5.2.0.0") is None
+    assert solver.solve(CATALOG, "") is None
+
+
+def test_paths_are_cached_per_catalog_and_version():
+    solver = VCFUpgradePathSolver()
+    first = solver.solve(CATALOG, "4.5.0.0")
+    # Same releases in another order give the same catalog key
+    same_catalog = VCFReleaseCatalog(list(reversed([entry["release"] for entry in CATALOG.releases])))
+
+    assert solver.solve(same_catalog, "4.5.0.0") is first